@@ -0,0 +1,4 @@
+from datacore.analytics.continuous import ContinuousSeries, Adjustment, bars_from_ohlcv1d
+from datacore.analytics.options import OptionChain, black76, black76_greeks, implied_vol
+from datacore.analytics.tca import TickHistory, TcaReport, tca
+from datacore.analytics.fx import FxRateGraph, FxConversion, parse_pair
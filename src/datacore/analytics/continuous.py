@@ -0,0 +1,236 @@
+import datetime as dt
+from enum import StrEnum
+from typing import Optional, Dict, List, Iterable, Tuple
+
+import numpy as np
+
+from datacore.models.assets.base import TradingHours
+from datacore.models.assets.roll import RollCalendar
+from datacore.models.assets.session import to_epoch_ns
+from datacore.models.mktdata.historical import OHLCV1D
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+class Adjustment(StrEnum):
+    NONE = "none"
+    DIFFERENCE = "difference"   # Add the roll gaps: keeps price changes, can turn prices negative.
+    RATIO = "ratio"             # Multiply by the roll ratios: keeps returns.
+
+
+def bars_from_ohlcv1d(records: Iterable[OHLCV1D], hours: TradingHours) -> Dict[str, np.ndarray]:
+    """
+    Per-contract bar arrays from ``OHLCV1D`` records keyed by symbol (the contract code). A daily bar is
+    stamped at local midnight of its date, so the bar of a roll date still belongs to the expiring contract.
+    """
+    rows: Dict[str, List[tuple]] = {}
+    for r in records:
+        close = r.close if r.close is not None else r.price
+        rows.setdefault(r.symbol, []).append(
+            (to_epoch_ns(dt.datetime.fromisoformat(r.ts_event[:10]), hours.tz),
+             close if r.open is None else r.open, close if r.high is None else r.high,
+             close if r.low is None else r.low, close, r.volume or 0.0))
+    dtype = [("ts_event", np.int64)] + [(f, np.float64) for f in PRICE_FIELDS] + [("volume", np.float64)]
+    return {symbol: np.sort(np.array(r, dtype=dtype), order="ts_event") for symbol, r in rows.items()}
+
+
+def _price_at(bars: Optional[np.ndarray], ts: int) -> Optional[float]:
+    """Close of the last bar at or before ``ts``"""
+    if bars is None or not len(bars):
+        return None
+    i = int(np.searchsorted(bars["ts_event"], ts, side="right")) - 1
+    return float(bars["close"][i]) if i >= 0 else None
+
+
+_CLOSE_DTYPE = np.dtype([("ts_event", np.int64), ("close", np.float64)])
+
+
+def _closes(bars: np.ndarray) -> np.ndarray:
+    out = np.empty(len(bars), dtype=_CLOSE_DTYPE)
+    out["ts_event"] = bars["ts_event"]
+    out["close"] = bars["close"]
+    return out
+
+
+def _contract_bars(bars: Dict[str, np.ndarray], key: str) -> Optional[np.ndarray]:
+    """Bars of contract ``key`` (CLZ26), falling back to its display code (CLZ6)"""
+    found = bars.get(key)
+    return found if found is not None else bars.get(key[:-2] + key[-1])
+
+
+class ContinuousSeries:
+    """
+    Continuous term-N series stitched from per-contract bars along a ``RollCalendar``. Rows store the
+    contract key (CLZ26), so ``calendar`` can be swapped for a rebuilt, wider one between ``extend`` calls.
+    Bars may be keyed by contract key or by display code (CLZ6); prefer keys when the bars span more than
+    10 years, since a display code then names two contracts.
+
+    Rows are kept forward-adjusted: each contract's prices are expressed at the level of the first contract
+    in the series, so rows never change once appended. The back-adjusted series is that plus (difference) or
+    times (ratio) a single running factor, so a new roll updates one scalar instead of every earlier bar, and
+    ``extend`` only processes bars later than the last stored one.
+
+    The roll gap is measured at the last bar of the expiring contract, against the close of the next
+    contract at or before that time; when the next contract has no such bar, its first open is used.
+    Between ``extend`` calls each contract keeps its last close at or before the last stored bar (and any
+    later ones), so a roll that falls on a batch boundary gets the same gap as a full rebuild.
+    """
+
+    def __init__(self, calendar: RollCalendar, term: int = 1, adjustment: Adjustment = Adjustment.RATIO):
+        self.calendar = calendar
+        self.term = term
+        self.adjustment = Adjustment(adjustment)
+        self.rolls: List[Tuple[int, str, str, float]] = []   # (ts of the first new bar, old, new, gap or ratio)
+        self._chunks: List[np.ndarray] = []
+        self._data: Optional[np.ndarray] = None
+        self._factor = 0.0 if self.adjustment is Adjustment.DIFFERENCE else 1.0
+        self._last_ts: Optional[int] = None
+        self._last_contract: Optional[str] = None
+        self._last_close: Optional[float] = None
+        self._dtype = None
+        self._tails: Dict[str, np.ndarray] = {}    # Per bars key: closes still needed to measure later rolls.
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._chunks)
+
+    @property
+    def factor(self) -> float:
+        """Cumulative adjustment of the current contract relative to the first one"""
+        return self._factor
+
+    def extend(self, bars: Dict[str, np.ndarray]) -> int:
+        """
+        Append bars (per contract key or code, structured arrays with ``ts_event`` and OHLC fields) later than the
+        last stored bar; returns the number of rows appended. Bars of contracts that are not term N at their
+        timestamp are skipped but still used to measure roll gaps.
+        """
+        closes = self._merge_tails(bars)
+        parts = []
+        for code, array in bars.items():
+            if not len(array):
+                continue
+            if self._last_ts is not None:
+                array = array[array["ts_event"] > self._last_ts]
+            if not len(array):
+                continue
+            index = self.calendar.active(array["ts_event"], self.term)
+            keep = (self.calendar.key_array[index] == code) | (self.calendar.code_array[index] == code)
+            if keep.any():
+                parts.append((array[keep], index[keep]))
+        if not parts:
+            self._trim_tails(closes)
+            return 0
+
+        if self._dtype is None:
+            fields = [f for f in parts[0][0].dtype.names if f != "ts_event"]
+            self._dtype = np.dtype([("ts_event", np.int64), ("contract", "U16")]
+                                   + [(f, np.float64) for f in fields])
+        rows = np.empty(sum(len(a) for a, _ in parts), dtype=self._dtype)
+        offset = 0
+        for array, index in parts:
+            n = len(array)
+            chunk = rows[offset:offset + n]
+            chunk["ts_event"] = array["ts_event"]
+            chunk["contract"] = self.calendar.key_array[index]
+            for f in self._dtype.names[2:]:
+                chunk[f] = array[f]
+            offset += n
+        rows = rows[np.argsort(rows["ts_event"], kind="stable")]
+
+        # One adjustment step per contract change, applied to every later row in a vectorized pass.
+        contract = rows["contract"]
+        first = self._last_contract if self._last_contract is not None else contract[0]
+        previous = np.concatenate([np.array([first], dtype=contract.dtype), contract[:-1]])
+        changes = np.flatnonzero(contract != previous)
+        steps = np.empty(len(changes))
+        for k, i in enumerate(changes):
+            old_close = float(rows["close"][i - 1]) if i else self._last_close
+            old_ts = int(rows["ts_event"][i - 1]) if i else self._last_ts
+            new_code = str(contract[i])
+            new_price = _price_at(_contract_bars(closes, new_code), old_ts)
+            if new_price is None:
+                new_price = float(rows["open"][i]) if "open" in rows.dtype.names else float(rows["close"][i])
+            if self.adjustment is Adjustment.RATIO:
+                steps[k] = new_price / old_close
+            elif self.adjustment is Adjustment.DIFFERENCE:
+                steps[k] = new_price - old_close
+            else:
+                steps[k] = 0.0
+            self.rolls.append((int(rows["ts_event"][i]), str(contract[i - 1]) if i else self._last_contract,
+                               new_code, float(steps[k])))
+
+        raw_close = rows["close"][-1]
+        if len(changes) and self.adjustment is not Adjustment.NONE:
+            segment = np.searchsorted(changes, np.arange(len(rows)), side="right")
+            if self.adjustment is Adjustment.RATIO:
+                factors = self._factor * np.r_[1.0, np.cumprod(steps)][segment]
+            else:
+                factors = self._factor + np.r_[0.0, np.cumsum(steps)][segment]
+            self._factor = float(factors[-1])
+        else:
+            factors = self._factor
+        for f in PRICE_FIELDS:
+            if f in rows.dtype.names:
+                if self.adjustment is Adjustment.RATIO:
+                    rows[f] /= factors
+                elif self.adjustment is Adjustment.DIFFERENCE:
+                    rows[f] -= factors
+
+        self._chunks.append(rows)
+        self._data = None
+        self._last_ts = int(rows["ts_event"][-1])
+        self._last_contract = str(contract[-1])
+        self._last_close = float(raw_close)
+        self._trim_tails(closes)
+        return len(rows)
+
+    def _merge_tails(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """(ts_event, close) per bars key: the kept tail of earlier calls followed by the new bars, by time"""
+        closes = dict(self._tails)
+        for name, array in bars.items():
+            if not len(array):
+                continue
+            merged = _closes(array)
+            tail = closes.get(name)
+            if tail is not None and len(tail):
+                merged = np.concatenate([tail, merged])
+                merged = merged[np.argsort(merged["ts_event"], kind="stable")]
+            closes[name] = merged
+        return closes
+
+    def _trim_tails(self, closes: Dict[str, np.ndarray]):
+        """Keep each contract's last close at or before the last stored bar, and every later one"""
+        if self._last_ts is None:
+            self._tails = closes
+            return
+        tails = {}
+        for name, array in closes.items():
+            start = max(int(np.searchsorted(array["ts_event"], self._last_ts, side="right")) - 1, 0)
+            tails[name] = array[start:].copy()
+        self._tails = tails
+
+    @property
+    def forward_adjusted(self) -> np.ndarray:
+        """All rows, prices at the level of the first contract"""
+        if self._data is None:
+            if not self._chunks:
+                return np.empty(0, dtype=self._dtype or [("ts_event", np.int64)])
+            if len(self._chunks) > 1:
+                self._chunks = [np.concatenate(self._chunks)]
+            self._data = self._chunks[0]
+        return self._data
+
+    def adjusted(self) -> np.ndarray:
+        """Back-adjusted series: prices at the level of the current contract"""
+        data = self.forward_adjusted.copy()
+        for f in PRICE_FIELDS:
+            if f in data.dtype.names:
+                if self.adjustment is Adjustment.RATIO:
+                    data[f] *= self._factor
+                elif self.adjustment is Adjustment.DIFFERENCE:
+                    data[f] += self._factor
+        return data
+
+    def contracts(self) -> np.ndarray:
+        """Contract key of every row"""
+        return self.forward_adjusted["contract"]
@@ -0,0 +1,281 @@
+import re
+import datetime as dt
+from collections import deque
+from typing import Optional, Dict, List, Iterable, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from datacore.models.assets.fx import FXSpot
+from datacore.models.mktdata.base import BaseMarketData
+
+Pair = Tuple[str, str]           # (base, quote): 1 base = rate quote
+Leg = Tuple[str, str, bool]      # (base, quote, inverted)
+
+_PAIR = re.compile(r"^([A-Z]{3})[/._-]?([A-Z]{3})$")
+
+
+def parse_pair(symbol: str) -> Pair:
+    """('EUR', 'USD') from 'EURUSD', 'EUR/USD', 'EUR.USD' or 'EUR-USD'"""
+    match = _PAIR.match(symbol.strip().upper())
+    if match is None:
+        raise ValueError(f"Not a currency pair: {symbol!r}")
+    return match.group(1), match.group(2)
+
+
+def spot_rate(mkt_data: BaseMarketData) -> Optional[float]:
+    """Mid of a quote, else the close or last price of a bar or trade"""
+    mid = getattr(mkt_data, "mid_px_00", None)
+    if mid is not None:
+        return mid
+    bid, ask = getattr(mkt_data, "bid_px_00", None), getattr(mkt_data, "ask_px_00", None)
+    if bid is not None and ask is not None:
+        return (bid + ask) / 2
+    close = getattr(mkt_data, "close", None)
+    return close if close is not None else getattr(mkt_data, "price", None)
+
+
+def event_ns(ts_event: Union[int, str, None]) -> Optional[int]:
+    """Epoch ns of a record's ``ts_event``: an int, a string of one, or an ISO date(time) taken as UTC"""
+    if ts_event is None or isinstance(ts_event, int):
+        return ts_event
+    if ts_event.isdigit():
+        return int(ts_event)
+    ts = dt.datetime.fromisoformat(ts_event)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt.timezone.utc)
+    return int(ts.timestamp()) * 1_000_000_000 + ts.microsecond * 1_000
+
+
+class _PairHistory:
+    """Appendable (ts, rate) series of one pair, viewed as arrays for as-of lookups"""
+
+    __slots__ = ("ts", "rates", "_arrays")
+
+    def __init__(self):
+        self.ts: List[int] = []
+        self.rates: List[float] = []
+        self._arrays = None
+
+    def append(self, ts: int, rate: float):
+        if self.ts and ts < self.ts[-1]:
+            raise ValueError(f"FX history must be appended in time order: {ts} < {self.ts[-1]}")
+        self.ts.append(ts)
+        self.rates.append(rate)
+        self._arrays = None
+
+    def asof(self, ts: np.ndarray) -> np.ndarray:
+        """Rate of the last update at or before each ``ts``, NaN before the first"""
+        if self._arrays is None:
+            self._arrays = (np.array(self.ts, dtype=np.int64), np.array(self.rates, dtype=np.float64))
+        times, rates = self._arrays
+        i = np.searchsorted(times, ts, side="right") - 1
+        return np.where(i >= 0, rates[np.maximum(i, 0)], np.nan) if len(rates) else np.full(len(ts), np.nan)
+
+
+class FxRateGraph:
+    """
+    Currencies as nodes and quoted pairs as edges, converting between any two connected currencies.
+
+    A cross rate follows the route with the fewest legs (breadth-first, ties broken alphabetically so routes
+    are stable). Routes are cached per (from, to) and only dropped when a new pair changes the graph; cross
+    rates are cached too and a rate update drops just the ones whose route uses that pair, so repeated
+    conversions between ticks are dictionary hits. With ``history=True`` every update is also kept for
+    as-of conversion at past timestamps, along today's routes.
+    """
+
+    def __init__(self, history: bool = False):
+        self.rates: Dict[Pair, float] = {}
+        self.updated: Dict[Pair, Optional[int]] = {}
+        self._neighbours: Dict[str, Set[str]] = {}
+        self._routes: Dict[Pair, Optional[Tuple[Leg, ...]]] = {}
+        self._cross: Dict[Pair, float] = {}
+        self._dependents: Dict[Pair, Set[Pair]] = {}
+        self._history: Optional[Dict[Pair, _PairHistory]] = {} if history else None
+
+    @property
+    def currencies(self) -> List[str]:
+        return sorted(self._neighbours)
+
+    def update(self, base: str, quote: str, rate: float, ts: Optional[int] = None):
+        if not rate > 0:
+            raise ValueError(f"FX rate {base}/{quote} must be positive, got {rate}")
+        pair = (base, quote)
+        if pair not in self.rates:
+            if (quote, base) in self.rates:
+                raise ValueError(f"{base}/{quote} is already quoted as {quote}/{base}")
+            self._neighbours.setdefault(base, set()).add(quote)
+            self._neighbours.setdefault(quote, set()).add(base)
+            # A new edge can shorten or create any route
+            self._routes.clear()
+            self._cross.clear()
+            self._dependents.clear()
+        else:
+            cross = self._cross
+            for key in self._dependents.pop(pair, ()):
+                cross.pop(key, None)
+        self.rates[pair] = rate
+        self.updated[pair] = ts
+        if self._history is not None and ts is not None:
+            history = self._history.get(pair)
+            if history is None:
+                history = self._history[pair] = _PairHistory()
+            history.append(ts, rate)
+
+    def update_spot(self, spot: FXSpot) -> bool:
+        """Update from ``spot.mkt_data``; False when the spot has no usable price yet"""
+        rate = spot_rate(spot.mkt_data) if spot.mkt_data is not None else None
+        if rate is None:
+            return False
+        base, quote = parse_pair(spot.symbol or spot.mkt_data.symbol)
+        self.update(base, quote, rate, event_ns(getattr(spot.mkt_data, "ts_event", None)))
+        return True
+
+    def update_spots(self, spots: Iterable[FXSpot]) -> int:
+        return sum(self.update_spot(spot) for spot in spots)
+
+    def route(self, source: str, target: str) -> Tuple[Leg, ...]:
+        """Legs from ``source`` to ``target`` with the fewest conversions"""
+        key = (source, target)
+        legs = self._routes.get(key)
+        if legs is None and key not in self._routes:
+            legs = self._routes[key] = self._search(source, target)
+        if legs is None:
+            raise ValueError(f"No FX route from {source} to {target}")
+        return legs
+
+    def _search(self, source: str, target: str) -> Optional[Tuple[Leg, ...]]:
+        if source == target:
+            return ()
+        if source not in self._neighbours or target not in self._neighbours:
+            return None
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for nxt in sorted(self._neighbours[node]):
+                if nxt in previous:
+                    continue
+                previous[nxt] = node
+                if nxt == target:
+                    legs = []
+                    while previous[nxt] is not None:
+                        node = previous[nxt]
+                        legs.append((node, nxt, False) if (node, nxt) in self.rates else (nxt, node, True))
+                        nxt = node
+                    return tuple(reversed(legs))
+                queue.append(nxt)
+        return None
+
+    def rate(self, source: str, target: str) -> float:
+        """Units of ``target`` per unit of ``source`` at the latest rates"""
+        key = (source, target)
+        rate = self._cross.get(key)
+        if rate is not None:
+            return rate
+        rate = 1.0
+        rates = self.rates
+        legs = self.route(source, target)
+        for base, quote, inverted in legs:
+            rate = rate / rates[(base, quote)] if inverted else rate * rates[(base, quote)]
+            self._dependents.setdefault((base, quote), set()).add(key)
+        self._cross[key] = rate
+        return rate
+
+    def rate_asof(self, source: str, target: str, ts: np.ndarray) -> np.ndarray:
+        """Cross rates at each ``ts`` from the last update of every leg at or before it"""
+        if self._history is None:
+            raise ValueError("FxRateGraph was created without history")
+        ts = np.asarray(ts, dtype=np.int64)
+        rate = np.ones(len(ts))
+        empty = _PairHistory()
+        for base, quote, inverted in self.route(source, target):
+            leg = self._history.get((base, quote), empty).asof(ts)
+            rate = rate / leg if inverted else rate * leg
+        return rate
+
+    def plan(self, currencies: Sequence[str], target: str) -> "FxConversion":
+        return FxConversion(self, currencies, target)
+
+    def convert(self, amounts: np.ndarray, currencies: Union[str, Sequence[str]], target: str) -> np.ndarray:
+        """``amounts`` (each in its currency) in ``target`` at the latest rates"""
+        if isinstance(currencies, str):
+            return np.asarray(amounts, dtype=np.float64) * self.rate(currencies, target)
+        return self.plan(currencies, target).convert(amounts)
+
+    def convert_asof(self, amounts: np.ndarray, currencies: Union[str, Sequence[str]], target: str,
+                     ts: np.ndarray) -> np.ndarray:
+        """``amounts`` in ``target`` at the rates as of each row's ``ts``"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        ts = np.broadcast_to(np.asarray(ts, dtype=np.int64), amounts.shape)
+        if isinstance(currencies, str):
+            return amounts * self.rate_asof(currencies, target, ts)
+        names, codes = np.unique(np.asarray(currencies), return_inverse=True)
+        out = np.empty(len(amounts))
+        for code, name in enumerate(names.tolist()):
+            rows = np.flatnonzero(codes == code)
+            out[rows] = amounts[rows] * self.rate_asof(name, target, ts[rows])
+        return out
+
+
+class FxConversion:
+    """
+    Conversion of a fixed list of currencies (one per position) into ``target``. The currencies are
+    factorized once; each ``convert`` then looks up one cached cross rate per distinct currency and does a
+    single gather and multiply, which is what revaluing a book on every FX tick needs.
+    """
+
+    __slots__ = ("graph", "target", "names", "codes")
+
+    def __init__(self, graph: FxRateGraph, currencies: Sequence[str], target: str):
+        self.graph = graph
+        self.target = target
+        names, codes = np.unique(np.asarray(currencies), return_inverse=True)
+        self.names = names.tolist()
+        self.codes = codes.ravel()
+
+    def rates(self) -> np.ndarray:
+        """Latest rate of each distinct currency, in ``names`` order"""
+        rate, target = self.graph.rate, self.target
+        return np.array([rate(name, target) for name in self.names])
+
+    def convert(self, amounts: np.ndarray) -> np.ndarray:
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if amounts.shape[0] != len(self.codes):
+            raise ValueError(f"Expected {len(self.codes)} amounts, got {amounts.shape[0]}")
+        return amounts * self.rates()[self.codes]
+
+    __call__ = convert
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    graph = FxRateGraph(history=True)
+    majors = {"EUR": 1.08, "GBP": 1.27, "AUD": 0.66, "NZD": 0.61}
+    minors = {"JPY": 150.0, "CHF": 0.88, "CAD": 1.36, "SGD": 1.34, "HKD": 7.8, "CNH": 7.2}
+    for ccy, rate in majors.items():
+        graph.update(ccy, "USD", rate, 0)
+    for ccy, rate in minors.items():
+        graph.update("USD", ccy, rate, 0)
+    graph.update("EUR", "NOK", 11.5, 0)
+
+    n = 10_000
+    currencies = rng.choice(graph.currencies, n).tolist()
+    amounts = rng.normal(0, 1e6, n)
+    book = graph.plan(currencies, "EUR")
+
+    ticks = 100_000
+    pairs = list(graph.rates)
+    start = time.perf_counter()
+    for k in range(ticks):
+        pair = pairs[k % len(pairs)]
+        graph.update(*pair, graph.rates[pair] * (1 + 1e-5 * (k % 7 - 3)), k + 1)
+        total = book(amounts).sum()
+    elapsed = time.perf_counter() - start
+    print(f"{ticks:,} ticks revaluing {n:,} positions: {elapsed / ticks * 1e6:.1f} us/tick")
+
+    ts = rng.integers(0, ticks, n)
+    start = time.perf_counter()
+    historical = graph.convert_asof(amounts, currencies, "EUR", ts)
+    print(f"as-of conversion of {n:,} amounts in {(time.perf_counter() - start) * 1e3:.1f} ms")
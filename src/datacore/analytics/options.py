@@ -0,0 +1,209 @@
+import datetime as dt
+from typing import Optional, Dict, List, Iterable, Union, Mapping
+
+import numpy as np
+
+from datacore.models.assets.asset_type import OptionType
+from datacore.models.mktdata.historical import Option1D
+
+DAYS_PER_YEAR = 365.0
+_SQRT_2PI = 2.506628274631
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF to double precision (Hart 1968 as given by West 2005), without scipy"""
+    x = np.asarray(x, dtype=np.float64)
+    a = np.abs(x)
+    e = np.exp(-0.5 * a * a)
+    num = ((((((3.52624965998911e-02 * a + 0.700383064443688) * a + 6.37396220353165) * a + 33.912866078383) * a
+             + 112.079291497871) * a + 221.213596169931) * a + 220.206867912376)
+    den = (((((((8.83883476483184e-02 * a + 1.75566716318264) * a + 16.064177579207) * a + 86.7807322029461) * a
+              + 296.564248779674) * a + 637.333633378831) * a + 793.826512519948) * a + 440.413735824752)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tail = e / (a + 1.0 / (a + 2.0 / (a + 3.0 / (a + 4.0 / (a + 0.65))))) / _SQRT_2PI
+    c = np.where(a < 7.07106781186547, e * num / den, tail)
+    c = np.where(a > 37.0, 0.0, c)
+    return np.where(x > 0, 1.0 - c, c)
+
+
+def _d1_d2(forward, strike, t, vol):
+    sd = vol * np.sqrt(t)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(forward / strike) + 0.5 * sd * sd) / sd
+    return d1, d1 - sd, sd
+
+
+def black76(forward, strike, t, vol, cp, rate=0.0) -> np.ndarray:
+    """Black-76 price; ``cp`` is +1 for calls and -1 for puts (``OptionType``), ``t`` in years"""
+    forward, strike, t, vol, cp = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                                        for v in (forward, strike, t, vol, cp)))
+    d1, d2, _ = _d1_d2(forward, strike, t, vol)
+    return np.exp(-rate * t) * cp * (forward * norm_cdf(cp * d1) - strike * norm_cdf(cp * d2))
+
+
+def black76_greeks(forward, strike, t, vol, cp, rate=0.0) -> Dict[str, np.ndarray]:
+    """Price, delta, gamma, vega (per 1.00 vol), theta (per year) and rho of Black-76"""
+    forward, strike, t, vol, cp = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                                        for v in (forward, strike, t, vol, cp)))
+    d1, d2, sd = _d1_d2(forward, strike, t, vol)
+    df = np.exp(-rate * t)
+    pdf = norm_pdf(d1)
+    price = df * cp * (forward * norm_cdf(cp * d1) - strike * norm_cdf(cp * d2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = df * pdf / (forward * sd)
+        theta = -df * forward * pdf * vol / (2 * np.sqrt(t)) + rate * price
+    return {"price": price, "delta": cp * df * norm_cdf(cp * d1), "gamma": gamma,
+            "vega": df * forward * pdf * np.sqrt(t), "theta": theta, "rho": -t * price}
+
+
+def implied_vol(price, forward, strike, t, cp, rate=0.0, tol: float = 1e-10, max_iter: int = 100,
+                lower: float = 1e-6, upper: float = 10.0, min_price: float = 1e-6) -> np.ndarray:
+    """
+    Black-76 implied volatility of whole arrays at once.
+
+    Every element runs a safeguarded Newton iteration: the root is kept bracketed, and a Newton step that
+    leaves the bracket (or has a vanishing vega) is replaced by bisection, so each element converges like
+    Newton near the root and can never diverge. Elements stop updating once priced within ``tol``.
+    Prices outside the no-arbitrage bounds give NaN, and so do prices below ``min_price`` (deep out of the
+    money), where vega vanishes and no vol can be told apart from another.
+    """
+    shape = np.broadcast_shapes(*(np.shape(v) for v in (price, forward, strike, t, cp)))
+    # Solve on flat copies so scalars and n-d inputs index like the 1-d case
+    price, forward, strike, t, cp = (np.array(v, dtype=np.float64).ravel() for v in
+                                     np.broadcast_arrays(price, forward, strike, t, cp))
+    df = np.exp(-rate * t)
+    intrinsic = df * np.maximum(cp * (forward - strike), 0.0)
+    cap = df * np.where(cp > 0, forward, strike)
+    valid = ((price >= intrinsic - tol) & (price >= min_price) & (price < cap) & (t > 0) & (forward > 0)
+             & (strike > 0))
+
+    lo = np.full(price.shape, lower)
+    hi = np.full(price.shape, upper)
+    # Brenner-Subrahmanyam ATM approximation as the starting point
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol = np.clip(_SQRT_2PI * price / (df * forward * np.sqrt(t)), lower * 10, upper / 2)
+    vol = np.where(valid, vol, np.nan)
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        f, k, tt, c, v = forward[idx], strike[idx], t[idx], cp[idx], vol[idx]
+        d1, d2, _ = _d1_d2(f, k, tt, v)
+        model = df[idx] * c * (f * norm_cdf(c * d1) - k * norm_cdf(c * d2))
+        diff = model - price[idx]
+        done = np.abs(diff) < tol
+        vega = df[idx] * f * norm_pdf(d1) * np.sqrt(tt)
+        hi[idx] = np.where(diff > 0, v, hi[idx])
+        lo[idx] = np.where(diff < 0, v, lo[idx])
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = v - diff / vega
+        bad = ~np.isfinite(step) | (step <= lo[idx]) | (step >= hi[idx])
+        step = np.where(bad, 0.5 * (lo[idx] + hi[idx]), step)
+        vol[idx] = np.where(done, v, step)
+        active[idx[done | (hi[idx] - lo[idx] < tol)]] = False
+    return vol.reshape(shape)
+
+
+class OptionChain:
+    """
+    Array-backed option settlements of one valuation date, sorted by (expiry, contract, strike, call/put).
+
+    ``expiries`` maps each ``Option1D.contract`` to its expiry date (e.g. from the futures roll calendar).
+    Forwards are given per contract or implied from put-call parity at the strike where call and put are
+    closest. All pricing and solving runs on the whole chain at once.
+    """
+
+    __slots__ = ("date", "contract", "expiry", "strike", "cp", "settlement", "t", "rate", "_forward", "_bounds")
+
+    def __init__(self, date: dt.date, contract: np.ndarray, expiry: np.ndarray, strike: np.ndarray,
+                 cp: np.ndarray, settlement: np.ndarray, rate: float = 0.0,
+                 forwards: Optional[Mapping[str, float]] = None):
+        order = np.lexsort((cp, strike, contract, expiry))
+        self.date = date
+        self.contract = contract[order]
+        self.expiry = expiry[order]
+        self.strike = strike[order]
+        self.cp = cp[order]
+        self.settlement = settlement[order]
+        self.rate = rate
+        self.t = (self.expiry - np.datetime64(date, "D")).astype(np.float64) / DAYS_PER_YEAR
+        starts = np.flatnonzero(np.r_[True, self.contract[1:] != self.contract[:-1]])
+        ends = np.r_[starts[1:], len(self.contract)]
+        self._bounds = {str(self.contract[s]): slice(int(s), int(e)) for s, e in zip(starts, ends)}
+        self._forward = None
+        if forwards is not None:
+            self.set_forwards(forwards)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Option1D], expiries: Mapping[str, Union[dt.date, str]],
+                     rate: float = 0.0, forwards: Optional[Mapping[str, float]] = None,
+                     date: Optional[Union[dt.date, str]] = None) -> "OptionChain":
+        records = list(records)
+        if not records:
+            raise ValueError("Cannot build an option chain from no records")
+        date = dt.date.fromisoformat(str(date or records[0].date)[:10])
+        contract = np.array([r.contract for r in records])
+        expiry = np.array([str(expiries[r.contract])[:10] for r in records], dtype="datetime64[D]")
+        strike = np.array([r.strike for r in records], dtype=np.float64)
+        cp = np.array([OptionType.from_str(r.call_put[:1]) for r in records], dtype=np.int8)
+        settlement = np.array([r.settlement for r in records], dtype=np.float64)
+        return cls(date, contract, expiry, strike, cp, settlement, rate, forwards)
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+    @property
+    def contracts(self) -> List[str]:
+        return list(self._bounds)
+
+    def rows(self, contract: str, strike: Optional[float] = None) -> slice:
+        """Rows of one contract (and strike)"""
+        s = self._bounds[contract]
+        if strike is None:
+            return s
+        strikes = self.strike[s]
+        return slice(s.start + int(np.searchsorted(strikes, strike, "left")),
+                     s.start + int(np.searchsorted(strikes, strike, "right")))
+
+    def set_forwards(self, forwards: Mapping[str, float]):
+        forward = np.full(len(self), np.nan)
+        for contract, s in self._bounds.items():
+            if contract in forwards:
+                forward[s] = forwards[contract]
+        self._forward = forward
+
+    def implied_forwards(self) -> Dict[str, float]:
+        """Forward per contract from put-call parity, F = K + (C - P) e^{rT}, at the strike with the smallest |C - P|"""
+        out = {}
+        for contract, s in self._bounds.items():
+            strike, cp, px = self.strike[s], self.cp[s], self.settlement[s]
+            calls, puts = cp > 0, cp < 0
+            common, ci, pi = np.intersect1d(strike[calls], strike[puts], return_indices=True)
+            if not len(common):
+                continue
+            gap = px[calls][ci] - px[puts][pi]
+            i = int(np.argmin(np.abs(gap)))
+            out[contract] = float(common[i] + gap[i] * np.exp(self.rate * self.t[s][0]))
+        return out
+
+    @property
+    def forward(self) -> np.ndarray:
+        if self._forward is None:
+            self.set_forwards(self.implied_forwards())
+        return self._forward
+
+    def price(self, vol) -> np.ndarray:
+        return black76(self.forward, self.strike, self.t, vol, self.cp, self.rate)
+
+    def greeks(self, vol) -> Dict[str, np.ndarray]:
+        return black76_greeks(self.forward, self.strike, self.t, vol, self.cp, self.rate)
+
+    def implied_vol(self, prices: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
+        """Implied vol of every row from ``prices`` (default: settlements)"""
+        prices = self.settlement if prices is None else prices
+        return implied_vol(prices, self.forward, self.strike, self.t, self.cp, self.rate, **kwargs)
@@ -0,0 +1,304 @@
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Optional, Dict, List, Iterable, Mapping
+
+import numpy as np
+
+from datacore.models.order import OrderAction
+from datacore.models.mktdata.realtime import MarketByPrice1
+from datacore.models.execution.algo import TimeInForce
+from datacore.models.execution.order import Order
+from datacore.models.execution.result import Fill
+
+NS_PER_MINUTE = 60_000_000_000
+BPS = 1e4
+UNDEF_PRICE = 2 ** 63 - 1  # Databento null price of raw fixed-point columns
+_TRADE = ord(OrderAction.TRADE)
+_IMMEDIATE = frozenset({TimeInForce.IOC, TimeInForce.FOK})
+
+FILL_TCA_DTYPE = np.dtype([
+    ("order", np.int64),            # Row in ``TcaReport.orders``.
+    ("ts", np.int64),
+    ("quantity", np.float64),
+    ("price", np.float64),
+    ("fee", np.float64),
+    ("bid", np.float64),            # Top of book as of the fill.
+    ("ask", np.float64),
+    ("mid", np.float64),
+    ("arrival_bps", np.float64),    # Signed cost against the arrival mid, positive is worse.
+    ("spread_capture", np.float64), # sign * (mid - price) / half spread: 1 at the own touch, -1 at the far touch.
+])
+
+ORDER_TCA_DTYPE = np.dtype([
+    ("sign", np.int8),
+    ("start", np.int64),            # Arrival: order creation, or its first fill when not set.
+    ("end", np.int64),              # End of the benchmark window.
+    ("fills", np.int64),
+    ("quantity", np.float64),       # Filled quantity.
+    ("avg_price", np.float64),
+    ("fees", np.float64),
+    ("arrival_mid", np.float64),
+    ("vwap", np.float64),           # Market VWAP of the trades in [start, end].
+    ("twap", np.float64),           # Time-weighted mid over [start, end].
+    ("arrival_bps", np.float64),
+    ("vwap_bps", np.float64),
+    ("twap_bps", np.float64),
+    ("spread_capture", np.float64), # Quantity-weighted over the fills.
+])
+
+
+def _price_column(values: np.ndarray) -> np.ndarray:
+    """Decimal float prices from a float column or a raw Databento fixed-point one"""
+    if values.dtype.kind == "f":
+        return values.astype(np.float64, copy=False)
+    return np.where(values == UNDEF_PRICE, np.nan, values / 1e9)
+
+
+class TickHistory:
+    """
+    Sorted top-of-book quotes and market trades of one instrument, with the cumulative sums that turn
+    as-of lookups, VWAP and TWAP over arbitrary windows into a few ``searchsorted`` calls per array of
+    timestamps. Quotes without both sides are dropped; the mid is carried forward between quotes.
+    """
+
+    def __init__(self, ts: np.ndarray, bid: np.ndarray, ask: np.ndarray, mid: Optional[np.ndarray] = None,
+                 trade_ts: Optional[np.ndarray] = None, trade_px: Optional[np.ndarray] = None,
+                 trade_sz: Optional[np.ndarray] = None):
+        ts = np.asarray(ts, dtype=np.int64)
+        bid = np.asarray(bid, dtype=np.float64)
+        ask = np.asarray(ask, dtype=np.float64)
+        mid = (bid + ask) / 2 if mid is None else np.where(np.isfinite(mid), mid, (bid + ask) / 2)
+        keep = np.isfinite(bid) & np.isfinite(ask)
+        order = np.argsort(ts[keep], kind="stable")
+        self.ts = ts[keep][order]
+        self.bid = bid[keep][order]
+        self.ask = ask[keep][order]
+        self.mid = mid[keep][order]
+        # Integral of the mid step function up to each quote
+        self._mid_area = np.zeros(len(self.ts))
+        np.cumsum(self.mid[:-1] * np.diff(self.ts), out=self._mid_area[1:])
+
+        trade_ts = np.empty(0, np.int64) if trade_ts is None else np.asarray(trade_ts, dtype=np.int64)
+        trade_px = np.empty(0) if trade_px is None else np.asarray(trade_px, dtype=np.float64)
+        trade_sz = np.empty(0) if trade_sz is None else np.asarray(trade_sz, dtype=np.float64)
+        keep = np.isfinite(trade_px) & (trade_sz > 0)
+        order = np.argsort(trade_ts[keep], kind="stable")
+        self.trade_ts = trade_ts[keep][order]
+        self._volume = np.concatenate(([0.0], np.cumsum(trade_sz[keep][order])))
+        self._notional = np.concatenate(([0.0], np.cumsum(trade_px[keep][order] * trade_sz[keep][order])))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_records(cls, records: Iterable[MarketByPrice1]) -> "TickHistory":
+        rows = [(int(r.ts_event), r.bid_px_00, r.ask_px_00, r.mid_px_00, r.action == OrderAction.TRADE,
+                 r.price, r.size or 0) for r in records]
+        if not rows:
+            return cls(np.empty(0, np.int64), np.empty(0), np.empty(0))
+        ts, bid, ask, mid, trade, price, size = (np.array(c, dtype=dtype) for c, dtype in zip(
+            zip(*rows), (np.int64, np.float64, np.float64, np.float64, bool, np.float64, np.float64)))
+        return cls(ts, bid, ask, mid, ts[trade], price[trade], size[trade])
+
+    @classmethod
+    def from_array(cls, data: np.ndarray) -> "TickHistory":
+        """From a structured MBP-1 array: raw DBN records (fixed-point prices) or ``decode_array`` output"""
+        ts = data["ts_event"]
+        trade = data["action"] == _TRADE
+        price = _price_column(data["price"])
+        mid = _price_column(data["mid_px_00"]) if "mid_px_00" in data.dtype.names else None
+        return cls(ts, _price_column(data["bid_px_00"]), _price_column(data["ask_px_00"]), mid,
+                   ts[trade], price[trade], data["size"][trade])
+
+    def _asof(self, ts: np.ndarray) -> np.ndarray:
+        """Index of the last quote at or before each ``ts``, -1 before the first"""
+        return np.searchsorted(self.ts, ts, side="right") - 1
+
+    def quote_at(self, ts: np.ndarray):
+        """(bid, ask, mid) as of each ``ts``, NaN before the first quote"""
+        i = self._asof(np.asarray(ts, dtype=np.int64))
+        valid = i >= 0
+        i = np.maximum(i, 0)
+        if not len(self.ts):
+            nan = np.full(i.shape, np.nan)
+            return nan, nan.copy(), nan.copy()
+        return (np.where(valid, self.bid[i], np.nan), np.where(valid, self.ask[i], np.nan),
+                np.where(valid, self.mid[i], np.nan))
+
+    def mid_at(self, ts: np.ndarray) -> np.ndarray:
+        return self.quote_at(ts)[2]
+
+    def vwap(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """VWAP of the trades in [start, end], NaN where there are none"""
+        lo = np.searchsorted(self.trade_ts, start, side="left")
+        hi = np.searchsorted(self.trade_ts, end, side="right")
+        volume = self._volume[hi] - self._volume[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(volume > 0, (self._notional[hi] - self._notional[lo]) / volume, np.nan)
+
+    def _area(self, ts: np.ndarray) -> np.ndarray:
+        i = np.maximum(self._asof(ts), 0)
+        return self._mid_area[i] + self.mid[i] * (ts - self.ts[i])
+
+    def twap(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Time-weighted mid over [start, end]; the mid as of ``end`` for an empty or instantaneous window"""
+        start = np.asarray(start, dtype=np.int64)
+        end = np.asarray(end, dtype=np.int64)
+        if not len(self.ts):
+            return np.full(np.broadcast(start, end).shape, np.nan)
+        start = np.maximum(start, self.ts[0])
+        span = end - start
+        positive = span > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            twap = (self._area(end) - self._area(start)) / span
+        return np.where(positive, twap, self.mid_at(end))
+
+
+@dataclass
+class TcaReport:
+    """Per-fill and per-order TCA rows; ``orders[i]`` is the order ``order_ids[i]``"""
+    order_ids: List[str]
+    fills: np.ndarray
+    orders: np.ndarray
+
+    def summary(self) -> Dict[str, float]:
+        """Notional-weighted averages of the per-order costs over the orders with a benchmark"""
+        orders = self.orders
+        notional = orders["quantity"] * orders["avg_price"]
+        out = {"orders": len(orders), "fills": len(self.fills), "notional": float(notional.sum()),
+               "fees": float(orders["fees"].sum())}
+        for name in ("arrival_bps", "vwap_bps", "twap_bps", "spread_capture"):
+            valid = np.isfinite(orders[name]) & (notional > 0)
+            out[name] = float(np.average(orders[name][valid], weights=notional[valid])) if valid.any() else np.nan
+        return out
+
+
+def _cost_bps(sign: np.ndarray, price: np.ndarray, benchmark: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sign * (price - benchmark) / benchmark * BPS
+
+
+def tca(fills: Iterable[Fill], orders: Mapping[str, Order], history: Mapping[str, TickHistory]) -> TcaReport:
+    """
+    Transaction-cost analysis of ``fills`` against the tick ``history`` of each order's ticker.
+
+    An order's benchmark window starts at its arrival and lasts ``exec_algo.duration`` minutes, or until
+    its last fill for IOC/FOK orders and orders without an algo; it is extended to cover late fills.
+    Everything is computed per ticker with as-of ``searchsorted`` joins, never per fill. Costs are in bps
+    and signed so that positive is worse than the benchmark; orders whose ticker has no history get NaN.
+    """
+    fills = list(fills)
+    n = len(fills)
+    index: Dict[str, int] = {}
+    order_ids: List[str] = []
+    order_of = np.empty(n, dtype=np.int64)
+    for k, order_id in enumerate(map(attrgetter("order_id"), fills)):
+        i = index.get(order_id)
+        if i is None:
+            if order_id not in orders:
+                raise ValueError(f"Fill for unknown order {order_id}")
+            i = index[order_id] = len(order_ids)
+            order_ids.append(order_id)
+        order_of[k] = i
+
+    out = np.zeros(n, dtype=FILL_TCA_DTYPE)
+    out["order"] = order_of
+    if n:
+        ts, quantity, price, fee = zip(*map(attrgetter("ts", "quantity", "price", "fee"), fills))
+        out["ts"], out["quantity"], out["price"], out["fee"] = ts, quantity, price, fee
+
+    m = len(order_ids)
+    selected = [orders[order_id] for order_id in order_ids]
+    summary = np.zeros(m, dtype=ORDER_TCA_DTYPE)
+    summary["sign"] = [order.side.sign for order in selected]
+    created = np.array([order.ts_created for order in selected], dtype=np.int64)
+    duration = np.array([order.exec_algo.duration if order.exec_algo is not None
+                         and order.time_in_force not in _IMMEDIATE else 0 for order in selected], dtype=np.int64)
+
+    first = np.full(m, np.iinfo(np.int64).max)
+    last = np.full(m, np.iinfo(np.int64).min)
+    np.minimum.at(first, order_of, out["ts"])
+    np.maximum.at(last, order_of, out["ts"])
+    start = np.where(created > 0, np.minimum(created, first), first)
+    summary["start"] = start
+    summary["end"] = np.maximum(start + duration * NS_PER_MINUTE, last)
+    summary["fills"] = np.bincount(order_of, minlength=m)
+    summary["quantity"] = np.bincount(order_of, weights=out["quantity"], minlength=m)
+    summary["fees"] = np.bincount(order_of, weights=out["fee"], minlength=m)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary["avg_price"] = np.bincount(order_of, weights=out["quantity"] * out["price"],
+                                           minlength=m) / summary["quantity"]
+
+    for name in ("bid", "ask", "mid", "arrival_bps", "spread_capture"):
+        out[name] = np.nan
+    for name in ("arrival_mid", "vwap", "twap", "spread_capture"):
+        summary[name] = np.nan
+
+    tickers: Dict[str, int] = {}
+    ticker_of = np.array([tickers.setdefault(order.ticker, len(tickers)) for order in selected], dtype=np.int64)
+    fill_ticker = ticker_of[order_of]
+    for ticker, code in tickers.items():
+        ticks = history.get(ticker)
+        if ticks is None:
+            continue
+        rows = np.flatnonzero(ticker_of == code)
+        window_start, window_end = summary["start"][rows], summary["end"][rows]
+        summary["arrival_mid"][rows] = ticks.mid_at(window_start)
+        summary["vwap"][rows] = ticks.vwap(window_start, window_end)
+        summary["twap"][rows] = ticks.twap(window_start, window_end)
+
+        k = np.flatnonzero(fill_ticker == code)
+        bid, ask, mid = ticks.quote_at(out["ts"][k])
+        out["bid"][k], out["ask"][k], out["mid"][k] = bid, ask, mid
+
+    sign = summary["sign"][order_of].astype(np.float64)
+    out["arrival_bps"] = _cost_bps(sign, out["price"], summary["arrival_mid"][order_of])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half_spread = (out["ask"] - out["bid"]) / 2
+        out["spread_capture"] = np.where(half_spread > 0, sign * (out["mid"] - out["price"]) / half_spread,
+                                         np.nan)
+
+    order_sign = summary["sign"].astype(np.float64)
+    summary["arrival_bps"] = _cost_bps(order_sign, summary["avg_price"], summary["arrival_mid"])
+    summary["vwap_bps"] = _cost_bps(order_sign, summary["avg_price"], summary["vwap"])
+    summary["twap_bps"] = _cost_bps(order_sign, summary["avg_price"], summary["twap"])
+    captured = np.isfinite(out["spread_capture"])
+    weight = np.where(captured, out["quantity"], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary["spread_capture"] = (np.bincount(order_of, weights=weight * np.nan_to_num(out["spread_capture"]),
+                                                 minlength=m) / np.bincount(order_of, weights=weight, minlength=m))
+    return TcaReport(order_ids, out, summary)
+
+
+if __name__ == "__main__":
+    import time
+
+    from datacore.models.execution.order import OrderSide
+
+    rng = np.random.default_rng(0)
+    n_ticks, n_orders, n_fills, day = 2_000_000, 20_000, 100_000, 6 * 3600 * 10 ** 9
+    history = {}
+    for ticker in ("ESZ6", "NQZ6", "CLZ6", "GCZ6", "ZNZ6"):
+        ts = np.sort(rng.integers(0, day, n_ticks))
+        mid = 100 + np.cumsum(rng.normal(0, 0.01, n_ticks))
+        trade = rng.random(n_ticks) < 0.2
+        history[ticker] = TickHistory(ts, mid - 0.005, mid + 0.005, None, ts[trade], mid[trade],
+                                      rng.integers(1, 50, trade.sum()))
+    tickers = list(history)
+
+    class _Algo:
+        short_name = "TWAP"
+        duration = 30
+
+    orders = {str(i): Order(str(i), tickers[i % 5], OrderSide.BUY if i % 2 else OrderSide.SELL, 1_000.0,
+                            exec_algo=_Algo(), ts_created=int(rng.integers(0, day - 40 * NS_PER_MINUTE)))
+              for i in range(n_orders)}
+    which = rng.integers(0, n_orders, n_fills).tolist()
+    fills = [Fill(str(f), str(i), 10.0, 100.0, orders[str(i)].ts_created + int(rng.integers(0, 30 * NS_PER_MINUTE)))
+             for f, i in enumerate(which)]
+
+    start = time.perf_counter()
+    report = tca(fills, orders, history)
+    print(f"TCA of {n_fills:,} fills / {len(report.orders):,} orders against {5 * n_ticks:,} ticks "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(report.summary())
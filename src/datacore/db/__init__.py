@@ -0,0 +1,2 @@
+from datacore.db.engine import EngineManager, Database, Environment
+from datacore.db.cache import HistoryCache, MemoryBackend, DiskBackend, IntervalSet
@@ -0,0 +1,279 @@
+import os
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple, Callable, Any, Union
+
+import numpy as np
+
+TS_FIELD = "ts_event"
+
+CacheKey = Tuple[str, str]  # (db_table_name(), symbol)
+
+
+class IntervalSet:
+    """Sorted, disjoint half-open ``[start, end)`` intervals; adjacent or overlapping intervals are merged"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: Optional[List[Tuple[Any, Any]]] = None):
+        self.starts: List = []
+        self.ends: List = []
+        for start, end in intervals or []:
+            self.add(start, end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def add(self, start, end):
+        if not start < end:
+            return
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def missing(self, start, end) -> List[Tuple[Any, Any]]:
+        """Sub-ranges of ``[start, end)`` not covered by the set"""
+        gaps = []
+        i = bisect_right(self.ends, start)
+        cursor = start
+        while cursor < end and i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] > cursor:
+                gaps.append((cursor, self.starts[i]))
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def covers(self, start, end) -> bool:
+        return not self.missing(start, end)
+
+
+def _merge(old: Optional[np.ndarray], new: np.ndarray) -> np.ndarray:
+    if old is None or not len(old):
+        data = new
+    elif not len(new):
+        return old
+    else:
+        data = np.concatenate([old, new.astype(old.dtype, copy=False)])
+    ts = data[TS_FIELD]
+    if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+        data = data[np.argsort(ts, kind="stable")]
+    return data
+
+
+def _slice(ts: np.ndarray, start, end) -> slice:
+    return slice(int(np.searchsorted(ts, start, side="left")), int(np.searchsorted(ts, end, side="left")))
+
+
+class MemoryBackend:
+    """In-process cache bounded by ``max_bytes`` of row data, evicting the least recently used key"""
+
+    def __init__(self, max_bytes: int = 1 << 30):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[IntervalSet, np.ndarray]]" = OrderedDict()
+
+    def intervals(self, key: CacheKey) -> IntervalSet:
+        entry = self._entries.get(key)
+        if entry is None:
+            return IntervalSet()
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def read(self, key: CacheKey, start, end) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        data = entry[1]
+        return data[_slice(data[TS_FIELD], start, end)]
+
+    def write(self, key: CacheKey, intervals: IntervalSet, rows: np.ndarray):
+        entry = self._entries.pop(key, None)
+        old = None
+        if entry is not None:
+            old = entry[1]
+            self.nbytes -= old.nbytes
+        data = _merge(old, rows)
+        self._entries[key] = (intervals, data)
+        self.nbytes += data.nbytes
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def delete(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1].nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+
+class DiskBackend:
+    """
+    Persistent cache under ``root``: one directory per key holding a ``.npy`` file per column plus the
+    covered intervals. Columns are memory-mapped on read, so a lookup only pages in the ``ts_event`` pages
+    it bisects and the requested rows.
+    """
+
+    def __init__(self, root: Union[str, os.PathLike]):
+        self.root = Path(root)
+
+    def _path(self, key: CacheKey) -> Path:
+        table, symbol = key
+        return self.root / table.replace(os.sep, "_") / symbol.replace(os.sep, "_")
+
+    def intervals(self, key: CacheKey) -> IntervalSet:
+        path = self._path(key) / "intervals.npy"
+        if not path.exists():
+            return IntervalSet()
+        return IntervalSet([(start, end) for start, end in np.load(path)])
+
+    def _columns(self, path: Path) -> Optional[Dict[str, np.ndarray]]:
+        meta = path / "columns.json"
+        if not meta.exists():
+            return None
+        names = json.loads(meta.read_text())
+        return {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in names}
+
+    def read(self, key: CacheKey, start, end) -> Optional[np.ndarray]:
+        columns = self._columns(self._path(key))
+        if columns is None:
+            return None
+        rows = _slice(columns[TS_FIELD], start, end)
+        n = rows.stop - rows.start
+        out = np.empty(n, dtype=[(name, col.dtype) for name, col in columns.items()])
+        for name, col in columns.items():
+            out[name] = col[rows]
+        return out
+
+    def write(self, key: CacheKey, intervals: IntervalSet, rows: np.ndarray):
+        path = self._path(key)
+        path.mkdir(parents=True, exist_ok=True)
+        columns = self._columns(path)
+        old = None
+        if columns is not None:
+            old = np.empty(len(columns[TS_FIELD]), dtype=[(name, col.dtype) for name, col in columns.items()])
+            for name, col in columns.items():
+                old[name] = col
+            del columns
+        data = _merge(old, rows)
+        names = list(data.dtype.names)
+        for name in names:
+            tmp = path / f"{name}.tmp.npy"
+            np.save(tmp, np.ascontiguousarray(data[name]))
+            os.replace(tmp, path / f"{name}.npy")
+        bounds = np.array(list(intervals), dtype=data.dtype[TS_FIELD]).reshape(-1, 2)
+        np.save(path / "intervals.tmp.npy", bounds)
+        os.replace(path / "intervals.tmp.npy", path / "intervals.npy")
+        (path / "columns.json").write_text(json.dumps(names))
+
+    def delete(self, key: CacheKey):
+        path = self._path(key)
+        if path.exists():
+            for file in path.iterdir():
+                file.unlink()
+            path.rmdir()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0               # Requests served entirely from the cache.
+    partial_hits: int = 0       # Requests that needed some sub-ranges fetched.
+    misses: int = 0             # Requests with nothing cached.
+    fetches: int = 0            # Sub-range queries sent to the source.
+    fetched_rows: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.partial_hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class HistoryCache:
+    """
+    Read-through cache of historical rows keyed by (``db_table_name()``, symbol).
+
+    ``fetch(table, symbol, start, end)`` loads rows with ``start <= ts_event < end`` from the source as a
+    NumPy structured array with a ``ts_event`` field (epoch ns, or ``datetime64[D]`` for daily tables).
+    The cache records which ``[start, end)`` ranges it holds per key and only fetches the missing
+    sub-ranges of a request, merging them into the stored rows.
+
+    The backend is guarded by one lock that is never held while the source is queried; a per-key lock
+    keeps concurrent requests for the same key from fetching the same range twice, while other keys
+    proceed. Returned arrays are read-only views, copy them to modify.
+    """
+
+    def __init__(self, fetch: Callable[[str, str, Any, Any], np.ndarray],
+                 backend: Optional[Union[MemoryBackend, DiskBackend]] = None):
+        self.fetch = fetch
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.stats = CacheStats()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[CacheKey, threading.Lock] = {}
+
+    def _key_lock(self, key: CacheKey) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, table: str, symbol: str, start, end) -> np.ndarray:
+        """Rows of ``table``/``symbol`` with ``start <= ts_event < end``, sorted by ts_event"""
+        key = (table, symbol)
+        stats = self.stats
+        first = True
+        with self._key_lock(key):
+            while True:
+                with self._lock:
+                    gaps = self.backend.intervals(key).missing(start, end)
+                    if first:
+                        if not gaps:
+                            stats.hits += 1
+                        elif len(gaps) == 1 and gaps[0] == (start, end):
+                            stats.misses += 1
+                        else:
+                            stats.partial_hits += 1
+                        first = False
+                    if not gaps:
+                        return self._read(key, start, end)
+                parts = [self.fetch(table, symbol, lo, hi) for lo, hi in gaps]
+                with self._lock:
+                    stats.fetches += len(parts)
+                    stats.fetched_rows += sum(len(part) for part in parts)
+                    # Other keys may have been written (and this one evicted) while fetching
+                    intervals = IntervalSet(list(self.backend.intervals(key)))
+                    for lo, hi in gaps:
+                        intervals.add(lo, hi)
+                    rows = parts[0] if len(parts) == 1 else np.concatenate(parts)
+                    self.backend.write(key, intervals, rows)
+                    if intervals.covers(start, end):
+                        return self._read(key, start, end)
+
+    def _read(self, key: CacheKey, start, end) -> Optional[np.ndarray]:
+        data = self.backend.read(key, start, end)
+        if data is not None:
+            data.setflags(write=False)
+        return data
+
+    def invalidate(self, table: str, symbol: str):
+        """Forget a key, e.g. after the source was corrected; waits for an in-flight fetch of the key"""
+        key = (table, symbol)
+        with self._key_lock(key), self._lock:
+            self.backend.delete(key)
@@ -0,0 +1,174 @@
+import asyncio
+from enum import StrEnum
+from urllib.parse import quote_plus
+from typing import Optional, Dict, List, Tuple, Iterable, Sequence, Any
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from datacore import config
+
+
+class Database(StrEnum):
+    CHRONO = "CHRONO"
+    TIME_LENS = "TIME_LENS"
+
+
+class Environment(StrEnum):
+    PROD = "PROD"
+    UAT = "UAT"
+
+
+def connection_string(database: Database, env: Environment) -> str:
+    """Connection string configured in ``datacore.config`` (e.g. ``CHRONO_STR_PROD``)"""
+    dsn = getattr(config, f"{Database(database)}_STR_{Environment(env)}", "")
+    if not dsn:
+        raise ValueError(f"No connection string configured for {database}/{env}")
+    return dsn
+
+
+def is_url(dsn: str) -> bool:
+    """SQLAlchemy URLs contain a scheme, anything else is taken as an ODBC connection string"""
+    return "://" in dsn
+
+
+def sqlalchemy_url(dsn: str) -> str:
+    return dsn if is_url(dsn) else f"mssql+pyodbc:///?odbc_connect={quote_plus(dsn)}"
+
+
+class EngineManager:
+    """
+    Lazily created, pooled connections per (database, environment).
+
+    ``engine()`` returns a sync SQLAlchemy ``Engine``; ``pool()`` an ``aioodbc`` pool over the same ODBC
+    connection string. Nothing connects until first use. Connection strings default to ``datacore.config``
+    and can be overridden per key with ``dsns``; a SQLAlchemy URL (e.g. ``sqlite:///...``) is also accepted,
+    in which case the async methods run on the sync engine in threads, bounded by ``max_size``.
+
+    ``fetch_symbols`` runs one query per symbol concurrently over the pool instead of pulling serially.
+    """
+
+    def __init__(self, dsns: Optional[Dict[Tuple[Database, Environment], str]] = None, pool_size: int = 5,
+                 max_overflow: int = 10, pool_timeout: float = 30, pool_recycle: int = 1_800, min_size: int = 1,
+                 max_size: int = 10):
+        self.dsns = {(Database(db), Environment(env)): dsn for (db, env), dsn in (dsns or {}).items()}
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.min_size = min_size
+        self.max_size = max_size
+        self._engines: Dict[Tuple[Database, Environment], Engine] = {}
+        self._pools: Dict[Tuple[Database, Environment], Any] = {}
+        self._locks: Dict[Tuple[Database, Environment], asyncio.Lock] = {}
+        self._limits: Dict[Tuple[Database, Environment], asyncio.Semaphore] = {}
+
+    def dsn(self, database: Database, env: Environment) -> str:
+        key = (Database(database), Environment(env))
+        return self.dsns.get(key) or connection_string(*key)
+
+    def engine(self, database: Database, env: Environment) -> Engine:
+        key = (Database(database), Environment(env))
+        engine = self._engines.get(key)
+        if engine is None:
+            url = sqlalchemy_url(self.dsn(*key))
+            kwargs = {"pool_pre_ping": True}
+            if not url.startswith("sqlite"):
+                kwargs.update(pool_size=self.pool_size, max_overflow=self.max_overflow,
+                              pool_timeout=self.pool_timeout, pool_recycle=self.pool_recycle)
+            engine = self._engines[key] = create_engine(url, **kwargs)
+        return engine
+
+    async def pool(self, database: Database, env: Environment):
+        """aioodbc pool for an ODBC connection string, created on first call (``pip install datacore[aiodbc]``)"""
+        key = (Database(database), Environment(env))
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+        dsn = self.dsn(*key)
+        if is_url(dsn):
+            raise ValueError(f"{database}/{env} is configured with a SQLAlchemy URL, aioodbc needs an ODBC string")
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self._pools:
+                import aioodbc
+                self._pools[key] = await aioodbc.create_pool(dsn=dsn, minsize=self.min_size, maxsize=self.max_size)
+        return self._pools[key]
+
+    def _limit(self, key: Tuple[Database, Environment]) -> asyncio.Semaphore:
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.max_size)
+        return limit
+
+    def fetch_all(self, database: Database, env: Environment, sql: str, params: Sequence = ()) -> List[tuple]:
+        """Run a query with DBAPI (``?``) placeholders on the sync engine"""
+        with self.engine(database, env).connect() as conn:
+            return [tuple(row) for row in conn.exec_driver_sql(sql, tuple(params))]
+
+    async def fetch_all_async(self, database: Database, env: Environment, sql: str,
+                              params: Sequence = ()) -> List[tuple]:
+        key = (Database(database), Environment(env))
+        if is_url(self.dsn(*key)):
+            async with self._limit(key):
+                return await asyncio.to_thread(self.fetch_all, *key, sql, params)
+        pool = await self.pool(*key)
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(sql, tuple(params))
+                return [tuple(row) for row in await cur.fetchall()]
+
+    async def fetch_symbols(self, database: Database, env: Environment, sql: str, symbols: Iterable[str],
+                            params: Sequence = ()) -> Dict[str, List[tuple]]:
+        """
+        Run ``sql`` once per symbol, concurrently. The symbol is bound to the first placeholder,
+        followed by ``params``.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(*(self.fetch_all_async(database, env, sql, (symbol, *params))
+                                         for symbol in symbols))
+        return dict(zip(symbols, results))
+
+    def check(self, database: Database, env: Environment) -> bool:
+        """True if a ``SELECT 1`` succeeds on the sync engine"""
+        try:
+            with self.engine(database, env).connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    async def check_async(self, database: Database, env: Environment) -> bool:
+        try:
+            await self.fetch_all_async(database, env, "SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def health(self) -> Dict[str, bool]:
+        """Health of every engine created so far"""
+        return {f"{db}/{env}": self.check(db, env) for db, env in list(self._engines)}
+
+    def close(self):
+        for engine in self._engines.values():
+            engine.dispose()
+        self._engines.clear()
+
+    async def aclose(self):
+        for pool in self._pools.values():
+            pool.close()
+            await pool.wait_closed()
+        self._pools.clear()
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
@@ -0,0 +1,4 @@
+from datacore.engine.book import BookEngine, OrderBook, BookSide, SequenceGap
+from datacore.engine.bars import BarAggregator, Bar, aggregate, resample
+from datacore.engine.monitor import FeedMonitor, LatencyHistogram, RecordFlag
+from datacore.engine.replay import ReplayEngine, ReplaySource, ReplayStats
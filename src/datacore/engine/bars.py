@@ -0,0 +1,273 @@
+import datetime as dt
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Iterable, Callable, Tuple
+
+import numpy as np
+
+from datacore.models.order import OrderAction
+from datacore.models.assets.base import TradingHours
+from datacore.models.assets.session import SessionTable
+from datacore.models.mktdata.frequency import Frequency
+from datacore.models.mktdata.historical import OHLCV1D
+from datacore.models.mktdata.realtime import MarketByPrice1
+
+BAR_DTYPE = np.dtype([
+    ("ts_event", np.int64),         # Bar start (session anchor for day/week/month bars), epoch ns.
+    ("session", "datetime64[D]"),   # Trading session of the first tick in the bar.
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("count", np.int64),            # Number of ticks.
+])
+
+BAR_FREQUENCIES = (Frequency.SEC_1, Frequency.MIN_1, Frequency.MIN_5, Frequency.MIN_15, Frequency.HOUR_1,
+                   Frequency.DAY_1, Frequency.WEEK_1, Frequency.MONTH_1)
+
+_TRADE_ACTIONS = (OrderAction.TRADE, OrderAction.FILL)
+_EPOCH = dt.date(1970, 1, 1)
+_PERIOD_FREQUENCIES = (Frequency.WEEK_1, Frequency.MONTH_1)
+
+
+def _week(days):
+    """Week index of days since epoch; weeks start on Sunday so a Sunday-evening session opens the week"""
+    return (days + 4) // 7
+
+
+def _month(days):
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def nests(fine: Frequency, coarse: Frequency) -> bool:
+    """True if every ``coarse`` bar is an exact union of ``fine`` bars"""
+    if fine.nanoseconds and coarse.nanoseconds:
+        return coarse.nanoseconds % fine.nanoseconds == 0
+    if fine.nanoseconds or fine is Frequency.DAY_1:
+        return coarse in (Frequency.DAY_1, Frequency.WEEK_1, Frequency.MONTH_1) and fine is not coarse
+    return False
+
+
+def bucket_keys(ts: np.ndarray, table: SessionTable, frequency: Frequency) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bar key of each timestamp and the index of its session in ``table``. Intraday keys are the bar start,
+    counted from the session anchor so bars line up with the open rather than with UTC midnight.
+    """
+    session = np.searchsorted(table.anchor_array, ts, side="right") - 1
+    if session.size and session.min() < 0:
+        raise ValueError("Timestamps before the first session in the table.")
+    anchor = table.anchor_array[session]
+    step = frequency.nanoseconds
+    if step:
+        return anchor + (ts - anchor) // step * step, session
+    if frequency is Frequency.DAY_1:
+        return anchor, session
+    days = table.date_array[session].astype(np.int64)
+    if frequency is Frequency.WEEK_1:
+        return _week(days), session
+    if frequency is Frequency.MONTH_1:
+        return _month(days), session
+    raise ValueError(f"Cannot build bars at frequency {frequency}")
+
+
+def _reduce(keys: np.ndarray, session: np.ndarray, table: SessionTable, frequency: Frequency, open_: np.ndarray,
+            high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+            count: np.ndarray) -> np.ndarray:
+    if not len(keys):
+        return np.empty(0, dtype=BAR_DTYPE)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    bars = np.empty(len(starts), dtype=BAR_DTYPE)
+    bars["ts_event"] = keys[starts] if frequency.nanoseconds else table.anchor_array[session[starts]]
+    bars["session"] = table.date_array[session[starts]]
+    bars["open"] = open_[starts]
+    bars["high"] = np.maximum.reduceat(high, starts)
+    bars["low"] = np.minimum.reduceat(low, starts)
+    bars["close"] = close[ends]
+    bars["volume"] = np.add.reduceat(volume, starts)
+    bars["count"] = np.add.reduceat(count, starts)
+    return bars
+
+
+def resample(bars: np.ndarray, hours: TradingHours, frequency: Frequency) -> np.ndarray:
+    """Aggregate bars (``BAR_DTYPE``, sorted by ts_event) into a coarser frequency"""
+    ts = bars["ts_event"]
+    if not len(ts):
+        return np.empty(0, dtype=BAR_DTYPE)
+    table = hours.session_table_between(int(ts[0]), int(ts[-1]))
+    keys, session = bucket_keys(ts, table, frequency)
+    return _reduce(keys, session, table, frequency, bars["open"], bars["high"], bars["low"], bars["close"],
+                   bars["volume"], bars["count"])
+
+
+def aggregate(ts: np.ndarray, price: np.ndarray, size: np.ndarray, hours: TradingHours,
+              frequencies: Iterable[Frequency]) -> Dict[Frequency, np.ndarray]:
+    """
+    Build OHLCV bars at every requested frequency from one array of trades.
+
+    Only the finest frequency is computed from the ticks; each coarser one is resampled from the
+    coarsest already built frequency that nests into it (e.g. 1h from 15m, month from day).
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    price = np.asarray(price, dtype=np.float64)
+    size = np.asarray(size, dtype=np.float64)
+    if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+        order = np.argsort(ts, kind="stable")
+        ts, price, size = ts[order], price[order], size[order]
+
+    frequencies = sorted(set(frequencies), key=BAR_FREQUENCIES.index)
+    out: Dict[Frequency, np.ndarray] = {}
+    if not len(ts):
+        return {f: np.empty(0, dtype=BAR_DTYPE) for f in frequencies}
+    table = hours.session_table_between(int(ts[0]), int(ts[-1]))
+    for frequency in frequencies:
+        source = next((f for f in reversed(list(out)) if nests(f, frequency)), None)
+        if source is None:
+            keys, session = bucket_keys(ts, table, frequency)
+            out[frequency] = _reduce(keys, session, table, frequency, price, price, price, price, size,
+                                     np.ones(len(ts), dtype=np.int64))
+        else:
+            out[frequency] = resample(out[source], hours, frequency)
+    return out
+
+
+def to_ohlcv1d(bars: np.ndarray, venue: str, vendor: str, symbol: str) -> List[OHLCV1D]:
+    """Daily bars as ``OHLCV1D`` records dated by trading session"""
+    return [OHLCV1D(venue=venue, vendor=vendor, symbol=symbol, ts_event=str(session), open=o, high=h, low=l,
+                    close=c, volume=v)
+            for session, o, h, l, c, v in zip(bars["session"].astype(str).tolist(), bars["open"].tolist(),
+                                               bars["high"].tolist(), bars["low"].tolist(),
+                                               bars["close"].tolist(), bars["volume"].tolist())]
+
+
+@dataclass(slots=True)
+class Bar:
+    frequency: Frequency
+    ts_event: int
+    session: dt.date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    count: int
+
+
+class _BarState:
+    __slots__ = ("frequency", "step", "key", "end", "ts_event", "session", "open", "high", "low", "close",
+                 "volume", "count")
+
+    def __init__(self, frequency: Frequency):
+        self.frequency = frequency
+        self.step = frequency.nanoseconds
+        self.key = None
+        self.end = -1
+        self.count = 0
+
+    def bar(self) -> Bar:
+        return Bar(self.frequency, self.ts_event, self.session, self.open, self.high, self.low, self.close,
+                   self.volume, self.count)
+
+
+class BarAggregator:
+    """
+    Streaming OHLCV bars at several frequencies with O(1) work per tick and frequency.
+
+    A bar is emitted (to ``on_bar``, or appended to ``completed``) when the first tick of the next bar
+    arrives, or on ``flush``. Bars are aligned to the sessions of ``hours`` like ``aggregate``.
+    """
+
+    def __init__(self, hours: TradingHours, frequencies: Iterable[Frequency],
+                 on_bar: Optional[Callable[[Bar], None]] = None):
+        self.hours = hours
+        self.on_bar = on_bar
+        self.completed: List[Bar] = []
+        self._states = [_BarState(f) for f in sorted(set(frequencies), key=BAR_FREQUENCIES.index)]
+        self._table: Optional[SessionTable] = None
+        self._anchor = 0
+        self._next_anchor = -1
+        self._session = None
+
+    def _set_session(self, ts: int):
+        table = self._table
+        if table is None or not table.covers(ts):
+            table = self._table = self.hours.session_table(ts)
+        i = bisect_right(table.anchors, ts) - 1
+        if i < 0:
+            raise ValueError(f"Timestamp {ts} is before the first session in the table.")
+        self._anchor = table.anchors[i]
+        self._next_anchor = table.anchors[i + 1] if i + 1 < len(table.anchors) else table.end
+        self._session = table.dates[i]
+
+    def _emit(self, state: _BarState):
+        bar = state.bar()
+        if self.on_bar is not None:
+            self.on_bar(bar)
+        else:
+            self.completed.append(bar)
+
+    def _add(self, ts: int, open_: float, high: float, low: float, close: float, volume: float, count: int):
+        if not self._anchor <= ts < self._next_anchor:
+            self._set_session(ts)
+        for st in self._states:
+            if ts >= st.end:
+                step = st.step
+                anchor = self._anchor
+                if step:
+                    key = anchor + (ts - anchor) // step * step
+                    end = min(key + step, self._next_anchor)
+                else:
+                    days = (self._session - _EPOCH).days
+                    if st.frequency is Frequency.DAY_1:
+                        key = anchor
+                    elif st.frequency is Frequency.WEEK_1:
+                        key = _week(days)
+                    else:
+                        key = int(_month(days))
+                    end = self._next_anchor
+                if key != st.key:
+                    if st.count:
+                        self._emit(st)
+                    st.key = key
+                    st.ts_event = key if step else anchor
+                    st.session = self._session
+                    st.open, st.high, st.low, st.close = open_, high, low, close
+                    st.volume = volume
+                    st.count = count
+                    st.end = end
+                    continue
+                st.end = end
+            if high > st.high:
+                st.high = high
+            if low < st.low:
+                st.low = low
+            st.close = close
+            st.volume += volume
+            st.count += count
+
+    def update(self, ts: int, price: float, size: float = 0):
+        """Add one trade"""
+        self._add(ts, price, price, price, price, size, 1)
+
+    def update_bar(self, bar: Bar):
+        """Add a finer bar, e.g. 1m bars into 5m/1h aggregators"""
+        self._add(bar.ts_event, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.count)
+
+    def update_record(self, record: MarketByPrice1):
+        """Add an MBP-1 record; only trades contribute to bars"""
+        if record.action in _TRADE_ACTIONS:
+            self.update(int(record.ts_event), record.price, record.size or 0)
+
+    def flush(self, ts: Optional[int] = None):
+        """
+        Emit open bars, or with ``ts`` only the intraday/daily bars that ended at or before it
+        (week and month bars only end when a later session starts a new period).
+        """
+        for st in self._states:
+            if st.count and (ts is None or (ts >= st.end and st.frequency not in _PERIOD_FREQUENCIES)):
+                self._emit(st)
+                st.key = None
+                st.count = 0
+                st.end = -1
+
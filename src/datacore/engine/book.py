@@ -0,0 +1,377 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple, Callable
+
+from datacore.models.order import OrderSide, OrderAction
+from datacore.models.orderbook import OrderBookEvent, OrderBookEventBatch, NULL_INT
+from datacore.models.mktdata.realtime import MarketByPrice1, MarketByPrice10, MBP10_LEVELS, PX, empty_levels
+
+_ADD = ord(OrderAction.ADD)
+_CANCEL = ord(OrderAction.CANCEL)
+_MODIFY = ord(OrderAction.MODIFY)
+_CLEAR = ord(OrderAction.CLEAR)
+_BID = ord(OrderSide.BID)
+_ASK = ord(OrderSide.ASK)
+
+# (price, size, count) of one level, prices in 1e-9 units
+Level = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class SequenceGap:
+    """Forward jump in the venue sequence of one instrument"""
+    instrument_id: int
+    expected: int
+    received: int
+    ts_recv: int
+
+    @property
+    def missing(self) -> int:
+        return self.received - self.expected
+
+
+class BookSide:
+    """
+    Price levels of one side of the book.
+
+    ``keys`` is a sorted list of signed prices (+price for bids, -price for asks) so the best
+    level is always ``keys[-1]``: top of book is O(1) and adding/removing at the touch is an append/pop.
+    ``levels`` maps price -> [size, count].
+    """
+
+    __slots__ = ("sign", "keys", "levels")
+
+    def __init__(self, sign: int):
+        self.sign = sign
+        self.keys: List[int] = []
+        self.levels: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clear(self):
+        self.keys.clear()
+        self.levels.clear()
+
+    def add(self, price: int, size: int, count: int = 1):
+        level = self.levels.get(price)
+        if level is None:
+            self.levels[price] = [size, count]
+            key = self.sign * price
+            keys = self.keys
+            if not keys or key > keys[-1]:
+                keys.append(key)
+            else:
+                insort(keys, key)
+        else:
+            level[0] += size
+            level[1] += count
+
+    def reduce(self, price: int, size: int, count: int = 1):
+        level = self.levels.get(price)
+        if level is None:
+            return
+        level[0] -= size
+        level[1] -= count
+        if level[0] <= 0 or level[1] <= 0:
+            del self.levels[price]
+            key = self.sign * price
+            keys = self.keys
+            if keys[-1] == key:
+                keys.pop()
+            else:
+                del keys[bisect_left(keys, key)]
+
+    def best(self) -> Optional[Level]:
+        """Top level, or None if the side is empty"""
+        if not self.keys:
+            return None
+        price = self.sign * self.keys[-1]
+        size, count = self.levels[price]
+        return price, size, count
+
+    def level(self, depth: int) -> Optional[Level]:
+        """Level at ``depth`` (0 = top), or None if the side is not that deep"""
+        if depth >= len(self.keys):
+            return None
+        price = self.sign * self.keys[-1 - depth]
+        size, count = self.levels[price]
+        return price, size, count
+
+    def top(self, n: int) -> List[Level]:
+        """Up to ``n`` best levels, best first"""
+        out = []
+        for key in reversed(self.keys[-n:]):
+            price = self.sign * key
+            size, count = self.levels[price]
+            out.append((price, size, count))
+        return out
+
+    def depth_of(self, price: int) -> Optional[int]:
+        """Level index of ``price`` (0 = top), or None if there is no such level. O(log n)"""
+        if price not in self.levels:
+            return None
+        return len(self.keys) - 1 - bisect_left(self.keys, self.sign * price)
+
+    def size_through(self, price: int) -> int:
+        """Total size resting at ``price`` or better. O(log n) search plus the levels summed"""
+        keys = self.keys
+        start = bisect_left(keys, self.sign * price)
+        return sum(self.levels[self.sign * key][0] for key in keys[start:])
+
+
+class OrderBook:
+    """
+    Limit order book of a single instrument rebuilt from MBO events.
+
+    Events carrying an ``order_id`` are tracked per order so CANCEL/MODIFY can be resolved to their
+    resting price; events without one are applied to the price level directly (MODIFY is then ignored).
+    As in Databento MBO, a MODIFY for an order the book has not seen is applied as an ADD. ADDs, and CANCELs
+    without an ``order_id``, that have no BID/ASK side cannot be placed on either side and are dropped
+    (counted in ``unsided``); CANCEL/MODIFY of a known order without a side keep the order's resting side.
+    TRADE/FILL do not change the book, resting size is removed by the CANCEL/MODIFY that follows them.
+    """
+
+    __slots__ = ("instrument_id", "symbol", "bids", "asks", "orders", "last_sequence", "ts_recv", "ts_event",
+                 "last_price", "last_size", "last_action", "last_side", "last_flags", "stale", "unmatched",
+                 "unsided")
+
+    def __init__(self, instrument_id: int, symbol: str = ""):
+        self.instrument_id = instrument_id
+        self.symbol = symbol
+        self.bids = BookSide(1)
+        self.asks = BookSide(-1)
+        self.orders: Dict[int, List[int]] = {}  # order_id -> [side, price, size]
+        self.last_sequence: Optional[int] = None
+        self.ts_recv = 0
+        self.ts_event = 0
+        self.last_price = 0
+        self.last_size = 0
+        self.last_action = ord(OrderAction.NONE)
+        self.last_side = ord(OrderSide.NONE)
+        self.last_flags = 0
+        self.stale = 0      # events dropped because their sequence was behind the book
+        self.unmatched = 0  # CANCELs for unknown orders
+        self.unsided = 0    # ADDs, MODIFYs of unknown orders and level CANCELs dropped for having no side
+
+    def clear(self):
+        """Drop all resting orders and levels"""
+        self.bids.clear()
+        self.asks.clear()
+        self.orders.clear()
+
+    def side(self, side: int) -> Optional[BookSide]:
+        """Book side of an ASCII side code, None for a side other than BID/ASK"""
+        if side == _BID:
+            return self.bids
+        if side == _ASK:
+            return self.asks
+        return None
+
+    def apply(self, action: int, side: int, price: int, size: int, order_id: Optional[int] = None):
+        """Apply one event given its ASCII action/side codes and nano price"""
+        if action == _ADD:
+            self._add(side, price, size, order_id)
+        elif action == _CANCEL:
+            if order_id is None:
+                book_side = self.side(side)
+                if book_side is None:
+                    self.unsided += 1
+                    return
+                book_side.reduce(price, size)
+                return
+            order = self.orders.get(order_id)
+            if order is None:
+                self.unmatched += 1
+                return
+            if size >= order[2]:
+                self._remove_order(order_id)
+            else:
+                order[2] -= size
+                self.side(order[0]).reduce(order[1], size, 0)
+        elif action == _MODIFY:
+            if order_id is None:
+                return
+            order = self.orders.get(order_id)
+            if order is None:
+                self._add(side, price, size, order_id)
+                return
+            old_side, old_price, old_size = order
+            if side != _BID and side != _ASK:
+                side = old_side
+            if old_price != price or old_side != side:
+                self._remove_order(order_id)
+                self.orders[order_id] = [side, price, size]
+                self.side(side).add(price, size)
+            elif size != old_size:
+                order[2] = size
+                if size > old_size:
+                    self.side(side).add(price, size - old_size, 0)
+                else:
+                    self.side(side).reduce(price, old_size - size, 0)
+        elif action == _CLEAR:
+            self.clear()
+
+    def _add(self, side: int, price: int, size: int, order_id: Optional[int]):
+        book_side = self.side(side)
+        if book_side is None:
+            self.unsided += 1
+            return
+        if order_id is not None:
+            if order_id in self.orders:
+                self._remove_order(order_id)
+            self.orders[order_id] = [side, price, size]
+        book_side.add(price, size)
+
+    def _remove_order(self, order_id: int):
+        side, price, size = self.orders.pop(order_id)
+        self.side(side).reduce(price, size)
+
+    @property
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    @property
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        """Mid of the top levels in decimal, None if either side is empty"""
+        if not self.bids.keys or not self.asks.keys:
+            return None
+        return (self.bids.keys[-1] - self.asks.keys[-1]) / 2e9
+
+    def depth(self, n: int = 10) -> Tuple[List[Level], List[Level]]:
+        """Best ``n`` bid and ask levels"""
+        return self.bids.top(n), self.asks.top(n)
+
+
+class BookEngine:
+    """
+    Rebuilds one ``OrderBook`` per instrument_id from a stream of MBO events.
+
+    Each book only accepts events in ``sequence`` order: an event behind the last applied sequence is
+    dropped as stale, a forward jump is recorded as a ``SequenceGap`` (and passed to ``on_gap``) before
+    the event is applied. Several records of one venue message may share a sequence number.
+    A CLEAR resets both the book and its sequence.
+    """
+
+    def __init__(self, venue: str, vendor: str, on_gap: Optional[Callable[[SequenceGap], None]] = None):
+        self.venue = venue
+        self.vendor = vendor
+        self.on_gap = on_gap
+        self.books: Dict[int, OrderBook] = {}
+        self.gaps: List[SequenceGap] = []
+
+    def book(self, instrument_id: int) -> OrderBook:
+        book = self.books.get(instrument_id)
+        if book is None:
+            book = self.books[instrument_id] = OrderBook(instrument_id)
+        return book
+
+    def apply(self, event: OrderBookEvent) -> OrderBook:
+        book = self.book(event.instrument_id)
+        book.symbol = event.symbol
+        self._apply(book, ord(event.action), ord(event.side), event.price, event.size, event.order_id,
+                    event.sequence, event.flags, event.ts_recv, event.ts_event)
+        return book
+
+    def apply_batch(self, batch: OrderBookEventBatch):
+        """Apply every row of a batch without materializing ``OrderBookEvent`` objects"""
+        data = batch.data
+        books = self.books
+        symbols = batch.symbols
+        book = None
+        columns = (data["instrument_id"].tolist(), data["action"].tolist(), data["side"].tolist(),
+                   data["price"].tolist(), data["size"].tolist(), data["order_id"].tolist(),
+                   data["sequence"].tolist(), data["flags"].tolist(), data["ts_recv"].tolist(),
+                   data["ts_event"].tolist())
+        for instrument_id, action, side, price, size, order_id, sequence, flags, ts_recv, ts_event in zip(*columns):
+            if book is None or book.instrument_id != instrument_id:
+                book = books.get(instrument_id)
+                if book is None:
+                    book = self.book(instrument_id)
+                    book.symbol = symbols.get(instrument_id, "")
+            self._apply(book, action, side, price, size, None if order_id == NULL_INT else order_id,
+                        sequence, flags, ts_recv, ts_event)
+
+    def _apply(self, book: OrderBook, action: int, side: int, price: int, size: int, order_id: Optional[int],
+               sequence: int, flags: int, ts_recv: int, ts_event: int):
+        last = book.last_sequence
+        if action == _CLEAR:
+            book.last_sequence = sequence
+        elif last is not None:
+            if sequence < last:
+                book.stale += 1
+                return
+            if sequence > last + 1:
+                gap = SequenceGap(book.instrument_id, last + 1, sequence, ts_recv)
+                self.gaps.append(gap)
+                if self.on_gap is not None:
+                    self.on_gap(gap)
+            book.last_sequence = sequence
+        else:
+            book.last_sequence = sequence
+
+        book.apply(action, side, price, size, order_id)
+        book.ts_recv = ts_recv
+        book.ts_event = ts_event
+        book.last_action = action
+        book.last_side = side
+        book.last_flags = flags
+        if action != _CLEAR:
+            book.last_price = price
+            book.last_size = size
+
+    def mbp1(self, instrument_id: int) -> MarketByPrice1:
+        """Top-of-book snapshot of one instrument"""
+        book = self.books[instrument_id]
+        bid = book.bids.best()
+        ask = book.asks.best()
+        return MarketByPrice1(
+            venue=self.venue,
+            vendor=self.vendor,
+            symbol=book.symbol,
+            price=book.last_price / 1e9,
+            ts_event=str(book.ts_event),
+            ts_recv=book.ts_recv,
+            action=OrderAction(chr(book.last_action)),
+            side=OrderSide(chr(book.last_side)),
+            size=book.last_size,
+            instrument_id=instrument_id,
+            sequence=book.last_sequence,
+            flags=book.last_flags,
+            bid_px_00=bid[0] / 1e9 if bid else None,
+            bid_sz_00=bid[1] if bid else None,
+            bid_ct_00=bid[2] if bid else None,
+            mid_px_00=book.mid_price,
+            ask_px_00=ask[0] / 1e9 if ask else None,
+            ask_sz_00=ask[1] if ask else None,
+            ask_ct_00=ask[2] if ask else None,
+        )
+
+    def mbp10(self, instrument_id: int) -> MarketByPrice10:
+        """Best 10 bid and ask levels of one instrument"""
+        book = self.books[instrument_id]
+        bids, asks = empty_levels(), empty_levels()
+        for array, levels in ((bids, book.bids.top(MBP10_LEVELS)), (asks, book.asks.top(MBP10_LEVELS))):
+            if levels:
+                array[:len(levels)] = levels
+                array[:len(levels), PX] /= 1e9
+        return MarketByPrice10(
+            venue=self.venue,
+            vendor=self.vendor,
+            symbol=book.symbol,
+            price=book.last_price / 1e9,
+            ts_event=str(book.ts_event),
+            ts_recv=book.ts_recv,
+            action=OrderAction(chr(book.last_action)),
+            side=OrderSide(chr(book.last_side)),
+            size=book.last_size,
+            instrument_id=instrument_id,
+            sequence=book.last_sequence,
+            flags=book.last_flags,
+            bids=bids,
+            asks=asks,
+        )
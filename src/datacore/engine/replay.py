@@ -0,0 +1,386 @@
+import time
+import heapq
+import datetime as dt
+from itertools import islice
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple, Callable, Iterable, Iterator, Any
+
+import numpy as np
+
+from datacore.models.orderbook import OrderBookEventBatch
+from datacore.models.mktdata.realtime import MarketByPrice10Batch
+
+_BATCHES = (OrderBookEventBatch, MarketByPrice10Batch)
+
+
+def to_ns(value) -> int:
+    """Epoch ns of an int, a digit string or an ISO date/datetime string (UTC)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    if isinstance(value, dt.date):
+        value = value.isoformat()
+    return int(np.datetime64(value, "ns").astype(np.int64))
+
+
+def chunked(records: Iterable, size: int = 10_000) -> Iterator[list]:
+    """Lists of up to ``size`` records of a (lazy) iterable"""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _timestamps(chunk, field: str) -> np.ndarray:
+    """int64 timestamps of every row of a chunk, ``ts_event`` when the rows have no ``field``"""
+    if isinstance(chunk, _BATCHES):
+        chunk = chunk.data
+    if isinstance(chunk, np.ndarray):
+        # Contiguous copy of the column: searchsorted on a strided field view copies it on every call.
+        return np.ascontiguousarray(chunk[field if field in chunk.dtype.names else "ts_event"], dtype=np.int64)
+    if hasattr(chunk, "num_rows"):  # pyarrow RecordBatch / Table
+        names = chunk.schema.names
+        return np.asarray(chunk.column(field if field in names else "ts_event"), dtype=np.int64)
+    if not len(chunk):
+        return np.empty(0, dtype=np.int64)
+    if not hasattr(chunk[0], field) or getattr(chunk[0], field) is None:
+        field = "ts_event"
+    values = [getattr(r, field) for r in chunk]
+    if isinstance(values[0], str) and not values[0].isdigit():
+        return np.array([v[:26] for v in values], dtype="datetime64[ns]").astype(np.int64)
+    return np.fromiter(map(int, values), dtype=np.int64, count=len(values))
+
+
+def _slice(chunk, lo: int, hi: int):
+    if hasattr(chunk, "num_rows"):
+        return chunk.slice(lo, hi - lo)
+    return chunk[lo:hi]
+
+
+def _rows(chunk) -> Iterable:
+    """Records of a chunk slice: batches materialize records, Arrow rows become dicts"""
+    if hasattr(chunk, "num_rows"):
+        return chunk.to_pylist()
+    return chunk
+
+
+def _concat(arrays: List[np.ndarray]) -> np.ndarray:
+    # np.concatenate of structured arrays re-promotes the field dtypes on every call, which dominates here.
+    out = np.empty(sum(len(a) for a in arrays), dtype=arrays[0].dtype)
+    offset = 0
+    for a in arrays:
+        out[offset:offset + len(a)] = a
+        offset += len(a)
+    return out
+
+
+def _take(slices: list, order: np.ndarray):
+    """Rows ``order`` of the concatenation of same-kind chunk slices, or None when they cannot be combined"""
+    first = slices[0]
+    if isinstance(first, np.ndarray):
+        if any(not isinstance(c, np.ndarray) or c.dtype != first.dtype for c in slices):
+            return None
+        return _concat(slices)[order]
+    if isinstance(first, OrderBookEventBatch):
+        if any(type(c) is not OrderBookEventBatch for c in slices):
+            return None
+        symbols = {}
+        for c in slices:
+            symbols.update(c.symbols)
+        return OrderBookEventBatch(_concat([c.data for c in slices])[order], symbols)
+    if isinstance(first, MarketByPrice10Batch):
+        if any(type(c) is not MarketByPrice10Batch or (c.venue, c.vendor) != (first.venue, first.vendor)
+               for c in slices):
+            return None
+        symbols = {}
+        for c in slices:
+            symbols.update(c.symbols)
+        return MarketByPrice10Batch(_concat([c.data for c in slices])[order], first.venue, first.vendor,
+                                    symbols)
+    if hasattr(first, "num_rows"):
+        import pyarrow as pa
+        if any(not hasattr(c, "num_rows") or c.schema != first.schema for c in slices):
+            return None
+        return pa.Table.from_batches([b for c in slices for b in
+                                      (c.to_batches() if hasattr(c, "to_batches") else [c])]).take(order)
+    if any(isinstance(c, _BATCHES) or isinstance(c, np.ndarray) or hasattr(c, "num_rows") for c in slices):
+        return None
+    rows = [r for c in slices for r in c]
+    return [rows[i] for i in order.tolist()]
+
+
+class ReplaySource:
+    """
+    One time-ordered stream (e.g. one instrument), read lazily one chunk at a time.
+
+    A chunk is a list of records, an ``OrderBookEventBatch``/``MarketByPrice10Batch``, a NumPy structured
+    array (e.g. ``DBNReader.iter_batches``) or a pyarrow record batch (``FileStore.iter_batches``). Rows are
+    ordered by ``time_field`` (``ts_event`` for rows without it, e.g. ``OHLCV1D``); only the current chunk
+    is held in memory.
+    """
+
+    __slots__ = ("name", "time_field", "_chunks", "chunk", "ts", "pos", "last_ts")
+
+    def __init__(self, name: str, chunks: Iterable, time_field: str = "ts_recv"):
+        self.name = name
+        self.time_field = time_field
+        self._chunks = iter(chunks)
+        self.chunk = None
+        self.ts: Optional[np.ndarray] = None
+        self.pos = 0
+        self.last_ts: Optional[int] = None
+
+    def advance(self, start: Optional[int] = None) -> bool:
+        """Load the next non-empty chunk (skipping rows before ``start``); False when exhausted"""
+        for chunk in self._chunks:
+            ts = _timestamps(chunk, self.time_field)
+            if not len(ts):
+                continue
+            if (len(ts) > 1 and (ts[1:] < ts[:-1]).any()) or (self.last_ts is not None and ts[0] < self.last_ts):
+                raise ValueError(f"Replay source {self.name!r} is not ordered by {self.time_field}")
+            self.last_ts = int(ts[-1])
+            pos = int(np.searchsorted(ts, start, "left")) if start is not None else 0
+            if pos == len(ts):
+                continue
+            self.chunk, self.ts, self.pos = chunk, ts, pos
+            return True
+        self.chunk, self.ts = None, None
+        return False
+
+    @property
+    def head(self) -> int:
+        return int(self.ts[self.pos])
+
+
+@dataclass
+class ReplayStats:
+    records: int = 0
+    blocks: int = 0
+    elapsed: float = 0.0
+    first_ts: Optional[int] = None
+    last_ts: Optional[int] = None
+
+    @property
+    def throughput(self) -> float:
+        """Records per second of wall time"""
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+
+class ReplayEngine:
+    """
+    Deterministic k-way merge of many ``ReplaySource`` streams in global timestamp order.
+
+    Rather than popping one row at a time, each step takes the horizon ``H`` = the earliest last timestamp
+    of any source's current chunk: no future chunk can hold a row before ``H``, so every loaded row before
+    it is final. A heap over the sources' next timestamps picks out the sources holding such rows, and
+    their rows are merged with one stable sort and emitted as a single block (one combined batch/array/list
+    when the sources share a kind). Equal timestamps come out in source registration order, so every
+    replay of the same sources is identical. Memory is one chunk per source regardless of stream length.
+
+    ``speed=None`` replays as fast as possible; otherwise the replay clock runs ``speed`` times wall time
+    (1.0 = real time) and rows are released when their timestamp is due. Callbacks registered with
+    ``subscribe`` receive each record (``types`` filters by record class), those registered with
+    ``subscribe_batch`` receive ``(chunk, source_ids)`` per block, where ``source_ids[i]`` indexes
+    ``sources`` for row ``i``; this avoids materializing records.
+    """
+
+    def __init__(self, speed: Optional[float] = None):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive, or None for as fast as possible")
+        self.speed = speed
+        self.sources: List[ReplaySource] = []
+        self._record_callbacks: List[Tuple[Optional[Tuple[type, ...]], Callable[[Any], None]]] = []
+        self._batch_callbacks: List[Callable[[Any, np.ndarray], None]] = []
+        self._dispatch: Dict[type, List[Callable[[Any], None]]] = {}
+        self._stopped = False
+        self.stats = ReplayStats()
+
+    def add_source(self, name: str, chunks: Iterable, time_field: str = "ts_recv") -> ReplaySource:
+        source = ReplaySource(name, chunks, time_field)
+        self.sources.append(source)
+        return source
+
+    def add_records(self, name: str, records: Iterable, time_field: str = "ts_recv",
+                    chunk_size: int = 10_000) -> ReplaySource:
+        """Source over a lazy iterable of records, read ``chunk_size`` at a time"""
+        return self.add_source(name, chunked(records, chunk_size), time_field)
+
+    def subscribe(self, callback: Callable[[Any], None], types: Optional[Iterable[type]] = None):
+        self._record_callbacks.append((tuple(types) if types is not None else None, callback))
+        self._dispatch.clear()
+
+    def subscribe_batch(self, callback: Callable[[Any, np.ndarray], None]):
+        self._batch_callbacks.append(callback)
+
+    def stop(self):
+        """Stop a running replay after the current block"""
+        self._stopped = True
+
+    def _callbacks(self, cls: type) -> List[Callable[[Any], None]]:
+        callbacks = self._dispatch.get(cls)
+        if callbacks is None:
+            callbacks = self._dispatch[cls] = [cb for types, cb in self._record_callbacks
+                                               if types is None or issubclass(cls, types)]
+        return callbacks
+
+    def blocks(self, start=None, end=None) -> Iterator[Tuple[Any, np.ndarray, np.ndarray]]:
+        """
+        Merged blocks as (chunk, timestamps, source_ids) in global order. ``start``/``end`` (inclusive) are
+        epoch ns or ISO dates/datetimes.
+        """
+        start = to_ns(start) if start is not None else None
+        end = to_ns(end) if end is not None else None
+        sources = self.sources
+        heap = []           # (next timestamp, source index)
+        chunk_end = {}      # source index -> last timestamp of its current chunk
+        for index, source in enumerate(sources):
+            if source.advance(start):
+                heap.append((source.head, index))
+                chunk_end[index] = source.last_ts
+        heapq.heapify(heap)
+        while heap:
+            horizon = min(chunk_end.values())
+            limit = horizon if end is None else min(horizon, end + 1)
+            parts = []
+            while heap and heap[0][0] < limit:
+                _, index = heapq.heappop(heap)
+                source = sources[index]
+                hi = int(np.searchsorted(source.ts, limit, "left"))
+                parts.append((index, source.pos, hi))
+            if not parts:
+                if end is not None and heap[0][0] > end:
+                    return
+                # Nothing before the horizon: the first source (by index) at it emits its rows at the horizon.
+                _, index = heapq.heappop(heap)
+                source = sources[index]
+                parts.append((index, source.pos, int(np.searchsorted(source.ts, horizon, "right"))))
+            parts.sort()
+            yield from self._merge(parts)
+            for index, lo, hi in parts:
+                source = sources[index]
+                if hi < len(source.ts):
+                    source.pos = hi
+                    heapq.heappush(heap, (int(source.ts[hi]), index))
+                elif source.advance():
+                    heapq.heappush(heap, (source.head, index))
+                    chunk_end[index] = source.last_ts
+                else:
+                    del chunk_end[index]
+
+    def _merge(self, parts: List[Tuple[int, int, int]]) -> Iterator[Tuple[Any, np.ndarray, np.ndarray]]:
+        sources = self.sources
+        if len(parts) == 1:
+            index, lo, hi = parts[0]
+            source = sources[index]
+            yield _slice(source.chunk, lo, hi), source.ts[lo:hi], np.full(hi - lo, index)
+            return
+        timestamps = np.concatenate([sources[i].ts[lo:hi] for i, lo, hi in parts])
+        ids = np.repeat([i for i, _, _ in parts], [hi - lo for _, lo, hi in parts])
+        order = np.argsort(timestamps, kind="stable")
+        slices = [_slice(sources[i].chunk, lo, hi) for i, lo, hi in parts]
+        merged = _take(slices, order)
+        if merged is not None:
+            yield merged, timestamps[order], ids[order]
+            return
+        # Sources of different kinds: emit runs of consecutive rows of one source.
+        offsets = np.cumsum([0] + [hi - lo for _, lo, hi in parts])
+        position = {i: k for k, (i, _, _) in enumerate(parts)}
+        ids, timestamps = ids[order], timestamps[order]
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        for a, b in zip(np.r_[0, bounds].tolist(), np.r_[bounds, len(ids)].tolist()):
+            k = position[int(ids[a])]
+            row = int(order[a]) - offsets[k]
+            yield _slice(slices[k], row, row + b - a), timestamps[a:b], ids[a:b]
+
+    def __iter__(self) -> Iterator[Tuple[int, str, Any]]:
+        """(timestamp, source name, record) in global order"""
+        names = [s.name for s in self.sources]
+        for chunk, timestamps, ids in self.blocks():
+            yield from zip(timestamps.tolist(), [names[i] for i in ids.tolist()], _rows(chunk))
+
+    def run(self, start=None, end=None) -> ReplayStats:
+        """Replay every source, dispatching to the subscribed callbacks; returns the replay statistics"""
+        stats = self.stats = ReplayStats()
+        self._stopped = False
+        wall_start = time.perf_counter()
+        for chunk, timestamps, ids in self.blocks(start, end):
+            if stats.first_ts is None:
+                stats.first_ts = int(timestamps[0])
+            if self.speed is not None:
+                self._run_paced(chunk, timestamps, ids, wall_start, stats.first_ts)
+            else:
+                self._dispatch_block(chunk, ids)
+            stats.records += len(timestamps)
+            stats.blocks += 1
+            stats.last_ts = int(timestamps[-1])
+            if self._stopped:
+                break
+        stats.elapsed = time.perf_counter() - wall_start
+        return stats
+
+    def _dispatch_block(self, chunk, ids: np.ndarray):
+        for callback in self._batch_callbacks:
+            callback(chunk, ids)
+        if not self._record_callbacks:
+            return
+        cls = None
+        callbacks = ()
+        for record in _rows(chunk):
+            if type(record) is not cls:
+                cls = type(record)
+                callbacks = self._callbacks(cls)
+            for callback in callbacks:
+                callback(record)
+
+    def _run_paced(self, chunk, timestamps: np.ndarray, ids: np.ndarray, wall_start: float, first_ts: int):
+        """Release the rows of a block one timestamp at a time, each when it is due on the replay clock"""
+        bounds = np.flatnonzero(np.diff(timestamps)) + 1
+        for a, b in zip(np.r_[0, bounds].tolist(), np.r_[bounds, len(timestamps)].tolist()):
+            due = wall_start + (int(timestamps[a]) - first_ts) / 1e9 / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._dispatch_block(_slice(chunk, a, b), ids[a:b])
+            if self._stopped:
+                return
+
+
+if __name__ == "__main__":
+    from datacore.models.orderbook import ORDER_BOOK_EVENT_DTYPE
+
+    n_sources, per_source, chunk_size = 500, 10_000, 4_096
+    rng = np.random.default_rng(0)
+    day = 86_400 * 10 ** 9
+
+    def source_chunks(i):
+        # Generated chunk by chunk, as a reader would, so only one chunk per source is alive.
+        local = np.random.default_rng(i)
+        ts = 0
+        for start in range(0, per_source, chunk_size):
+            n = min(chunk_size, per_source - start)
+            data = np.zeros(n, dtype=ORDER_BOOK_EVENT_DTYPE)
+            data["ts_recv"] = ts + np.cumsum(local.exponential(day / per_source, n)).astype(np.int64)
+            data["instrument_id"] = i
+            ts = int(data["ts_recv"][-1])
+            yield OrderBookEventBatch(data)
+
+    engine = ReplayEngine()
+    for i in range(n_sources):
+        engine.add_source(f"I{i}", source_chunks(i))
+    rows = [0]
+    last = [-1]
+
+    def check(batch, ids):
+        ts = batch.data["ts_recv"]
+        if ts[0] < last[0] or (np.diff(ts) < 0).any():
+            raise AssertionError("out of order")
+        last[0] = int(ts[-1])
+        rows[0] += len(batch)
+
+    engine.subscribe_batch(check)
+    stats = engine.run()
+    print(f"{n_sources} sources, {stats.records:,} rows in {stats.blocks:,} blocks: {stats.elapsed:.2f}s, "
+          f"{stats.throughput:,.0f} rows/s merged (including generating the chunks)")
@@ -5,3 +5,5 @@ from datacore.models.assets.futures import BaseFutures, Futures, FuturesOptions
 
 from datacore.models.assets.base import BaseAsset, TradingHours
 
+from datacore.models.assets.registry import InstrumentRegistry
+from datacore.models.assets.roll import RollCalendar, ExpiryRule
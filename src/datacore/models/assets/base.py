@@ -1,9 +1,18 @@
 import re
+import time
 import datetime as dt
 from zoneinfo import ZoneInfo
-from pydantic import BaseModel, field_validator, model_validator, computed_field
+from functools import cached_property
+from typing import Optional, Union, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_validator, model_validator, computed_field
 
 from datacore.models.assets.asset_type import AssetType
+from datacore.models.assets.session import SessionTable, to_epoch_ns
+
+# Days ahead compiled into a TradingHours session table
+SESSION_WINDOW_DAYS = 31
 
 
 class BaseAsset(BaseModel):
@@ -18,13 +27,27 @@ class BaseAsset(BaseModel):
     def trading_session(self) -> dt.date:
         return self.hours.trading_session
 
+    def is_open_at(self, ts: Union[int, dt.datetime]) -> bool:
+        return self.hours.is_open_at(ts)
+
+    def trading_session_at(self, ts: Union[int, dt.datetime]) -> dt.date:
+        return self.hours.trading_session_at(ts)
+
+    def tag_sessions(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.hours.tag_sessions(ts)
+
 
 class TradingHours(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     time_zone: str  # valid str values are: 'America/New_York'
     open_time_local: list[str]   # 'HH:MM:SS'
     close_time_local: list[str]  # 'HH:MM:SS'
     days: list[int] # days open, list of integer from 0-6, maximum 7 days
 
+    _sessions: Optional[SessionTable] = PrivateAttr(None)
+    _history: Optional[SessionTable] = PrivateAttr(None)
+
     @field_validator("open_time_local", "close_time_local")
     def validate_time_format(cls, v: list[str]) -> list[str]:
         """Validate each time string in the list matches HH:MM:SS format (24-hour)."""
@@ -56,53 +79,78 @@ class TradingHours(BaseModel):
         return self
 
     @computed_field
-    @property
+    @cached_property
     def tz(self) -> ZoneInfo:
         return ZoneInfo(self.time_zone)
 
-    @property
-    def is_open(self) -> bool:
+    def session_table(self, ts: Optional[int] = None) -> SessionTable:
         """
-        Returns True if the market is currently trading.
-        Uses string comparison to detect overnight sessions (e.g. '18:00:00' > '17:00:00').
+        Compiled session calendar covering ``ts`` (epoch ns, default now).
+        The table spans a rolling window of ``SESSION_WINDOW_DAYS`` and is only rebuilt once ``ts`` leaves it.
         """
-        now_local = dt.datetime.now(self.tz)
-        open_time = dt.datetime.strptime(self.open_time_local[0], "%H:%M:%S").time()
-        trading_date = self.trading_session
-
-        for open_t, close_t in zip(self.open_time_local, self.close_time_local):
-            open_dt = dt.datetime.strptime(open_t, "%H:%M:%S").time()
-            close_dt = dt.datetime.strptime(close_t, "%H:%M:%S").time()
-
-            if close_dt < open_time:
-                close_date = trading_date + dt.timedelta(days=1)
-            else:
-                close_date = trading_date
-            close_full = dt.datetime.combine(close_date, close_dt).replace(tzinfo=self.tz)
-
-            if open_dt < open_time:
-                open_date = trading_date + dt.timedelta(days=1)
-            else:
-                open_date = trading_date
-            open_full = dt.datetime.combine(open_date, open_dt).replace(tzinfo=self.tz)
-
-            if open_full < now_local < close_full:
-                return True
-        return False
+        if ts is None:
+            ts = time.time_ns()
+        table = self._sessions
+        if table is None or not table.covers(ts):
+            day = self._local_date(ts)
+            table = self._build_sessions(day - dt.timedelta(days=1), day + dt.timedelta(days=SESSION_WINDOW_DAYS))
+            self._sessions = table
+        return table
+
+    def _local_date(self, ts: int) -> dt.date:
+        return dt.datetime.fromtimestamp(ts / 1e9, self.tz).date()
+
+    def _build_sessions(self, first: dt.date, last: dt.date) -> SessionTable:
+        open_times = [dt.time.fromisoformat(t) for t in self.open_time_local]
+        close_times = [dt.time.fromisoformat(t) for t in self.close_time_local]
+        return SessionTable.build(self.tz, open_times, close_times, self.days, first, last)
+
+    def _epoch_ns(self, ts: Union[int, dt.datetime, None]) -> int:
+        if ts is None:
+            return time.time_ns()
+        if isinstance(ts, dt.datetime):
+            return to_epoch_ns(ts, self.tz)
+        return ts
+
+    @property
+    def is_open(self) -> bool:
+        """Returns True if the market is currently trading."""
+        return self.is_open_at(None)
 
     @property
     def trading_session(self) -> dt.date:
-        now = dt.datetime.now(self.tz)
-        now_hms = now.strftime("%H:%M:%S")
-        now_date = now.date()
-        first_open_time = self.open_time_local[0]
-        if now_hms < first_open_time:
-            session_date = now_date - dt.timedelta(days=1)
-        else:
-            session_date = now_date
-
-        if session_date.weekday() not in self.days:
-            while session_date.weekday() not in self.days:
-                session_date = session_date - dt.timedelta(days=1)
-        return session_date
+        """Date of the current session"""
+        return self.trading_session_at(None)
 
+    def is_open_at(self, ts: Union[int, dt.datetime, None]) -> bool:
+        """
+        Returns True if the market is trading at ``ts`` (epoch ns or datetime, None for now).
+        Open/close times earlier than the first open time belong to the next day (overnight sessions).
+        """
+        ts = self._epoch_ns(ts)
+        return self.session_table(ts).is_open(ts)
+
+    def trading_session_at(self, ts: Union[int, dt.datetime, None]) -> dt.date:
+        """Date of the session ``ts`` (epoch ns or datetime, None for now) belongs to"""
+        ts = self._epoch_ns(ts)
+        return self.session_table(ts).trading_session(ts)
+
+    def tag_sessions(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Label an int64 array of epoch ns with its trading session date (datetime64[D]) and whether the
+        market was open. Ranges outside the rolling window compile (and keep) a table spanning the array.
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        if ts.size == 0:
+            return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=bool)
+        return self.session_table_between(int(ts.min()), int(ts.max())).tag(ts)
+
+    def session_table_between(self, start: int, end: int) -> SessionTable:
+        """Compiled session calendar covering epoch ns ``start`` to ``end``, kept until a wider range is asked for"""
+        for table in (self._sessions, self._history):
+            if table is not None and table.covers(start) and table.covers(end):
+                return table
+        table = self._build_sessions(self._local_date(start) - dt.timedelta(days=1),
+                                     self._local_date(end) + dt.timedelta(days=1))
+        self._history = table
+        return table
@@ -1,13 +1,19 @@
+import time
 import datetime as dt
-from typing import Optional
+from typing import Optional, Dict, Tuple, Union
 from zoneinfo import ZoneInfo
-from pydantic import BaseModel, Field, field_validator, computed_field, model_validator
+
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, computed_field, model_validator
 
 from datacore.models.mktdata.venue import Venue
 from datacore.utils.common import CONTRACT_MONTH_CODE
 from datacore.models.mktdata.base import BaseMarketData
 from datacore.models.assets.base import BaseAsset, TradingHours
 from datacore.models.assets.asset_type import AssetType, OptionType
+from datacore.models.assets.roll import RollCalendar, ExpiryRule
+
+TERM_IN_WORD = {1: "1st", 2: "2nd", 3: "3rd"}
 
 
 class BaseFutures(BaseAsset):
@@ -19,6 +25,15 @@ class BaseFutures(BaseAsset):
     description: str = ""
     asset_type: AssetType = AssetType.FUT
     category: Optional[str] = None
+    expiry_rule: ExpiryRule = ExpiryRule.LAST_BUSINESS_DAY
+    roll_offset: int = 0  # Business days before expiry the front month rolls.
+    expiries: Dict[str, dt.date] = {}  # Contract key (CLZ26) -> expiry, overrides expiry_rule.
+
+    _roll: Optional[RollCalendar] = PrivateAttr(None)
+
+    @property
+    def root(self) -> str:
+        return self.dflow_id.rsplit(".", 1)[-1]
 
     @computed_field
     @property
@@ -31,6 +46,38 @@ class BaseFutures(BaseAsset):
         is_overnight = self.hours.open_time_local[0] > self.hours.close_time_local[-1]
         return is_overnight
 
+    def roll_calendar(self, start: Optional[int] = None, end: Optional[int] = None) -> RollCalendar:
+        """
+        Contract schedule covering every term between epoch ns ``start`` and ``end`` (default now).
+        Built once per root and only rebuilt, over the union of both ranges, when asked for more.
+        """
+        start = time.time_ns() if start is None else start
+        end = start if end is None else end
+        roll = self._roll
+        if roll is not None and roll.covers(start, self.terms) and roll.covers(end, self.terms):
+            return roll
+        tz = self.hours.tz
+        first = dt.datetime.fromtimestamp(start / 1e9, tz).year - 1
+        last = dt.datetime.fromtimestamp(end / 1e9, tz).year + self.terms // len(self.contract_months) + 2
+        if roll is not None:
+            first, last = min(first, roll.first), max(last, roll.last)
+        roll_time = dt.time.fromisoformat(self.hours.close_time_local[-1])
+        self._roll = RollCalendar.build(self.root, self.contract_months, self.contract_month_code, self.expiry_rule,
+                                        tz, roll_time, first, last, self.roll_offset, self.expiries)
+        return self._roll
+
+    def contract(self, term: int = 1, ts: Optional[int] = None) -> str:
+        """Contract code (e.g. CLZ6) that is ``term`` at ``ts`` (epoch ns, default now)"""
+        ts = time.time_ns() if ts is None else ts
+        return self.roll_calendar(ts).contract(ts, term)
+
+    def active_contracts(self, ts: np.ndarray, term: int = 1) -> np.ndarray:
+        """Contract code of ``term`` for each epoch ns of an int64 array"""
+        ts = np.asarray(ts, dtype=np.int64)
+        if not ts.size:
+            return np.empty(0, dtype=str)
+        return self.roll_calendar(int(ts.min()), int(ts.max())).active_codes(ts, term)
+
 class Futures(BaseAsset):
     parent: BaseFutures
     term: int
@@ -64,10 +111,23 @@ class Futures(BaseAsset):
     def is_open(self) -> bool:
         return self.parent.is_open
 
+    def contract(self, ts: Optional[int] = None) -> str:
+        """Contract code this term resolves to at ``ts`` (epoch ns, default now)"""
+        return self.parent.contract(self.term, ts)
+
+    def contract_expiry(self, ts: Optional[int] = None) -> dt.date:
+        """``expiry`` when set, else the expiry of the contract this term resolves to at ``ts``"""
+        if self.expiry is not None:
+            return self.expiry
+        ts = time.time_ns() if ts is None else ts
+        return self.parent.roll_calendar(ts).expiry(ts, self.term)
+
+    def active_contracts(self, ts: np.ndarray) -> np.ndarray:
+        return self.parent.active_contracts(ts, self.term)
+
     @model_validator(mode='after')
     def resolve_description(self) -> 'Futures':
-        term_in_word = {1: "1st", 2: "2nd", 3: "3rd"}
-        self.description = term_in_word.get(self.term, str(self.term) + "th") + " " + self.parent.description
+        self.description = f"{TERM_IN_WORD.get(self.term) or f'{self.term}th'} {self.parent.description}"
         return self
 
 
@@ -94,6 +154,15 @@ class FuturesOptions(BaseAsset):
     def is_open(self) -> bool:
         return self.parent.is_open
 
+    def is_open_at(self, ts: Union[int, dt.datetime]) -> bool:
+        return self.parent.is_open_at(ts)
+
+    def trading_session_at(self, ts: Union[int, dt.datetime]) -> dt.date:
+        return self.parent.trading_session_at(ts)
+
+    def tag_sessions(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.parent.tag_sessions(ts)
+
     @model_validator(mode='after')
     def resolve_description(self) -> 'FuturesOptions':
         self.description = self.parent.description + " Options"
@@ -127,5 +196,6 @@ if __name__ == "__main__":
 
     print(cme_cl_1_opt.is_open)
     print(cme_cl_1_opt)
+    print(cme_cl_1.contract(), cme_cl_1.contract_expiry())
 
 
@@ -0,0 +1,194 @@
+import os
+from typing import Optional, Dict, List, Iterable, Iterator, Union, IO
+
+import yaml
+
+from datacore.models.mktdata.venue import Venue
+from datacore.models.assets.fx import FXSpot
+from datacore.models.assets.index import Index
+from datacore.models.assets.foward import Forward
+from datacore.models.assets.asset_type import AssetType
+from datacore.models.assets.base import BaseAsset, TradingHours
+from datacore.models.assets.futures import BaseFutures, Futures, FuturesOptions
+
+# libyaml parser when available, it is several times faster than the pure-Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ASSET_CLASSES = {
+    AssetType.FX: FXSpot,
+    AssetType.INDEX: Index,
+    AssetType.FWD: Forward,
+    AssetType.FUT_OPTION: FuturesOptions,
+}
+
+
+class InstrumentRegistry:
+    """
+    Interned set of assets with O(1) lookups by dflow_id, symbol and instrument_id, and grouped
+    lookups by venue and asset type.
+
+    Assets are interned by ``dflow_id``: registering an id twice returns the first instance, and
+    ``Futures``/``FuturesOptions`` parents are swapped for the registered instance of the same id, so
+    each root exists once per process. Identical ``TradingHours`` are shared as well, which also shares
+    their compiled session table.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, BaseAsset] = {}
+        self._by_symbol: Dict[str, BaseAsset] = {}
+        self._by_instrument_id: Dict[int, BaseAsset] = {}
+        self._by_venue: Dict[Venue, List[BaseAsset]] = {}
+        self._by_type: Dict[AssetType, List[BaseAsset]] = {}
+        self._hours: Dict[tuple, TradingHours] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, dflow_id: str) -> bool:
+        return dflow_id in self._by_id
+
+    def __iter__(self) -> Iterator[BaseAsset]:
+        return iter(self._by_id.values())
+
+    def __getitem__(self, dflow_id: str) -> BaseAsset:
+        return self._by_id[dflow_id]
+
+    def get(self, dflow_id: str) -> Optional[BaseAsset]:
+        return self._by_id.get(dflow_id)
+
+    def by_symbol(self, symbol: str) -> Optional[BaseAsset]:
+        return self._by_symbol.get(symbol)
+
+    def by_instrument_id(self, instrument_id: int) -> Optional[BaseAsset]:
+        return self._by_instrument_id.get(instrument_id)
+
+    def by_venue(self, venue: Venue) -> List[BaseAsset]:
+        return self._by_venue.get(venue, [])
+
+    def by_type(self, asset_type: AssetType) -> List[BaseAsset]:
+        return self._by_type.get(asset_type, [])
+
+    def intern_hours(self, hours: TradingHours) -> TradingHours:
+        key = (hours.time_zone, tuple(hours.open_time_local), tuple(hours.close_time_local), tuple(hours.days))
+        return self._hours.setdefault(key, hours)
+
+    def add(self, asset: BaseAsset, instrument_id: Optional[int] = None) -> BaseAsset:
+        """Register an asset and return the interned instance for its dflow_id"""
+        existing = self._by_id.get(asset.dflow_id)
+        if existing is not None:
+            if instrument_id is not None:
+                self._by_instrument_id[instrument_id] = existing
+            return existing
+
+        if isinstance(asset, (Futures, FuturesOptions)):
+            parent = self.add(asset.parent)
+            if parent is not asset.parent:
+                asset.parent = parent
+        elif "hours" in type(asset).model_fields:
+            hours = self.intern_hours(asset.hours)
+            if hours is not asset.hours:
+                asset.hours = hours
+
+        self._by_id[asset.dflow_id] = asset
+        symbol = getattr(asset, "symbol", None)
+        if symbol:
+            self._by_symbol[symbol] = asset
+        if instrument_id is None:
+            instrument_id = getattr(getattr(asset, "mkt_data", None), "instrument_id", None)
+        if instrument_id is not None:
+            self._by_instrument_id[instrument_id] = asset
+        venue = getattr(asset, "venue", None)
+        if venue is not None:
+            self._by_venue.setdefault(venue, []).append(asset)
+        self._by_type.setdefault(asset.asset_type, []).append(asset)
+        return asset
+
+    def add_many(self, assets: Iterable[BaseAsset]) -> List[BaseAsset]:
+        return [self.add(asset) for asset in assets]
+
+    def build(self, data: dict) -> BaseAsset:
+        """
+        Create and register an asset from a plain dict (e.g. one YAML entry). ``parent`` may be the dflow_id
+        of an already registered asset; ``instrument_id`` is indexed but not passed to the model.
+        """
+        data = dict(data)
+        instrument_id = data.pop("instrument_id", None)
+        existing = self._by_id.get(data["dflow_id"])
+        if existing is not None:
+            return self.add(existing, instrument_id)
+
+        parent = data.get("parent")
+        if isinstance(parent, str):
+            if parent not in self._by_id:
+                raise ValueError(f"Unknown parent {parent!r} for {data['dflow_id']!r}")
+            data["parent"] = self._by_id[parent]
+        elif isinstance(parent, dict):
+            data["parent"] = self.build(parent)
+        hours = data.get("hours")
+        if isinstance(hours, dict):
+            data["hours"] = self.intern_hours(TradingHours(**hours))
+
+        asset_type = AssetType(data.get("asset_type", AssetType.FUT))
+        if asset_type is AssetType.FUT:
+            cls = Futures if "parent" in data else BaseFutures
+        elif asset_type in ASSET_CLASSES:
+            cls = ASSET_CLASSES[asset_type]
+        else:
+            raise ValueError(f"Unsupported asset_type {asset_type!r} for {data['dflow_id']!r}")
+        return self.add(cls(**data), instrument_id)
+
+    def load_yaml(self, source: Union[str, os.PathLike, IO]) -> int:
+        """
+        Load a YAML list of asset entries (or a mapping with an ``instruments`` list).
+        Parents must appear before their children. Returns the number of entries read.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source) as f:
+                entries = yaml.load(f, Loader=YAML_LOADER)
+        else:
+            entries = yaml.load(source, Loader=YAML_LOADER)
+        if isinstance(entries, dict):
+            entries = entries.get("instruments", [])
+        for entry in entries or []:
+            self.build(entry)
+        return len(entries or [])
+
+    @classmethod
+    def from_yaml(cls, *sources: Union[str, os.PathLike, IO]) -> "InstrumentRegistry":
+        registry = cls()
+        for source in sources:
+            registry.load_yaml(source)
+        return registry
+
+
+if __name__ == "__main__":
+    import time
+
+    n_roots, n_terms = 1_000, 100
+    hours = {"time_zone": "America/New_York", "open_time_local": ["18:00:00"],
+             "close_time_local": ["17:00:00"], "days": [6, 0, 1, 2, 3, 4]}
+    entries = []
+    for r in range(n_roots):
+        entries.append({"dflow_id": f"CME.R{r}", "asset_type": "fut", "terms": n_terms, "contract_size": 1000,
+                        "venue": "CME", "hours": hours, "contract_months": ["Mar", "Jun", "Sep", "Dec"],
+                        "description": f"Root {r}"})
+        entries.extend({"dflow_id": f"CME.R{r}.{t}", "parent": f"CME.R{r}", "term": t,
+                        "symbol": f"R{r}_{t}", "instrument_id": r * n_terms + t}
+                       for t in range(1, n_terms))
+    text = yaml.safe_dump(entries)
+
+    start = time.perf_counter()
+    yaml.load(text, Loader=YAML_LOADER)
+    print(f"parsed {len(entries):,} YAML entries in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    registry = InstrumentRegistry()
+    for entry in entries:
+        registry.build(entry)
+    print(f"built {len(registry):,} instruments in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for i in range(len(registry)):
+        registry.by_instrument_id(i)
+    print(f"{len(registry):,} instrument_id lookups in {time.perf_counter() - start:.3f}s")
+    print(registry.by_symbol("R7_3").description, len(registry.by_venue(Venue.CME)))
@@ -0,0 +1,172 @@
+import datetime as dt
+import calendar
+from enum import StrEnum
+from bisect import bisect_right
+from zoneinfo import ZoneInfo
+from typing import Optional, Dict, List, Iterable, Tuple
+
+import numpy as np
+
+from datacore.models.assets.session import to_epoch_ns
+
+MONTH_NUMBER = {name: i for i, name in enumerate(calendar.month_abbr) if name}
+
+
+def add_business_days(day: dt.date, n: int) -> dt.date:
+    """Move ``n`` weekdays forward (negative: backward); exchange holidays are not modelled"""
+    step = 1 if n >= 0 else -1
+    while n:
+        day += dt.timedelta(days=step)
+        if day.weekday() < 5:
+            n -= step
+    return day
+
+
+def _business_day_on_or_before(day: dt.date) -> dt.date:
+    while day.weekday() >= 5:
+        day -= dt.timedelta(days=1)
+    return day
+
+
+def _prior_month(year: int, month: int) -> Tuple[int, int]:
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+class ExpiryRule(StrEnum):
+    """Last trading day of a contract, as a function of its contract month"""
+    LAST_BUSINESS_DAY = "last_business_day"                 # Last weekday of the contract month.
+    PRIOR_MONTH_LAST_BUSINESS_DAY = "prior_month_last_business_day"
+    THIRD_FRIDAY = "third_friday"                           # Equity index futures.
+    ENERGY_25TH = "energy_25th"                             # 3 business days before the 25th of the prior month (CL).
+    BUSINESS_DAYS_BEFORE_MONTH = "business_days_before_month"   # 3 business days before the contract month (NG).
+
+    def expiry(self, year: int, month: int) -> dt.date:
+        if self is ExpiryRule.LAST_BUSINESS_DAY:
+            return _business_day_on_or_before(dt.date(year, month, calendar.monthrange(year, month)[1]))
+        if self is ExpiryRule.PRIOR_MONTH_LAST_BUSINESS_DAY:
+            return _business_day_on_or_before(dt.date(year, month, 1) - dt.timedelta(days=1))
+        if self is ExpiryRule.THIRD_FRIDAY:
+            first = dt.date(year, month, 1)
+            return first + dt.timedelta(days=(4 - first.weekday()) % 7 + 14)
+        if self is ExpiryRule.ENERGY_25TH:
+            twenty_fifth = dt.date(*_prior_month(year, month), 25)
+            return add_business_days(twenty_fifth, -3 if twenty_fifth.weekday() < 5 else -4)
+        if self is ExpiryRule.BUSINESS_DAYS_BEFORE_MONTH:
+            return add_business_days(dt.date(year, month, 1), -3)
+        raise ValueError(f"Unsupported expiry rule {self}")
+
+
+def contract_code(root: str, month_code: str, year: int) -> str:
+    """Exchange style contract code, e.g. CLZ6; repeats every 10 years, so only for display"""
+    return f"{root}{month_code}{year % 10}"
+
+
+def contract_key(root: str, month_code: str, year: int) -> str:
+    """Contract code with a two-digit year, e.g. CLZ26, unique within a century"""
+    return f"{root}{month_code}{year % 100:02d}"
+
+
+class RollCalendar:
+    """
+    Precomputed contract schedule of one futures root.
+
+    Contracts are listed in expiry order with the epoch ns at which each stops being the front month:
+    the local close of its roll date (``roll_offset`` business days before expiry). The contract that is
+    term N at ``ts`` is then ``bisect(roll_ns, ts) + N - 1``, which ``active`` does for whole ns arrays
+    with one ``searchsorted``.
+
+    ``keys`` (two-digit year, CLZ26) identify contracts; ``codes`` (CLZ6) are the exchange display codes and
+    repeat in calendars spanning more than 10 years.
+    """
+
+    __slots__ = ("root", "keys", "codes", "years", "months", "expiries", "roll_dates", "roll_ns", "key_array",
+                 "code_array", "roll_array", "first", "last")
+
+    def __init__(self, root: str, codes: List[str], years: List[int], months: List[int], expiries: List[dt.date],
+                 roll_dates: List[dt.date], roll_ns: List[int], keys: Optional[List[str]] = None):
+        self.root = root
+        self.keys = tuple(keys if keys is not None else codes)
+        self.key_array = np.array(self.keys)
+        self.codes = tuple(codes)
+        self.years = tuple(years)
+        self.months = tuple(months)
+        self.expiries = tuple(expiries)
+        self.roll_dates = tuple(roll_dates)
+        self.roll_ns = tuple(roll_ns)
+        self.code_array = np.array(codes)
+        self.roll_array = np.array(roll_ns, dtype=np.int64)
+        self.first = years[0] if years else None
+        self.last = years[-1] if years else None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def build(cls, root: str, contract_months: Iterable[str], month_codes: Iterable[str], rule: ExpiryRule,
+              tz: ZoneInfo, roll_time: dt.time, first_year: int, last_year: int, roll_offset: int = 0,
+              expiries: Optional[Dict[str, dt.date]] = None) -> "RollCalendar":
+        """
+        Schedule of contracts expiring in ``first_year`` to ``last_year``. ``expiries`` overrides the rule for
+        individual contracts (e.g. holiday-adjusted dates), keyed by ``contract_key`` (CLZ26); a display code
+        (CLZ6) is accepted only when the calendar spans 10 years or less, so it cannot match two contracts.
+        """
+        months = sorted(zip((MONTH_NUMBER[m] for m in contract_months), month_codes))
+        if not months:
+            raise ValueError(f"No contract months for {root}")
+        expiries = expiries or {}
+        if last_year - first_year >= 10:
+            keys = {contract_key(root, m, y) for y in range(first_year, last_year + 1) for _, m in months}
+            ambiguous = [code for code in expiries if code not in keys]
+            if ambiguous:
+                raise ValueError(f"Expiry overrides {ambiguous} for {root} must use two-digit years (e.g. "
+                                 f"{contract_key(root, months[0][1], last_year)}) in a calendar over 10 years")
+        rows = []
+        for year in range(first_year, last_year + 1):
+            for month, month_code in months:
+                key = contract_key(root, month_code, year)
+                code = contract_code(root, month_code, year)
+                expiry = expiries.get(key) or expiries.get(code) or ExpiryRule(rule).expiry(year, month)
+                roll_date = add_business_days(expiry, -roll_offset)
+                roll_ns = to_epoch_ns(dt.datetime.combine(roll_date, roll_time), tz)
+                rows.append((expiry, key, code, year, month, roll_date, roll_ns))
+        rows.sort()
+        expiry_list, keys, codes, years, month_list, roll_dates, roll_ns = (list(col) for col in zip(*rows))
+        return cls(root, codes, years, month_list, expiry_list, roll_dates, roll_ns, keys)
+
+    def covers(self, ts: int, term: int = 1) -> bool:
+        i = bisect_right(self.roll_ns, ts)
+        return 0 < i and i + term - 1 < len(self.codes)
+
+    def index(self, ts: int, term: int = 1) -> int:
+        """Position in ``codes`` of the contract that is ``term`` at ``ts`` (epoch ns)"""
+        i = bisect_right(self.roll_ns, ts) + term - 1
+        if i >= len(self.codes):
+            raise ValueError(f"{self.root} term {term} at {ts} is beyond the calendar ({self.codes[-1]})")
+        return i
+
+    def contract(self, ts: int, term: int = 1) -> str:
+        return self.codes[self.index(ts, term)]
+
+    def contract_key(self, ts: int, term: int = 1) -> str:
+        return self.keys[self.index(ts, term)]
+
+    def expiry(self, ts: int, term: int = 1) -> dt.date:
+        return self.expiries[self.index(ts, term)]
+
+    def active(self, ts: np.ndarray, term: int = 1) -> np.ndarray:
+        """Vectorized ``index`` over an int64 array of epoch ns"""
+        index = np.searchsorted(self.roll_array, ts, side="right") + (term - 1)
+        if index.size and index.max() >= len(self.codes):
+            raise ValueError(f"{self.root} term {term} runs beyond the calendar ({self.codes[-1]})")
+        return index
+
+    def active_codes(self, ts: np.ndarray, term: int = 1) -> np.ndarray:
+        return self.code_array[self.active(ts, term)]
+
+    def active_keys(self, ts: np.ndarray, term: int = 1) -> np.ndarray:
+        return self.key_array[self.active(ts, term)]
+
+    def rolls_between(self, start: int, end: int) -> List[Tuple[int, str, str]]:
+        """(roll ns, old front, new front) contract keys for front-month rolls in ``[start, end)``"""
+        lo, hi = bisect_right(self.roll_ns, start - 1), bisect_right(self.roll_ns, end - 1)
+        return [(self.roll_ns[i], self.keys[i], self.keys[i + 1]) for i in range(lo, min(hi, len(self.keys) - 1))]
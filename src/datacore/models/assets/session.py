@@ -0,0 +1,111 @@
+import datetime as dt
+from bisect import bisect_right
+from zoneinfo import ZoneInfo
+from typing import List, Tuple
+
+import numpy as np
+
+NS_PER_SEC = 1_000_000_000
+
+
+def to_epoch_ns(ts: dt.datetime, tz: ZoneInfo) -> int:
+    """Epoch nanoseconds of a datetime, naive datetimes are taken as local time in ``tz``"""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=tz)
+    delta = ts - dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * NS_PER_SEC + delta.microseconds * 1_000
+
+
+class SessionTable:
+    """
+    Immutable UTC session calendar of a ``TradingHours`` over a date range.
+
+    A session is dated by the day it opens (``days`` lists the weekdays a session opens on). Its anchor
+    is that day at the first ``open_time_local``; any open/close time earlier than the anchor time
+    falls on the following day, which is how overnight sessions are expressed. Everything is stored as
+    epoch nanoseconds so ``is_open``/``trading_session`` are a bisect. Answers are only valid for
+    timestamps in ``[start, end)``.
+    """
+
+    __slots__ = ("start", "end", "anchors", "dates", "opens", "closes",
+                 "anchor_array", "date_array", "open_array", "close_array")
+
+    def __init__(self, start: int, end: int, anchors: List[int], dates: List[dt.date],
+                 opens: List[int], closes: List[int]):
+        self.start = start
+        self.end = end
+        self.anchors = tuple(anchors)
+        self.dates = tuple(dates)
+        self.opens = tuple(opens)
+        self.closes = tuple(closes)
+        self.anchor_array = np.array(anchors, dtype=np.int64)
+        self.date_array = np.array(dates, dtype="datetime64[D]")
+        self.open_array = np.array(opens, dtype=np.int64)
+        self.close_array = np.array(closes, dtype=np.int64)
+
+    @classmethod
+    def build(cls, tz: ZoneInfo, open_times: List[dt.time], close_times: List[dt.time], days: List[int],
+              first: dt.date, last: dt.date) -> "SessionTable":
+        """Compile sessions covering local dates ``first`` to ``last`` inclusive"""
+        if not days:
+            raise ValueError("TradingHours.days is empty, no trading session can be resolved.")
+        first_open = open_times[0]
+        one_day = dt.timedelta(days=1)
+        anchors, dates, intervals = [], [], []
+
+        # Start a week early so the first covered timestamp always has a preceding session.
+        d = first - dt.timedelta(days=7)
+        while d <= last:
+            if d.weekday() in days:
+                anchors.append(to_epoch_ns(dt.datetime.combine(d, first_open), tz))
+                dates.append(d)
+                for open_t, close_t in zip(open_times, close_times):
+                    open_date = d + one_day if open_t < first_open else d
+                    close_date = d + one_day if close_t < first_open else d
+                    intervals.append((to_epoch_ns(dt.datetime.combine(open_date, open_t), tz),
+                                      to_epoch_ns(dt.datetime.combine(close_date, close_t), tz)))
+            d += one_day
+
+        opens, closes = [], []
+        for open_ns, close_ns in sorted(intervals):
+            if opens and open_ns < closes[-1]:
+                closes[-1] = max(closes[-1], close_ns)
+            else:
+                opens.append(open_ns)
+                closes.append(close_ns)
+
+        start = to_epoch_ns(dt.datetime.combine(first, dt.time()), tz)
+        end = to_epoch_ns(dt.datetime.combine(last + one_day, dt.time()), tz)
+        return cls(start, end, anchors, dates, opens, closes)
+
+    def covers(self, ts: int) -> bool:
+        return self.start <= ts < self.end
+
+    def is_open(self, ts: int) -> bool:
+        """True if ``ts`` (epoch ns) falls strictly inside an open/close interval"""
+        i = bisect_right(self.opens, ts) - 1
+        return i >= 0 and self.opens[i] < ts < self.closes[i]
+
+    def trading_session(self, ts: int) -> dt.date:
+        """Date of the latest session anchored at or before ``ts`` (epoch ns)"""
+        i = bisect_right(self.anchors, ts) - 1
+        if i < 0:
+            raise ValueError(f"Timestamp {ts} is before the first session in the table.")
+        return self.dates[i]
+
+    def tag(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized ``trading_session``/``is_open`` over an int64 array of epoch ns.
+        Returns (session dates as datetime64[D], in-session mask).
+        """
+        session = np.searchsorted(self.anchor_array, ts, side="right") - 1
+        if session.size and session.min() < 0:
+            raise ValueError("Timestamps before the first session in the table.")
+        i = np.searchsorted(self.open_array, ts, side="right") - 1
+        valid = i >= 0
+        i[~valid] = 0
+        in_session = valid & (ts > self.open_array[i]) & (ts < self.close_array[i])
+        return self.date_array[session], in_session
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        return list(zip(self.opens, self.closes))
@@ -0,0 +1,5 @@
+from datacore.models.execution.algo import BaseExecutionAlgo, TimeInForce
+from datacore.models.execution.order import BaseOrder, Order, OrderSide, OrderType
+from datacore.models.execution.result import Fill
+from datacore.models.execution.status import OrderStatus, StatusUpdate
+from datacore.models.execution.blotter import OrderBlotter, Position
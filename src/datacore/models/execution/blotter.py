@@ -0,0 +1,265 @@
+import os
+import pickle
+from collections import defaultdict
+from dataclasses import fields
+from enum import Enum
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from datacore.models.execution.order import Order, OrderSide
+from datacore.models.execution.result import Fill
+from datacore.models.execution.status import OrderStatus, StatusUpdate
+
+
+class Position:
+    """Net position of one (strategy, ticker) with average-cost realized PnL"""
+
+    __slots__ = ("strategy", "ticker", "quantity", "avg_price", "realized_pnl", "fees")
+
+    def __init__(self, strategy: str, ticker: str, quantity: float = 0.0, avg_price: float = 0.0,
+                 realized_pnl: float = 0.0, fees: float = 0.0):
+        self.strategy = strategy
+        self.ticker = ticker
+        self.quantity = quantity
+        self.avg_price = avg_price
+        self.realized_pnl = realized_pnl
+        self.fees = fees
+
+    def apply(self, signed_quantity: float, price: float, fee: float = 0.0):
+        """Add a signed trade; the part that reduces the position realizes PnL against the average price"""
+        self.fees += fee
+        if not signed_quantity:
+            return
+        quantity = self.quantity
+        if quantity == 0 or (quantity > 0) == (signed_quantity > 0):
+            total = quantity + signed_quantity
+            self.avg_price = (self.avg_price * quantity + price * signed_quantity) / total
+            self.quantity = total
+            return
+        closed = min(abs(signed_quantity), abs(quantity))
+        self.realized_pnl += closed * (price - self.avg_price) * (1 if quantity > 0 else -1)
+        total = quantity + signed_quantity
+        if total == 0:
+            self.avg_price = 0.0
+        elif (total > 0) != (quantity > 0):
+            # Flipped through flat, the remainder opens at the trade price
+            self.avg_price = price
+        self.quantity = total
+
+    def unrealized_pnl(self, price: float) -> float:
+        return self.quantity * (price - self.avg_price)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"Position({self.strategy!r}, {self.ticker!r}, quantity={self.quantity}, "
+                f"avg_price={self.avg_price}, realized_pnl={self.realized_pnl})")
+
+
+_ORDER_FIELDS = tuple(f.name for f in fields(Order))
+_ORDER_ENUMS = {f.name: f.type for f in fields(Order) if isinstance(f.type, type) and issubclass(f.type, Enum)}
+_ORDER_ROW = attrgetter(*_ORDER_FIELDS)
+_ENUM_COLUMNS = [(i, {member: member.value for member in _ORDER_ENUMS[name]} | {None: None})
+                 for i, name in enumerate(_ORDER_FIELDS) if name in _ORDER_ENUMS]
+
+
+def _order_row(order: Order) -> tuple:
+    row = list(_ORDER_ROW(order))
+    for i, values in _ENUM_COLUMNS:
+        row[i] = values[row[i]]
+    return tuple(row)
+
+
+class OrderBlotter:
+    """
+    In-memory blotter of orders indexed by ``order_id``, strategy, ticker and status.
+
+    Fills are applied incrementally to the order and to the (strategy, ticker) ``Position``; a fill id
+    already seen is ignored, so replayed execution reports are harmless. Indexes hold sets of order ids
+    and are updated in place on status changes, so lookups never scan the whole blotter.
+    """
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self):
+        self.orders: Dict[str, Order] = {}
+        self.positions: Dict[Tuple[str, str], Position] = {}
+        self._by_strategy: Dict[str, Set[str]] = defaultdict(set)
+        self._by_ticker: Dict[str, Set[str]] = defaultdict(set)
+        self._by_status: Dict[OrderStatus, Set[str]] = defaultdict(set)
+        self._fill_ids: Set[str] = set()
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, order_id: str):
+        return order_id in self.orders
+
+    def __iter__(self):
+        return iter(self.orders.values())
+
+    def add(self, order: Order):
+        order_id = order.order_id
+        if order_id in self.orders:
+            raise ValueError(f"Order {order_id} is already on the blotter")
+        self.orders[order_id] = order
+        self._by_strategy[order.strategy].add(order_id)
+        self._by_ticker[order.ticker].add(order_id)
+        self._by_status[order.status].add(order_id)
+
+    def add_many(self, orders: Iterable[Order]):
+        for order in orders:
+            self.add(order)
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self.orders.get(order_id)
+
+    def _set_status(self, order: Order, status: OrderStatus):
+        if status is not order.status:
+            self._by_status[order.status].discard(order.order_id)
+            self._by_status[status].add(order.order_id)
+            order.status = status
+
+    def apply_status(self, update: StatusUpdate) -> Order:
+        order = self.orders.get(update.order_id)
+        if order is None:
+            raise ValueError(f"Unknown order {update.order_id}")
+        # A late NEW/PENDING_CANCEL must not reopen an order that has already completed
+        if not order.status.is_terminal:
+            self._set_status(order, update.status)
+        order.ts_updated = max(order.ts_updated, update.ts)
+        return order
+
+    def apply_fill(self, fill: Fill) -> Optional[Order]:
+        """
+        Apply one fill to its order and position; returns None for a fill id already applied. The fill id is
+        only recorded once both updates succeeded, so a fill that raised can be retried.
+        """
+        if fill.fill_id in self._fill_ids:
+            return None
+        order = self.orders.get(fill.order_id)
+        if order is None:
+            raise ValueError(f"Fill {fill.fill_id} is for unknown order {fill.order_id}")
+        status = order.status
+        order.apply_fill(fill)
+        if order.status is not status:
+            self._by_status[status].discard(order.order_id)
+            self._by_status[order.status].add(order.order_id)
+        key = (order.strategy, order.ticker)
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = Position(*key)
+        position.apply(order.side.sign * fill.quantity, fill.price, fill.fee)
+        self._fill_ids.add(fill.fill_id)
+        return order
+
+    def apply_fills(self, fills: Iterable[Fill]) -> int:
+        """Apply fills in order; returns how many were new"""
+        apply_fill = self.apply_fill
+        return sum(apply_fill(fill) is not None for fill in fills)
+
+    def _select(self, ids: Set[str]) -> List[Order]:
+        orders = self.orders
+        return [orders[order_id] for order_id in ids]
+
+    def by_strategy(self, strategy: str) -> List[Order]:
+        return self._select(self._by_strategy.get(strategy, set()))
+
+    def by_ticker(self, ticker: str) -> List[Order]:
+        return self._select(self._by_ticker.get(ticker, set()))
+
+    def by_status(self, status: OrderStatus) -> List[Order]:
+        return self._select(self._by_status.get(OrderStatus(status), set()))
+
+    def open_orders(self, strategy: Optional[str] = None, ticker: Optional[str] = None) -> List[Order]:
+        ids = set().union(*(ids for status, ids in self._by_status.items() if status.is_open))
+        if strategy is not None:
+            ids &= self._by_strategy.get(strategy, set())
+        if ticker is not None:
+            ids &= self._by_ticker.get(ticker, set())
+        return self._select(ids)
+
+    def position(self, strategy: str, ticker: str) -> Position:
+        return self.positions.get((strategy, ticker)) or Position(strategy, ticker)
+
+    def net_position(self, ticker: str) -> float:
+        return sum(p.quantity for (_, t), p in self.positions.items() if t == ticker)
+
+    def snapshot(self, path: str):
+        """
+        Write orders, positions and applied fill ids to ``path`` (pickled tuples, atomically replaced).
+        Only ``restore`` files this process or a trusted one wrote: unpickling can execute arbitrary code.
+        """
+        state = (
+            self.SNAPSHOT_VERSION,
+            _ORDER_FIELDS,
+            # Enums are stored by value: pickling members goes through their constructor and is several
+            # times slower than the rest of the row
+            [_order_row(order) for order in self.orders.values()],
+            [tuple(getattr(p, name) for name in Position.__slots__) for p in self.positions.values()],
+            list(self._fill_ids),
+        )
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path: str) -> "OrderBlotter":
+        with open(path, "rb") as f:
+            version, names, orders, positions, fill_ids = pickle.load(f)
+        if version != cls.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported blotter snapshot version {version}")
+        decoders = [(i, {member.value: member for member in _ORDER_ENUMS[name]} | {None: None})
+                    for i, name in enumerate(names) if name in _ORDER_ENUMS]
+        positional = tuple(names) == _ORDER_FIELDS
+        blotter = cls()
+        add = blotter.add
+        for row in orders:
+            row = list(row)
+            for i, members in decoders:
+                row[i] = members[row[i]]
+            add(Order(*row) if positional else Order(**dict(zip(names, row))))
+        for values in positions:
+            position = Position(*values)
+            blotter.positions[(position.strategy, position.ticker)] = position
+        blotter._fill_ids.update(fill_ids)
+        return blotter
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    import numpy as np
+
+    n = 200_000
+    rng = np.random.default_rng(0)
+    tickers = [f"T{i}" for i in rng.integers(0, 200, n).tolist()]
+    strategies = [f"S{i}" for i in rng.integers(0, 10, n).tolist()]
+    sides = [OrderSide.BUY if b else OrderSide.SELL for b in rng.integers(0, 2, n).tolist()]
+    prices = rng.uniform(90, 110, n).round(2).tolist()
+
+    blotter = OrderBlotter()
+    start = time.perf_counter()
+    blotter.add_many(Order(str(i), tickers[i], sides[i], 100.0, price=prices[i], strategy=strategies[i],
+                           status=OrderStatus.NEW) for i in range(n))
+    elapsed = time.perf_counter() - start
+    print(f"add {n:,} orders: {n / elapsed:,.0f} orders/s")
+
+    fills = [Fill(f"f{i}-{k}", str(i), 50.0, prices[i], ts=i) for i in range(n) for k in range(2)]
+    start = time.perf_counter()
+    applied = blotter.apply_fills(fills)
+    elapsed = time.perf_counter() - start
+    print(f"apply {applied:,} fills: {applied / elapsed:,.0f} fills/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blotter.pkl")
+        start = time.perf_counter()
+        blotter.snapshot(path)
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        restored = OrderBlotter.restore(path)
+        print(f"snapshot {written:.2f}s, restore {time.perf_counter() - start:.2f}s, "
+              f"{len(restored.by_status(OrderStatus.FILLED)):,} filled")
@@ -1,7 +1,12 @@
 from enum import StrEnum
 from abc import ABC
+from typing import Optional
+from dataclasses import dataclass, fields, is_dataclass
+
 from datacore.models.assets.asset_type import AssetType
-from datacore.models.execution.algo import BaseExecutionAlgo
+from datacore.models.execution.algo import BaseExecutionAlgo, TimeInForce
+from datacore.models.execution.result import Fill
+from datacore.models.execution.status import OrderStatus
 
 
 
@@ -17,6 +22,10 @@ class OrderSide(StrEnum):
         }
         return mapping[self]
 
+    @property
+    def sign(self) -> int:
+        return 1 if self is OrderSide.BUY else -1
+
     def __str__(self):
         return self.value
 
@@ -47,6 +56,8 @@ class OrderType(StrEnum):
 
 class BaseOrder(ABC):
     """Base order models representing a financial order."""
+    __slots__ = ()
+
     order_id: str
     ticker: str
     side: OrderSide
@@ -59,4 +70,73 @@ class BaseOrder(ABC):
     strategy: str
 
     def to_dict(self):
-        return self.__dict__
\ No newline at end of file
+        if is_dataclass(self):
+            return {f.name: getattr(self, f.name) for f in fields(self)}
+        return dict(self.__dict__)
+
+
+@dataclass(slots=True, eq=False)
+class Order(BaseOrder):
+    """
+    Concrete order with its execution state. ``filled_quantity``/``avg_price`` are maintained by
+    ``apply_fill``; orders compare by identity and hash by ``order_id`` so they can live in sets.
+    """
+    order_id: str
+    ticker: str
+    side: OrderSide
+    quantity: float
+    order_type: OrderType = OrderType.LIMIT
+    price: Optional[float] = None
+    strategy: str = ""
+    security_type: Optional[AssetType] = None
+    id_type: str = ""
+    exec_algo: Optional[BaseExecutionAlgo] = None
+    time_in_force: TimeInForce = TimeInForce.DAY
+    parent_id: Optional[str] = None
+    status: OrderStatus = OrderStatus.PENDING_NEW
+    filled_quantity: float = 0.0
+    avg_price: float = 0.0
+    fees: float = 0.0
+    ts_created: int = 0  # Epoch ns
+    ts_updated: int = 0  # Epoch ns
+
+    def __hash__(self):
+        return hash(self.order_id)
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled_quantity
+
+    @property
+    def is_open(self) -> bool:
+        return self.status.is_open
+
+    @property
+    def signed_quantity(self) -> float:
+        return self.side.sign * self.quantity
+
+    @property
+    def filled_notional(self) -> float:
+        return self.filled_quantity * self.avg_price
+
+    def apply_fill(self, fill: Fill):
+        """
+        Add a fill to the filled quantity, average price and fees. An open order moves to PARTIALLY_FILLED, or
+        FILLED once the quantity is reached. Terminal statuses are final: a fill that arrives after a
+        cancel, reject or expiry (e.g. a cancel that lost the race) still counts, but the status stays.
+        A zero-quantity fill only adds its fee.
+        """
+        if fill.order_id != self.order_id:
+            raise ValueError(f"Fill {fill.fill_id} is for order {fill.order_id}, not {self.order_id}")
+        if fill.quantity < 0:
+            raise ValueError(f"Fill {fill.fill_id} has a negative quantity {fill.quantity}")
+        self.fees += fill.fee
+        self.ts_updated = max(self.ts_updated, fill.ts)
+        if not fill.quantity:
+            return
+        filled = self.filled_quantity + fill.quantity
+        self.avg_price = (self.avg_price * self.filled_quantity + fill.price * fill.quantity) / filled
+        self.filled_quantity = filled
+        if self.status.is_terminal:
+            return
+        self.status = OrderStatus.FILLED if filled >= self.quantity else OrderStatus.PARTIALLY_FILLED
\ No newline at end of file
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class Fill:
+    """Execution of (part of) an order"""
+    fill_id: str
+    order_id: str
+    quantity: float  # Unsigned, the side is the order's.
+    price: float
+    ts: int  # Epoch ns
+    fee: float = 0.0
+    liquidity: Optional[str] = None  # e.g. "MAKER" / "TAKER" when the venue reports it
+
+    @property
+    def notional(self) -> float:
+        return self.quantity * self.price
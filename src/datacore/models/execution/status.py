@@ -0,0 +1,41 @@
+from enum import StrEnum
+from dataclasses import dataclass
+from typing import Optional
+
+
+class OrderStatus(StrEnum):
+    PENDING_NEW = "PENDING_NEW"
+    NEW = "NEW"
+    PARTIALLY_FILLED = "PARTIALLY_FILLED"
+    FILLED = "FILLED"
+    PENDING_CANCEL = "PENDING_CANCEL"
+    CANCELLED = "CANCELLED"
+    REJECTED = "REJECTED"
+    EXPIRED = "EXPIRED"
+
+    @property
+    def is_terminal(self) -> bool:
+        """No further fills or status changes are expected"""
+        return self in _TERMINAL
+
+    @property
+    def is_open(self) -> bool:
+        return self not in _TERMINAL
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return self.value
+
+
+_TERMINAL = frozenset({OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.REJECTED, OrderStatus.EXPIRED})
+
+
+@dataclass(slots=True)
+class StatusUpdate:
+    """Status change of one order reported by the venue or the algo"""
+    order_id: str
+    status: OrderStatus
+    ts: int  # Epoch ns
+    reason: Optional[str] = None
@@ -1,8 +1,28 @@
+import datetime as dt
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict, fields
+from functools import lru_cache
+from operator import attrgetter
+from dataclasses import dataclass, fields
+from typing import Iterable, List, Tuple, FrozenSet, Callable
 
 
-@dataclass
+NS_PER_DAY = 86_400_000_000_000
+_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+
+
+def ns_to_date(ts: int) -> dt.date:
+    """UTC date of an epoch ns timestamp"""
+    return dt.date.fromordinal(_EPOCH_ORDINAL + ts // NS_PER_DAY)
+
+
+@lru_cache(maxsize=None)
+def record_fields(cls) -> Tuple[Tuple[str, ...], FrozenSet[str], Callable]:
+    """Field names, their set and a getter returning all field values of a record class, computed once per class"""
+    names = tuple(f.name for f in fields(cls))
+    return names, frozenset(names), attrgetter(*names)
+
+
+@dataclass(slots=True)
 class BaseMarketData(ABC):
     """Below fields are required to resolve redis key or table namee"""
     venue: str
@@ -23,16 +43,29 @@ class BaseMarketData(ABC):
 
     @classmethod
     def from_dict(cls, message: dict):
-        field_names = {f.name for f in fields(cls)}
-        filtered_data = {k: v for k, v in message.items() if k in field_names}
-        return cls(**filtered_data)
+        field_names = record_fields(cls)[1]
+        if field_names.issuperset(message):
+            return cls(**message)
+        return cls(**{k: v for k, v in message.items() if k in field_names})
+
+    @classmethod
+    def from_dict_many(cls, messages: Iterable[dict]) -> list:
+        field_names = record_fields(cls)[1]
+        return [cls(**message) if field_names.issuperset(message)
+                else cls(**{k: v for k, v in message.items() if k in field_names})
+                for message in messages]
 
     def to_dict(self) -> dict:
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        names, _, getter = record_fields(type(self))
+        return {k: v for k, v in zip(names, getter(self)) if v is not None}
+
+    @classmethod
+    def to_dict_many(cls, records: Iterable["BaseMarketData"]) -> List[dict]:
+        """to_dict of many records of this class"""
+        names, _, getter = record_fields(cls)
+        return [{k: v for k, v in zip(names, getter(record)) if v is not None} for record in records]
 
     def __repr__(self):
-        field_strs = []
-        for f in fields(self):
-            value = getattr(self, f.name)
-            field_strs.append(f"{f.name}={value!r}")
-        return f"{self.__class__.__name__}({', '.join(field_strs)})"
\ No newline at end of file
+        names, _, getter = record_fields(type(self))
+        field_strs = [f"{name}={value!r}" for name, value in zip(names, getter(self))]
+        return f"{self.__class__.__name__}({', '.join(field_strs)})"
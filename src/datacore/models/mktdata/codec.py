@@ -0,0 +1,432 @@
+"""
+Fixed-layout binary wire format for market data records.
+
+A payload holds any number of records of one type::
+
+    <B version> <B schema code | TS_INT flag> <H string table bytes> <I record count>
+    string table: utf-8 strings separated by NUL
+    [batches only: one <u4 instrument_id per symbol of the string table]
+    record count x row of the schema's little-endian, packed NumPy dtype
+
+String fields (venue, vendor, symbol, ...) are stored once in the string table and referenced by a u2
+index per row. Missing values are NaN for floats, the dtype minimum for signed and maximum for unsigned
+integers, 0 for action/side codes and ``NULL_STR`` for strings; they decode back to ``None``. Tick
+``ts_event`` travels as epoch ns and decodes as ``str`` unless the encoded records held it as ``int``,
+which the ``TS_INT`` bit of the schema code records; daily ``ts_event`` is an interned ISO date. Order book events and
+MBP-10 records travel as batches: their ``ORDER_BOOK_EVENT_DTYPE`` / ``MBP10_DTYPE`` rows are shipped as
+they are and the string table holds the batch's symbols (after venue and vendor for MBP-10).
+"""
+import struct
+import typing
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Tuple, Union, Iterable, Sequence
+
+import numpy as np
+
+from datacore.models.order import OrderSide, OrderAction
+from datacore.models.mktdata.base import BaseMarketData, record_fields
+from datacore.models.mktdata.realtime import MarketByPrice1, MarketByPrice10, MarketByPrice10Batch, MBP10_DTYPE
+from datacore.models.mktdata.historical import OHLCV1D, Option1D
+from datacore.models.orderbook import OrderBookEvent, OrderBookEventBatch, ORDER_BOOK_EVENT_DTYPE
+
+CODEC_VERSION = 1
+HEADER = struct.Struct("<BBHI")
+NULL_STR = 0xFFFF
+TS_INT = 0x80  # Set on the schema code when the encoded records held epoch ns ts_event as int
+
+MBP1_CODE = 1
+OHLCV1D_CODE = 2
+ORDER_BOOK_EVENT_CODE = 3
+MBP10_CODE = 4
+OPTION1D_CODE = 5
+
+MBP1_WIRE_DTYPE = np.dtype([
+    ("venue", "<u2"),
+    ("vendor", "<u2"),
+    ("symbol", "<u2"),
+    ("price", "<f8"),
+    ("ts_event", "<i8"),
+    ("ts_recv", "<i8"),
+    ("ts_in_delta", "<i4"),
+    ("action", "u1"),
+    ("side", "u1"),
+    ("size", "<i4"),
+    ("instrument_id", "<u4"),
+    ("publisher_id", "<u2"),
+    ("rtype", "<i2"),
+    ("sequence", "<i8"),
+    ("flags", "<i2"),
+    ("channel_id", "<i2"),
+    ("depth", "<i2"),
+    ("bid_px_00", "<f8"),
+    ("bid_sz_00", "<i4"),
+    ("bid_ct_00", "<i4"),
+    ("mid_px_00", "<f8"),
+    ("ask_px_00", "<f8"),
+    ("ask_sz_00", "<i4"),
+    ("ask_ct_00", "<i4"),
+    ("data_schema", "<u2"),
+])
+
+OHLCV1D_WIRE_DTYPE = np.dtype([
+    ("venue", "<u2"),
+    ("vendor", "<u2"),
+    ("symbol", "<u2"),
+    ("ts_event", "<u2"),  # ISO date string, interned like the other strings.
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("price", "<f8"),
+    ("volume", "<f8"),
+    ("rtype", "<i2"),
+    ("instrument_id", "<u4"),
+    ("publisher_id", "<u2"),
+])
+
+OPTION1D_WIRE_DTYPE = np.dtype([
+    ("venue", "<u2"),
+    ("vendor", "<u2"),
+    ("symbol", "<u2"),
+    ("market", "<u2"),
+    ("date", "<u2"),  # ISO date string, interned like the other strings.
+    ("contract", "<u2"),
+    ("call_put", "<u2"),
+    ("strike", "<f8"),
+    ("settlement", "<f8"),
+    ("last", "<f8"),
+])
+
+ORDER_BOOK_EVENT_WIRE_DTYPE = ORDER_BOOK_EVENT_DTYPE.newbyteorder("<")
+MBP10_WIRE_DTYPE = MBP10_DTYPE.newbyteorder("<")
+
+# Batch schemas: (in-memory dtype, wire dtype)
+_BATCHES = {ORDER_BOOK_EVENT_CODE: (ORDER_BOOK_EVENT_DTYPE, ORDER_BOOK_EVENT_WIRE_DTYPE),
+            MBP10_CODE: (MBP10_DTYPE, MBP10_WIRE_DTYPE)}
+
+# Per-field conversion between record values and wire columns.
+_STR, _NS, _CODE, _FLOAT, _INT = "str", "ns", "code", "float", "int"
+_ENUMS = {"action": OrderAction, "side": OrderSide}
+_STRUCT_CHARS = {("u", 1): "B", ("u", 2): "H", ("u", 4): "I", ("u", 8): "Q", ("i", 1): "b", ("i", 2): "h",
+                 ("i", 4): "i", ("i", 8): "q", ("f", 4): "f", ("f", 8): "d"}
+
+
+def _kind(hint, wire: np.dtype) -> str:
+    if typing.get_origin(hint) is typing.Union:
+        hint = next(a for a in typing.get_args(hint) if a is not type(None))
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return _CODE
+    if wire.kind == "f":
+        return _FLOAT
+    if hint is str:
+        # A str field on a signed column is an epoch ns timestamp kept as text (MarketByPrice1.ts_event).
+        return _STR if wire.kind == "u" else _NS
+    return _INT
+
+
+class RecordCodec:
+    """
+    Encodes and decodes records of one ``BaseMarketData`` class with a fixed wire dtype. Rows are packed
+    with a ``struct.Struct`` of the same layout as the dtype, which beats column-wise NumPy assignment for
+    Python objects; ``decode_array`` reads the same bytes as a structured array.
+    """
+
+    __slots__ = ("cls", "code", "dtype", "row", "nulls", "strs", "codes", "ns", "nullable")
+
+    def __init__(self, cls, code: int, dtype: np.dtype):
+        names = record_fields(cls)[0]
+        if tuple(dtype.names) != names:
+            raise ValueError(f"Wire dtype of {cls.__name__} must list its fields in order: {names}")
+        hints = typing.get_type_hints(cls)
+        kinds = [_kind(hints[name], dtype[name]) for name in names]
+        self.cls = cls
+        self.code = code
+        self.dtype = dtype
+        self.row = struct.Struct("<" + "".join(_STRUCT_CHARS[dtype[name].kind, dtype[name].itemsize]
+                                                for name in names))
+        if self.row.size != dtype.itemsize:
+            raise ValueError(f"Wire dtype of {cls.__name__} must be packed")
+        self.nulls = tuple(NULL_STR if kind == _STR else 0 if kind == _CODE else np.nan if kind == _FLOAT
+                           else int(np.iinfo(dtype[name]).max if dtype[name].kind == "u" else np.iinfo(dtype[name]).min)
+                           for name, kind in zip(names, kinds))
+        self.strs = tuple(i for i, kind in enumerate(kinds) if kind == _STR)
+        # Wire code -> enum member, 0 -> None
+        self.codes = tuple((i, {ord(m): m for m in _ENUMS[name]}) for i, (name, kind) in enumerate(zip(names, kinds))
+                           if kind == _CODE)
+        self.ns = tuple(i for i, kind in enumerate(kinds) if kind == _NS)
+        self.nullable = tuple(i for i, kind in enumerate(kinds) if kind in (_FLOAT, _INT, _NS))
+
+    def pack(self, records: Iterable[BaseMarketData], strings: Dict[str, int]) -> bytes:
+        """Rows of ``records``; strings are interned into ``strings`` (value -> table index)"""
+        getter = record_fields(self.cls)[2]
+        pack = self.row.pack
+        nulls, strs, codes, ns, nullable = self.nulls, self.strs, self.codes, self.ns, self.nullable
+        setdefault = strings.setdefault
+        out = []
+        for record in records:
+            values = list(getter(record))
+            for i in strs:
+                v = values[i]
+                values[i] = NULL_STR if v is None else setdefault(v, len(strings))
+            for i, _ in codes:
+                v = values[i]
+                values[i] = 0 if v is None else ord(v)
+            for i in ns:
+                v = values[i]
+                if v is not None:
+                    values[i] = int(v)
+            if None in values:
+                for i in nullable:
+                    if values[i] is None:
+                        values[i] = nulls[i]
+            out.append(pack(*values))
+        if len(strings) > NULL_STR:
+            raise ValueError(f"A payload holds at most {NULL_STR} distinct strings")
+        return b"".join(out)
+
+    def unpack(self, payload, offset: int, n_records: int, strings: Sequence[str], ts_int: bool = False) -> list:
+        """Records of ``n_records`` rows starting at ``offset``, with ``None`` for nulls; epoch ns as ``str``
+        unless ``ts_int``"""
+        end = offset + n_records * self.row.size
+        if len(payload) != end:
+            raise ValueError(f"Payload holds {len(payload) - offset} bytes of rows, expected "
+                             f"{n_records} x {self.row.size}")
+        view = memoryview(payload)[offset:end]
+        if n_records > 16:
+            return self._unpack_columns(np.frombuffer(view, dtype=self.dtype), strings, ts_int)
+        cls, nulls, strs, codes, nullable = self.cls, self.nulls, self.strs, self.codes, self.nullable
+        ns = () if ts_int else self.ns
+        out = []
+        for values in self.row.iter_unpack(view):
+            values = list(values)
+            for i in nullable:
+                v = values[i]
+                if v == nulls[i] or v != v:
+                    values[i] = None
+            for i in ns:
+                v = values[i]
+                if v is not None:
+                    values[i] = str(v)
+            for i in strs:
+                v = values[i]
+                values[i] = None if v == NULL_STR else strings[v]
+            for i, members in codes:
+                values[i] = members.get(values[i])
+            out.append(cls(*values))
+        return out
+
+    def _unpack_columns(self, rows: np.ndarray, strings: Sequence[str], ts_int: bool = False) -> list:
+        """Column-wise ``unpack`` of many rows: nulls are found per column and records built with ``map``"""
+        n = len(rows)
+        lookup = dict(enumerate(strings))
+        codes = dict(self.codes)
+        columns = []
+        for i, name in enumerate(self.dtype.names):
+            values = rows[name]
+            null = self.nulls[i]
+            if i in codes:
+                members = codes[i]
+                column = [members.get(v) for v in values.tolist()]
+            elif i in self.strs:
+                column = [lookup.get(v) for v in values.tolist()]
+            else:
+                mask = np.isnan(values) if values.dtype.kind == "f" else values == null
+                if mask.all():
+                    column = [None] * n
+                else:
+                    column = values.tolist()
+                    if mask.any():
+                        column = [None if m else v for v, m in zip(column, mask.tolist())]
+                    if i in self.ns and not ts_int:
+                        column = [None if v is None else str(v) for v in column]
+            columns.append(column)
+        return list(map(self.cls, *columns))
+
+
+CODECS: Dict[type, RecordCodec] = {
+    MarketByPrice1: RecordCodec(MarketByPrice1, MBP1_CODE, MBP1_WIRE_DTYPE),
+    OHLCV1D: RecordCodec(OHLCV1D, OHLCV1D_CODE, OHLCV1D_WIRE_DTYPE),
+    Option1D: RecordCodec(Option1D, OPTION1D_CODE, OPTION1D_WIRE_DTYPE),
+}
+_BY_CODE: Dict[int, RecordCodec] = {codec.code: codec for codec in CODECS.values()}
+
+
+def _pack(code: int, strings: Iterable[str], n_records: int, rows: bytes, extra: bytes = b"") -> bytes:
+    table = "\0".join(strings).encode()
+    if len(table) > 0xFFFF:
+        raise ValueError("String table of a payload exceeds 64KiB")
+    return b"".join((HEADER.pack(CODEC_VERSION, code, len(table), n_records), table, extra, rows))
+
+
+@lru_cache(maxsize=4_096)
+def _string_table(table: bytes) -> Tuple[str, ...]:
+    # Payloads of one key repeat the same table, so it is only split and decoded once.
+    return tuple(table.decode().split("\0")) if table else ()
+
+
+def _unpack_header(payload: Union[bytes, memoryview]) -> Tuple[int, Tuple[str, ...], int, int]:
+    """Schema code (without ``TS_INT``), string table, record count and offset of whatever follows the string table"""
+    if len(payload) < HEADER.size:
+        raise ValueError("Payload shorter than the codec header")
+    version, code, table_size, n_records = HEADER.unpack_from(payload, 0)
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported codec version {version}, expected {CODEC_VERSION}")
+    offset = HEADER.size + table_size
+    return code & ~TS_INT, _string_table(bytes(payload[HEADER.size:offset])), n_records, offset
+
+
+def _rows(payload, dtype: np.dtype, n_records: int, offset: int) -> np.ndarray:
+    if len(payload) - offset != n_records * dtype.itemsize:
+        raise ValueError(f"Payload holds {len(payload) - offset} bytes of rows, expected "
+                         f"{n_records} x {dtype.itemsize}")
+    return np.frombuffer(payload, dtype=dtype, count=n_records, offset=offset)
+
+
+Batch = Union[OrderBookEventBatch, MarketByPrice10Batch]
+
+
+def _prefix(code: int) -> int:
+    """Strings ahead of the symbols in the table of a batch payload (venue and vendor of MBP-10)"""
+    return 2 if code == MBP10_CODE else 0
+
+
+def encode_batch(batch: Batch) -> bytes:
+    """Payload of an order book event or MBP-10 batch and its instrument_id -> symbol map"""
+    if isinstance(batch, MarketByPrice10Batch):
+        code, prefix = MBP10_CODE, [batch.venue, batch.vendor]
+    else:
+        code, prefix = ORDER_BOOK_EVENT_CODE, []
+    instruments = np.unique(batch.data["instrument_id"])
+    symbols = [batch.symbols.get(int(i), "") for i in instruments]
+    rows = batch.data.astype(_BATCHES[code][1], copy=False).tobytes()
+    return _pack(code, prefix + symbols, len(batch), rows, instruments.astype("<u4").tobytes())
+
+
+def decode_batch(payload: Union[bytes, memoryview]) -> Batch:
+    code, strings, n_records, offset = _unpack_header(payload)
+    if code not in _BATCHES:
+        raise ValueError(f"Payload holds schema code {code}, not a batch")
+    dtype, wire = _BATCHES[code]
+    prefix = _prefix(code)
+    instruments = np.frombuffer(payload, dtype="<u4", count=len(strings) - prefix, offset=offset)
+    rows = _rows(payload, wire, n_records, offset + instruments.nbytes).astype(dtype)
+    symbols = dict(zip(instruments.tolist(), strings[prefix:]))
+    if code == MBP10_CODE:
+        return MarketByPrice10Batch(rows, strings[0], strings[1], symbols)
+    return OrderBookEventBatch(rows, symbols)
+
+
+def _ts_int(records: Sequence) -> int:
+    return TS_INT if isinstance(records[0].ts_event, int) else 0
+
+
+def encode(records: Union[Sequence[BaseMarketData], Sequence[OrderBookEvent], Batch]) -> bytes:
+    """
+    Payload of records of one class (``MarketByPrice1``, ``MarketByPrice10``, ``OHLCV1D``, ``Option1D`` or
+    ``OrderBookEvent``) or of a batch
+    """
+    if isinstance(records, (OrderBookEventBatch, MarketByPrice10Batch)):
+        return encode_batch(records)
+    records = records if isinstance(records, (list, tuple)) else list(records)
+    if not records:
+        raise ValueError("Cannot encode no records: the record class is unknown")
+    cls = type(records[0])
+    if cls is OrderBookEvent:
+        return encode_batch(OrderBookEventBatch.from_events(records))
+    if cls is MarketByPrice10:
+        payload = encode_batch(MarketByPrice10Batch.from_records(records))
+        return payload[:1] + bytes((payload[1] | _ts_int(records),)) + payload[2:]
+    codec = CODECS.get(cls)
+    if codec is None:
+        raise ValueError(f"No wire format for {cls.__name__}")
+    strings: Dict[str, int] = {}
+    rows = codec.pack(records, strings)
+    return _pack(codec.code | (_ts_int(records) if codec.ns else 0), strings, len(records), rows)
+
+
+def decode(payload: Union[bytes, memoryview]) -> list:
+    """Records of a payload, as instances of the class they were encoded from"""
+    code, strings, n_records, offset = _unpack_header(payload)
+    ts_int = bool(payload[1] & TS_INT)
+    if code in _BATCHES:
+        records = list(decode_batch(payload))
+        if ts_int and code == MBP10_CODE:
+            for record in records:
+                record.ts_event = int(record.ts_event)
+        return records
+    codec = _BY_CODE.get(code)
+    if codec is None:
+        raise ValueError(f"Unknown schema code {code}")
+    return codec.unpack(payload, offset, n_records, strings, ts_int)
+
+
+def decode_array(payload: Union[bytes, memoryview]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """
+    Zero-copy read-only structured array over the rows of a payload and its string table, for consumers
+    that work on columns. Batch payloads return rows of their ``*_WIRE_DTYPE``.
+    """
+    code, strings, n_records, offset = _unpack_header(payload)
+    if code in _BATCHES:
+        offset += 4 * (len(strings) - _prefix(code))
+        return _rows(payload, _BATCHES[code][1], n_records, offset), strings
+    codec = _BY_CODE.get(code)
+    if codec is None:
+        raise ValueError(f"Unknown schema code {code}")
+    return _rows(payload, codec.dtype, n_records, offset), strings
+
+
+@lru_cache(maxsize=None)
+def wire_size(cls) -> int:
+    """Bytes per record of ``cls`` on the wire, excluding the header and string table"""
+    if cls is OrderBookEvent:
+        return ORDER_BOOK_EVENT_WIRE_DTYPE.itemsize
+    if cls is MarketByPrice10:
+        return MBP10_WIRE_DTYPE.itemsize
+    return CODECS[cls].dtype.itemsize
+
+
+if __name__ == "__main__":
+    import time
+
+    n = 200_000
+    rng = np.random.default_rng(0)
+    mid = 70 + np.cumsum(rng.normal(0, 0.01, n)).round(2)
+    records = [MarketByPrice1(venue="CME", vendor="databento", symbol=("CLZ6", "CLF7")[i % 2], price=float(mid[i]),
+                              ts_event=str(1_760_000_000_000_000_000 + i * 1_000), ts_recv=1_760_000_000_000_001_000 + i * 1_000,
+                              ts_in_delta=15_000, action=OrderAction.TRADE, side=OrderSide.BID, size=3,
+                              instrument_id=42 + i % 2, publisher_id=1, rtype=1, sequence=1_000 + i, flags=128,
+                              channel_id=0, depth=0, bid_px_00=float(mid[i]) - 0.01, bid_sz_00=10, bid_ct_00=4,
+                              ask_px_00=float(mid[i]) + 0.01, ask_sz_00=12, ask_ct_00=5)
+               for i in range(n)]
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return result, n / (time.perf_counter() - start)
+
+    hashes, string_encode = timed(lambda: [r.to_dict_redis() for r in records])
+    string_size = sum(len(k) + len(v) for k, v in hashes[0].items())
+
+    def parse(mapping):
+        return MarketByPrice1(venue="CME", vendor="databento", symbol="CLZ6",
+                              **{k: (None if not v else int(v) if k in ("ts_recv", "ts_in_delta", "size", "instrument_id",
+                                                                         "publisher_id", "rtype", "sequence", "flags",
+                                                                         "channel_id", "depth", "bid_sz_00", "bid_ct_00",
+                                                                         "ask_sz_00", "ask_ct_00")
+                                        else v if k in ("ts_event", "action", "side") else float(v))
+                                 for k, v in mapping.items() if k != "venue"})
+
+    _, string_decode = timed(lambda: [parse(h) for h in hashes])
+    payload, batch_encode = timed(lambda: encode(records))
+    decoded, batch_decode = timed(lambda: decode(payload))
+    assert decoded == records
+    singles, single_encode = timed(lambda: [encode((r,)) for r in records])
+    _, single_decode = timed(lambda: [decode(p) for p in singles])
+    _, array_decode = timed(lambda: decode_array(payload))
+
+    print(f"{'':24}{'encode/s':>14}{'decode/s':>14}{'bytes/record':>14}")
+    print(f"{'str hash (to_dict_redis)':24}{string_encode:>14,.0f}{string_decode:>14,.0f}{string_size:>14}")
+    print(f"{'binary, one per payload':24}{single_encode:>14,.0f}{single_decode:>14,.0f}{len(singles[0]):>14}")
+    print(f"{'binary, batch':24}{batch_encode:>14,.0f}{batch_decode:>14,.0f}{len(payload) / n:>14.1f}")
+    print(f"{'binary, batch to array':24}{'':>14}{array_decode:>14,.0f}")
@@ -13,3 +13,15 @@ class Frequency(StrEnum):
     DAY_1 = "1day"
     WEEK_1 = "1week"
     MONTH_1 = "1month"
+
+    @property
+    def nanoseconds(self):
+        """Fixed bar length in ns, None for tick data and calendar frequencies (day, week, month)"""
+        nanoseconds_map = {
+            Frequency.SEC_1: 1_000_000_000,
+            Frequency.MIN_1: 60_000_000_000,
+            Frequency.MIN_5: 300_000_000_000,
+            Frequency.MIN_15: 900_000_000_000,
+            Frequency.HOUR_1: 3_600_000_000_000,
+        }
+        return nanoseconds_map.get(self)
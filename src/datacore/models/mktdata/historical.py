@@ -5,7 +5,7 @@ from dataclasses import dataclass,fields
 from datacore.models.mktdata.base import BaseMarketData
 from datacore.models.mktdata.schema import MktDataSchema
 
-@dataclass
+@dataclass(slots=True)
 class OHLCV1D(BaseMarketData):
 
     ts_event: str
@@ -32,10 +32,10 @@ class OHLCV1D(BaseMarketData):
         return f"{self.data_schema}:{self.vendor}:{self.symbol}"
 
     def file_name(self):
-        pass
+        return f"{self.venue}/{self.vendor}/{self.data_schema}/{self.symbol}/{self.ts_event[:4]}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Option1D(BaseMarketData):
     market: str
     date: str
@@ -45,11 +45,14 @@ class Option1D(BaseMarketData):
     settlement: float
     last: Optional[float] = None
 
+    data_schema = MktDataSchema.OPTION_1D
+    db_key = ("date", "contract", "call_put", "strike")
+
     def db_table_name(self):
-        pass
+        return f"{self.venue}_{self.symbol}_{self.vendor}_{self.data_schema}"
 
     def redis_name(self):
         pass
 
     def file_name(self):
-        pass
+        return f"{self.venue}/{self.vendor}/{self.data_schema}/{self.symbol}/{self.date[:4]}"
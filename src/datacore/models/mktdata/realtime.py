@@ -1,12 +1,21 @@
-from typing import Optional
-from dataclasses import dataclass, fields, asdict
+from typing import Optional, Dict, List, Iterable, Iterator
+from dataclasses import dataclass, field, fields
 
-from datacore.models.mktdata.base import BaseMarketData
+import numpy as np
+
+from datacore.models.mktdata.base import BaseMarketData, record_fields, ns_to_date
+from datacore.models.orderbook import NULL_INT
 from datacore.models.order import OrderSide, OrderAction
 from datacore.models.mktdata.schema import MktDataSchema
 
 
-@dataclass
+# Table key of tick schemas. Ticks can share every always-present field (ts_event, price) and their
+# event fields (sequence, action, side, size) are optional, so tick tables have no natural key: an empty
+# db_key gives them a surrogate row id and rows are appended.
+TICK_KEY = ()
+
+
+@dataclass(slots=True)
 class MarketByPrice1(BaseMarketData):
     price: float
     ts_event: str  # Capture server received timestamp expressed as the number of nanoseconds since the UNIX epoch.
@@ -40,11 +49,14 @@ class MarketByPrice1(BaseMarketData):
 
     data_schema: str = MktDataSchema.MBP_1
 
+    db_key = TICK_KEY
+
     def to_dict_redis(self):
         ignore_fields = {"vendor", "symbol", "data_schema"}
+        names, _, getter = record_fields(type(self))
         return {
             k: str(v) if v is not None else ""
-            for k, v in asdict(self).items()
+            for k, v in zip(names, getter(self))
             if k not in ignore_fields
         }
 
@@ -55,4 +67,295 @@ class MarketByPrice1(BaseMarketData):
         return f"rt:{self.vendor}:{self.symbol}"
 
     def file_name(self):
-        pass
\ No newline at end of file
+        return f"{self.venue}/{self.vendor}/{self.data_schema}/{self.symbol}/{ns_to_date(int(self.ts_event))}"
+
+
+MBP10_LEVELS = 10
+PX, SZ, CT = 0, 1, 2  # Columns of a (levels, 3) side array: price, size, order count.
+
+
+def empty_levels(n: Optional[int] = None) -> np.ndarray:
+    """Side array(s) with no levels: NaN prices, zero sizes and counts"""
+    shape = (MBP10_LEVELS, 3) if n is None else (n, MBP10_LEVELS, 3)
+    levels = np.zeros(shape)
+    levels[..., PX] = np.nan
+    return levels
+
+
+def microprice(bids: np.ndarray, asks: np.ndarray):
+    """Top-of-book mid weighted by the opposite size: (bid_px * ask_sz + ask_px * bid_sz) / (bid_sz + ask_sz)"""
+    bid, ask = bids[..., 0, :], asks[..., 0, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (bid[..., PX] * ask[..., SZ] + ask[..., PX] * bid[..., SZ]) / (bid[..., SZ] + ask[..., SZ])
+
+
+def imbalance(bids: np.ndarray, asks: np.ndarray, levels: int = MBP10_LEVELS):
+    """(bid size - ask size) / (bid size + ask size) over the best ``levels`` levels, in [-1, 1]"""
+    bid = bids[..., :levels, SZ].sum(axis=-1)
+    ask = asks[..., :levels, SZ].sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (bid - ask) / (bid + ask)
+
+
+def cumulative_depth(side: np.ndarray) -> np.ndarray:
+    """Size available up to and including each level"""
+    return np.cumsum(side[..., SZ], axis=-1)
+
+
+@dataclass(slots=True, eq=False)
+class MarketByPrice10(BaseMarketData):
+    """
+    MBP-10 record: the event fields of ``MarketByPrice1`` plus the best 10 levels of each side as
+    ``(10, 3)`` float arrays of (price, size, count). Missing levels have a NaN price and zero size.
+    """
+    price: float
+    ts_event: str  # Matching engine received timestamp expressed as the number of nanoseconds since the UNIX epoch.
+
+    ts_recv: Optional[int] = None  # Capture server received timestamp expressed as the number of nanoseconds since the UNIX epoch.
+    ts_in_delta: Optional[int] = None  # The matching-engine-sending timestamp expressed as the number of nanoseconds before ts_recv.
+
+    action: Optional[OrderAction] = None  # Event action. Can be Add, Cancel, Modify, Clear book, or Trade.
+    side: Optional[OrderSide] = None  # Side that initiates the event.
+    size: Optional[int] = None  # Order quantity.
+
+    instrument_id: Optional[int] = None  # Numeric instrument ID.
+    publisher_id: Optional[int] = None  # Publisher ID assigned by Databento, which denotes dataset and venue.
+    rtype: Optional[int] = None  # Record type. Each schema corresponds with a single rtype value.
+    sequence: Optional[int] = None  # Message sequence number assigned at the venue.
+    flags: Optional[int] = None  # A bit field indicating event end, message characteristics, and data quality.
+    channel_id: Optional[int] = None  # The channel ID assigned by Databento as an incrementing integer starting at zero.
+    depth: Optional[int] = None  # Book level where the update event occurred.
+
+    bids: np.ndarray = field(default_factory=empty_levels)  # Best bid levels, best first.
+    asks: np.ndarray = field(default_factory=empty_levels)  # Best ask levels, best first.
+
+    data_schema: str = MktDataSchema.MBP_10
+
+    # Array fields stored as one column per level and value, e.g. bid_px_00 ... bid_ct_09
+    array_columns = {"bids": (("bid_px", float), ("bid_sz", int), ("bid_ct", int)),
+                     "asks": (("ask_px", float), ("ask_sz", int), ("ask_ct", int))}
+
+    db_key = TICK_KEY
+
+    @property
+    def mid_price(self) -> float:
+        return (self.bids[0, PX] + self.asks[0, PX]) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.asks[0, PX] - self.bids[0, PX]
+
+    @property
+    def microprice(self) -> float:
+        return float(microprice(self.bids, self.asks))
+
+    def imbalance(self, levels: int = MBP10_LEVELS) -> float:
+        return float(imbalance(self.bids, self.asks, levels))
+
+    def cumulative_depth(self) -> np.ndarray:
+        """(2, 10) cumulative bid and ask size by level"""
+        return np.stack([cumulative_depth(self.bids), cumulative_depth(self.asks)])
+
+    def to_dict_redis(self):
+        """Scalar fields as strings, each side as its 30 comma separated values (``np.fromstring(sep=",")``)"""
+        ignore_fields = {"vendor", "symbol", "data_schema", "bids", "asks"}
+        names, _, getter = record_fields(type(self))
+        out = {k: str(v) if v is not None else "" for k, v in zip(names, getter(self)) if k not in ignore_fields}
+        out["bids"] = ",".join(map(repr, self.bids.ravel().tolist()))
+        out["asks"] = ",".join(map(repr, self.asks.ravel().tolist()))
+        return out
+
+    def db_table_name(self):
+        return f"{self.venue}_{self.vendor}_{self.data_schema}_{self.symbol}"
+
+    def redis_name(self):
+        return f"rt:{self.vendor}:{self.symbol}:{self.data_schema}"
+
+    def file_name(self):
+        return f"{self.venue}/{self.vendor}/{self.data_schema}/{self.symbol}/{ns_to_date(int(self.ts_event))}"
+
+
+MBP10_DTYPE = np.dtype([
+    ("ts_recv", np.int64),
+    ("ts_event", np.int64),
+    ("ts_in_delta", np.int32),
+    ("instrument_id", np.uint32),
+    ("publisher_id", np.uint16),
+    ("rtype", np.uint8),
+    ("sequence", np.uint32),
+    ("action", np.uint8),
+    ("side", np.uint8),
+    ("price", np.float64),
+    ("size", np.uint32),
+    ("flags", np.uint8),
+    ("channel_id", np.int16),
+    ("depth", np.int16),
+    ("bids", np.float64, (MBP10_LEVELS, 3)),
+    ("asks", np.float64, (MBP10_LEVELS, 3)),
+])
+
+_MBP10_SCALARS = [name for name in MBP10_DTYPE.names if name not in ("bids", "asks")]
+_MBP10_OPTIONAL = ("channel_id", "depth")
+
+
+class MarketByPrice10Batch:
+    """
+    MBP-10 records of one venue and vendor in a single NumPy structured array, levels as ``(n, 10, 3)``
+    sub-arrays, so book metrics are computed for every row at once. Symbols are resolved from ``symbols``
+    (instrument_id -> symbol) when records are materialized, as in ``OrderBookEventBatch``, so every record
+    packed into a batch needs an ``instrument_id`` and one symbol per id.
+    """
+
+    __slots__ = ("data", "venue", "vendor", "symbols")
+
+    def __init__(self, data: np.ndarray, venue: str, vendor: str, symbols: Optional[Dict[int, str]] = None):
+        if data.dtype != MBP10_DTYPE:
+            raise ValueError(f"Expected dtype {MBP10_DTYPE}, got {data.dtype}")
+        self.data = data
+        self.venue = venue
+        self.vendor = vendor
+        self.symbols = symbols if symbols is not None else {}
+
+    @classmethod
+    def empty(cls, size: int, venue: str, vendor: str, symbols: Optional[Dict[int, str]] = None) -> "MarketByPrice10Batch":
+        data = np.zeros(size, dtype=MBP10_DTYPE)
+        data["action"] = ord(OrderAction.NONE)
+        data["side"] = ord(OrderSide.NONE)
+        for name in _MBP10_OPTIONAL:
+            data[name] = NULL_INT
+        data["bids"][..., PX] = np.nan
+        data["asks"][..., PX] = np.nan
+        return cls(data, venue, vendor, symbols)
+
+    @classmethod
+    def from_records(cls, records: Iterable[MarketByPrice10]) -> "MarketByPrice10Batch":
+        records = list(records)
+        if not records:
+            raise ValueError("Cannot build an MBP-10 batch from no records")
+        venue, vendor = records[0].venue, records[0].vendor
+        if any(r.venue != venue or r.vendor != vendor for r in records):
+            raise ValueError("An MBP-10 batch holds records of one venue and vendor")
+        symbols = {}
+        for r in records:
+            if r.instrument_id is None:
+                raise ValueError(f"MBP-10 record of {r.symbol} has no instrument_id to resolve its symbol in a batch")
+            if symbols.setdefault(r.instrument_id, r.symbol) != r.symbol:
+                raise ValueError(f"instrument_id {r.instrument_id} maps to both {symbols[r.instrument_id]} "
+                                 f"and {r.symbol}")
+        batch = cls.empty(len(records), venue, vendor, symbols)
+        data = batch.data
+        for name in _MBP10_SCALARS:
+            values = [getattr(r, name) for r in records]
+            if name in ("action", "side"):
+                values = [ord(OrderAction.NONE if name == "action" else OrderSide.NONE) if v is None else ord(v)
+                          for v in values]
+            elif name == "ts_event":
+                values = [int(v) for v in values]
+            else:
+                null = np.nan if data.dtype[name].kind == "f" else NULL_INT if name in _MBP10_OPTIONAL else 0
+                values = [null if v is None else v for v in values]
+            data[name] = values
+        data["bids"] = np.stack([r.bids for r in records])
+        data["asks"] = np.stack([r.asks for r in records])
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, item):
+        """An integer returns a ``MarketByPrice10``; anything else a batch of the selected rows"""
+        if isinstance(item, (int, np.integer)):
+            return self.record(int(item))
+        return MarketByPrice10Batch(self.data[item], self.venue, self.vendor, self.symbols)
+
+    def __iter__(self) -> Iterator[MarketByPrice10]:
+        for i in range(len(self.data)):
+            yield self.record(i)
+
+    def record(self, i: int) -> MarketByPrice10:
+        row = self.data[i]
+        values = {name: row[name].item() for name in _MBP10_SCALARS}
+        for name in _MBP10_OPTIONAL:
+            if values[name] == NULL_INT:
+                values[name] = None
+        values["action"] = OrderAction(chr(values["action"]))
+        values["side"] = OrderSide(chr(values["side"]))
+        values["ts_event"] = str(values["ts_event"])
+        return MarketByPrice10(venue=self.venue, vendor=self.vendor,
+                               symbol=self.symbols.get(values["instrument_id"], ""),
+                               bids=row["bids"].copy(), asks=row["asks"].copy(), **values)
+
+    def to_records(self) -> List[MarketByPrice10]:
+        return list(self)
+
+    @property
+    def bids(self) -> np.ndarray:
+        return self.data["bids"]
+
+    @property
+    def asks(self) -> np.ndarray:
+        return self.data["asks"]
+
+    @property
+    def mid_price(self) -> np.ndarray:
+        return (self.bids[:, 0, PX] + self.asks[:, 0, PX]) / 2
+
+    @property
+    def spread(self) -> np.ndarray:
+        return self.asks[:, 0, PX] - self.bids[:, 0, PX]
+
+    @property
+    def microprice(self) -> np.ndarray:
+        return microprice(self.bids, self.asks)
+
+    def imbalance(self, levels: int = MBP10_LEVELS) -> np.ndarray:
+        return imbalance(self.bids, self.asks, levels)
+
+    def cumulative_depth(self) -> np.ndarray:
+        """(n, 2, 10) cumulative bid and ask size by level"""
+        return np.stack([cumulative_depth(self.bids), cumulative_depth(self.asks)], axis=1)
+
+    def depth_within(self, distance: float) -> np.ndarray:
+        """(n, 2) bid and ask size priced within ``distance`` of each row's mid"""
+        mid = self.mid_price[:, None]
+        with np.errstate(invalid="ignore"):
+            bid = np.where(self.bids[..., PX] >= mid - distance, self.bids[..., SZ], 0.0).sum(axis=1)
+            ask = np.where(self.asks[..., PX] <= mid + distance, self.asks[..., SZ], 0.0).sum(axis=1)
+        return np.stack([bid, ask], axis=1)
+
+
+if __name__ == "__main__":
+    import time
+    from dataclasses import asdict
+
+    message = {"venue": "CME", "vendor": "databento", "symbol": "CLZ6", "price": 70.12, "ts_event": "1760000000000000000",
+               "ts_recv": 1760000000000001000, "size": 3, "instrument_id": 42, "sequence": 1001, "flags": 128,
+               "bid_px_00": 70.11, "bid_sz_00": 10, "ask_px_00": 70.13, "ask_sz_00": 12, "extra": "ignored"}
+    n = 200_000
+
+    def from_dict_baseline(cls, msg):
+        field_names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in msg.items() if k in field_names})
+
+    def to_dict_baseline(record):
+        return {k: v for k, v in asdict(record).items() if v is not None}
+
+    start = time.perf_counter()
+    records = [from_dict_baseline(MarketByPrice1, message) for _ in range(n)]
+    for record in records:
+        to_dict_baseline(record)
+    baseline = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    records = [MarketByPrice1.from_dict(message) for _ in range(n)]
+    for record in records:
+        record.to_dict()
+    single = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    records = MarketByPrice1.from_dict_many(message for _ in range(n))
+    MarketByPrice1.to_dict_many(records)
+    batch = n / (time.perf_counter() - start)
+
+    print(f"from_dict + to_dict, messages/sec: fields()/asdict {baseline:,.0f}, cached {single:,.0f}, "
+          f"batch {batch:,.0f}")
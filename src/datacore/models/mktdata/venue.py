@@ -12,12 +12,15 @@ class Venue(StrEnum):
 
     def ccy(self) -> str:
         """Return the default quote currency for the venue"""
-        mapping = {
-            "LME": "USD",
-            "CME": "USD",
-            "ICE": "USD",
-            "GLOBAL": "USD",
-            "SGX": "USD",  # most SGX contracts are USD, some may be SGD depending on contract
-            "ONYX": "USD",  # placeholder, depends on your internal setup
-        }
-        return mapping[str(self.value)]
+        return _VENUE_CCY[self._value_]
+
+
+# Built once: ``ccy`` is called per position when revaluing portfolios
+_VENUE_CCY = {
+    "LME": "USD",
+    "CME": "USD",
+    "ICE": "USD",
+    "GLOBAL": "USD",
+    "SGX": "USD",  # most SGX contracts are USD, some may be SGD depending on contract
+    "ONYX": "USD",  # placeholder, depends on your internal setup
+}
@@ -1,6 +1,8 @@
 import datetime as dt
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Literal
+from typing import Optional, Dict, Any, List, Literal, Iterable, Iterator
+
+import numpy as np
 
 from .order import OrderSide, OrderAction
 
@@ -33,6 +35,7 @@ class OrderBookEvent:
     flags: int            # A bit field indicating event end, message characteristics, and data quality.
     channel_id: Optional[int] = None  # The channel ID assigned by Databento as an incrementing integer starting at zero.
     depth: Optional[int] = None  # Book level where the update event occurred.
+    order_id: Optional[int] = None  # Order ID assigned at the venue.
 
     # Top-of-book state
     bid_px_00: Optional[float] = None  # Bid price at the top level.
@@ -66,3 +69,163 @@ class OrderBookEvent:
     def is_book_update(self) -> bool:
         """Check if this is a book update event"""
         return self.action in [OrderAction.ADD, OrderAction.CANCEL, OrderAction.MODIFY]
+
+
+# Databento-style column layout: action/side are stored as their ASCII code (e.g. ord('A')),
+# optional integers use -1 and optional floats NaN in place of None.
+NULL_INT = -1
+
+ORDER_BOOK_EVENT_DTYPE = np.dtype([
+    ("ts_recv", np.int64),
+    ("ts_event", np.int64),
+    ("ts_in_delta", np.int32),
+    ("instrument_id", np.uint32),
+    ("publisher_id", np.uint16),
+    ("rtype", np.uint8),
+    ("sequence", np.uint32),
+    ("action", np.uint8),
+    ("side", np.uint8),
+    ("price", np.int64),
+    ("size", np.uint32),
+    ("flags", np.uint8),
+    ("channel_id", np.int16),
+    ("depth", np.int16),
+    ("order_id", np.int64),
+    ("bid_px_00", np.float64),
+    ("bid_sz_00", np.int64),
+    ("bid_ct_00", np.int32),
+    ("ask_px_00", np.float64),
+    ("ask_sz_00", np.int64),
+    ("ask_ct_00", np.int32),
+])
+
+_OPTIONAL_FIELDS = ("channel_id", "depth", "order_id", "bid_px_00", "bid_sz_00",
+                    "bid_ct_00", "ask_px_00", "ask_sz_00", "ask_ct_00")
+_OPTIONAL_INTS = tuple(name for name in _OPTIONAL_FIELDS if ORDER_BOOK_EVENT_DTYPE[name].kind != "f")
+_OPTIONAL_FLOATS = tuple(name for name in _OPTIONAL_FIELDS if ORDER_BOOK_EVENT_DTYPE[name].kind == "f")
+
+_TRADE_CODES = np.array([ord(OrderAction.TRADE), ord(OrderAction.FILL)], dtype=np.uint8)
+_BOOK_UPDATE_CODES = np.array([ord(OrderAction.ADD), ord(OrderAction.CANCEL), ord(OrderAction.MODIFY)],
+                              dtype=np.uint8)
+
+
+class OrderBookEventBatch:
+    """
+    Columnar container of order book events backed by a single NumPy structured array.
+
+    Symbols are not stored per row; they are resolved from ``symbols`` (instrument_id -> symbol)
+    when an ``OrderBookEvent`` view is materialized.
+    """
+
+    __slots__ = ("data", "symbols")
+
+    def __init__(self, data: np.ndarray, symbols: Optional[Dict[int, str]] = None):
+        if data.dtype != ORDER_BOOK_EVENT_DTYPE:
+            raise ValueError(f"Expected dtype {ORDER_BOOK_EVENT_DTYPE}, got {data.dtype}")
+        self.data = data
+        self.symbols = symbols if symbols is not None else {}
+
+    @classmethod
+    def empty(cls, size: int = 0, symbols: Optional[Dict[int, str]] = None) -> "OrderBookEventBatch":
+        """Create a batch of ``size`` rows with action/side set to NONE and optional fields set to null"""
+        data = np.zeros(size, dtype=ORDER_BOOK_EVENT_DTYPE)
+        data["action"] = ord(OrderAction.NONE)
+        data["side"] = ord(OrderSide.NONE)
+        for name in _OPTIONAL_FIELDS:
+            data[name] = np.nan if data.dtype[name].kind == "f" else NULL_INT
+        return cls(data, symbols)
+
+    @classmethod
+    def from_events(cls, events: Iterable[OrderBookEvent]) -> "OrderBookEventBatch":
+        """Pack row-level events into a batch"""
+        events = list(events)
+        batch = cls.empty(len(events))
+        data = batch.data
+        for name in ORDER_BOOK_EVENT_DTYPE.names:
+            if name in ("action", "side"):
+                data[name] = [ord(getattr(e, name)) for e in events]
+            elif name in _OPTIONAL_FIELDS:
+                null = np.nan if data.dtype[name].kind == "f" else NULL_INT
+                data[name] = [null if (v := getattr(e, name)) is None else v for e in events]
+            else:
+                data[name] = [getattr(e, name) for e in events]
+        batch.symbols.update((e.instrument_id, e.symbol) for e in events)
+        return batch
+
+    @classmethod
+    def concat(cls, batches: Iterable["OrderBookEventBatch"]) -> "OrderBookEventBatch":
+        """Concatenate batches into a new batch (copies)"""
+        batches = list(batches)
+        symbols = {}
+        for b in batches:
+            symbols.update(b.symbols)
+        if not batches:
+            return cls.empty(0)
+        return cls(np.concatenate([b.data for b in batches]), symbols)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        """Expose each column as a read/write view, e.g. ``batch.price``"""
+        if name in ORDER_BOOK_EVENT_DTYPE.fields:
+            return self.data[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __getitem__(self, item):
+        """
+        An integer returns an ``OrderBookEvent``; a slice returns a zero-copy batch view;
+        a boolean mask or index array returns a (copied) batch.
+        """
+        if isinstance(item, (int, np.integer)):
+            return self.event(int(item))
+        return OrderBookEventBatch(self.data[item], self.symbols)
+
+    def __iter__(self) -> Iterator[OrderBookEvent]:
+        for i in range(len(self.data)):
+            yield self.event(i)
+
+    def event(self, i: int) -> OrderBookEvent:
+        """Materialize row ``i`` as an ``OrderBookEvent``"""
+        row = self.data[i].tolist()
+        values = dict(zip(ORDER_BOOK_EVENT_DTYPE.names, row))
+        for name in _OPTIONAL_INTS:
+            if values[name] == NULL_INT:
+                values[name] = None
+        # Only NaN is null for floats, a genuine price of -1.0 is kept
+        for name in _OPTIONAL_FLOATS:
+            v = values[name]
+            if v != v:
+                values[name] = None
+        values["action"] = OrderAction(chr(values["action"]))
+        values["side"] = OrderSide(chr(values["side"]))
+        values["symbol"] = self.symbols.get(values["instrument_id"], "")
+        return OrderBookEvent(**values)
+
+    def to_events(self) -> List[OrderBookEvent]:
+        return list(self)
+
+    @property
+    def ts_recv_dt(self) -> np.ndarray:
+        """ts_recv as a datetime64[ns] view"""
+        return self.data["ts_recv"].view("datetime64[ns]")
+
+    @property
+    def ts_event_dt(self) -> np.ndarray:
+        """ts_event as a datetime64[ns] view"""
+        return self.data["ts_event"].view("datetime64[ns]")
+
+    @property
+    def price_decimal(self) -> np.ndarray:
+        """Convert nano prices to decimal"""
+        return self.data["price"] / 1e9
+
+    @property
+    def is_trade(self) -> np.ndarray:
+        """Mask of trade events"""
+        return np.isin(self.data["action"], _TRADE_CODES)
+
+    @property
+    def is_book_update(self) -> np.ndarray:
+        """Mask of book update events"""
+        return np.isin(self.data["action"], _BOOK_UPDATE_CODES)
@@ -0,0 +1,11 @@
+from datacore.models.orm import ORM
+from datacore.orm.spec import TableSpec, ColumnSpec, Partitioning, table_spec, table_name, partition_names
+from datacore.orm.sqlalchemy_tables import TableFactory, build_table
+from datacore.orm.peewee_models import ModelFactory, build_model
+
+
+def table_factory(orm: ORM, database, schema=None, create_tables: bool = True):
+    """``TableFactory`` for a SQLAlchemy engine or ``ModelFactory`` for a peewee database"""
+    if ORM(orm) is ORM.SQLALCHEMY:
+        return TableFactory(database, schema, create_tables)
+    return ModelFactory(database, schema, create_tables)
@@ -0,0 +1,70 @@
+from typing import Optional, Dict, Iterable, Tuple, Type
+
+from datacore.models.mktdata.base import BaseMarketData
+from datacore.orm.spec import ROW_ID, table_spec
+
+
+def _field(peewee, kind: type, nullable: bool, primary_key: bool):
+    if kind is int:
+        cls = peewee.BigIntegerField
+    elif kind is float:
+        cls = peewee.FloatField
+    elif kind is bool:
+        cls = peewee.BooleanField
+    else:
+        return peewee.CharField(max_length=64, null=nullable, primary_key=primary_key)
+    return cls(null=nullable, primary_key=primary_key)
+
+
+def build_model(name: str, record_cls: Type[BaseMarketData], database, schema: Optional[str] = None):
+    """peewee ``Model`` class for a market data dataclass, keyed and indexed as described by ``table_spec``"""
+    import peewee
+
+    spec = table_spec(record_cls)
+    composite = len(spec.primary_key) > 1
+    attrs = {c.name: _field(peewee, c.kind, c.nullable, c.primary_key and not composite) for c in spec.columns}
+    if spec.surrogate:
+        attrs[ROW_ID] = peewee.BigAutoField()
+    meta = {"database": database, "table_name": name, "schema": schema,
+            "indexes": tuple(((column,), False) for column in spec.indexes)}
+    if composite:
+        meta["primary_key"] = peewee.CompositeKey(*spec.primary_key)
+    attrs["Meta"] = type("Meta", (), meta)
+    return type(f"{record_cls.__name__}_{name}", (peewee.Model,), attrs)
+
+
+class ModelFactory:
+    """peewee counterpart of ``TableFactory``: cached models, missing tables created in one batch"""
+
+    def __init__(self, database, schema: Optional[str] = None, create_tables: bool = True):
+        self.database = database
+        self.schema = schema
+        self.create_tables = create_tables
+        self._models: Dict[str, type] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def model(self, name: str, record_cls: Type[BaseMarketData]):
+        model = self._models.get(name)
+        if model is None:
+            model = self.ensure([(name, record_cls)])[name]
+        return model
+
+    def ensure(self, tables: Iterable[Tuple[str, Type[BaseMarketData]]]) -> Dict[str, type]:
+        wanted = dict(tables)
+        missing = [name for name in wanted if name not in self._models]
+        if missing:
+            existing = set(self.database.get_tables(schema=self.schema))
+            to_create = []
+            for name in missing:
+                model = build_model(name, wanted[name], self.database, self.schema)
+                if name not in existing:
+                    if not self.create_tables:
+                        raise ValueError(f"Table {name!r} does not exist and create_tables is False")
+                    to_create.append(model)
+                self._models[name] = model
+            if to_create:
+                with self.database.atomic():
+                    self.database.create_tables(to_create, safe=False)
+        return {name: self._models[name] for name in wanted}
@@ -0,0 +1,183 @@
+import enum
+import typing
+from enum import StrEnum
+from functools import lru_cache
+from operator import attrgetter
+from dataclasses import dataclass, fields
+from typing import Optional, List, Tuple, Type, Callable
+
+from datacore.models.mktdata.base import BaseMarketData, ns_to_date
+from datacore.models.mktdata.schema import MktDataSchema
+from datacore.models.mktdata.frequency import Frequency
+
+# Fields already encoded in db_table_name(), not stored as columns
+TABLE_NAME_FIELDS = {"venue", "vendor", "symbol", "data_schema"}
+
+KEY_COLUMN = "ts_event"
+
+# Surrogate autoincrement key of classes with an empty ``db_key``
+ROW_ID = "row_id"
+
+# Columns that get a secondary index when present and not already leading the primary key
+INDEX_COLUMNS = ("ts_event", "instrument_id", "date")
+
+# Time column a partitioned layout splits on, the first one the record has
+PARTITION_COLUMNS = ("ts_event", "date")
+
+
+class Partitioning(StrEnum):
+    """Time partitioning of a db_table_name() table into one table per period"""
+    NONE = "none"
+    YEAR = "year"
+    MONTH = "month"
+
+
+@dataclass(frozen=True, slots=True)
+class ColumnSpec:
+    name: str
+    kind: type          # int, float, str or bool
+    nullable: bool
+    primary_key: bool
+
+
+@dataclass(frozen=True, slots=True)
+class TableSpec:
+    columns: Tuple[ColumnSpec, ...]
+    primary_key: Tuple[str, ...]
+    indexes: Tuple[str, ...]
+    surrogate: bool = False  # primary key is ROW_ID, which is not one of ``columns``
+
+    @property
+    def names(self) -> List[str]:
+        return [c.name for c in self.columns]
+
+
+def _kind(tp) -> type:
+    if typing.get_origin(tp) is typing.Union:
+        args = [a for a in typing.get_args(tp) if a is not type(None)]
+        tp = args[0] if len(args) == 1 else str
+    if isinstance(tp, type):
+        if issubclass(tp, bool):
+            return bool
+        if issubclass(tp, enum.Enum) or issubclass(tp, str):
+            return str
+        if issubclass(tp, int):
+            return int
+        if issubclass(tp, float):
+            return float
+    return str
+
+
+def is_daily(record_cls: Type[BaseMarketData]) -> bool:
+    schema = getattr(record_cls, "data_schema", None)
+    if not isinstance(schema, str):
+        # A slotted dataclass field, the class attribute is a descriptor and the schema its default
+        schema = next((f.default for f in fields(record_cls) if f.name == "data_schema"), None)
+    return schema is not None and MktDataSchema(schema).frequency is Frequency.DAY_1
+
+
+@lru_cache(maxsize=None)
+def table_spec(record_cls: Type[BaseMarketData]) -> TableSpec:
+    """
+    Column, key and index layout of a market data dataclass, computed once per class.
+
+    The key is ``record_cls.db_key`` when defined, else ``ts_event``. An empty ``db_key`` keys the table on a
+    surrogate autoincrement ``ROW_ID`` column instead, so rows are appended. Intraday ``ts_event`` is stored as
+    epoch ns integers (the dataclasses annotate it ``str``), daily ``ts_event`` as ISO date strings.
+    Array fields listed in ``record_cls.array_columns`` become one nullable column per row and value,
+    e.g. ``bids`` of ``MarketByPrice10`` -> ``bid_px_00, bid_sz_00, bid_ct_00, ..., bid_ct_09``.
+    """
+    hints = typing.get_type_hints(record_cls)
+    key = tuple(getattr(record_cls, "db_key", (KEY_COLUMN,)))
+    arrays = getattr(record_cls, "array_columns", {})
+    columns = []
+    for f in fields(record_cls):
+        if f.name in TABLE_NAME_FIELDS:
+            continue
+        if f.name in arrays:
+            rows = len(f.default_factory())
+            columns.extend(ColumnSpec(f"{name}_{i:02d}", kind, nullable=True, primary_key=False)
+                           for i in range(rows) for name, kind in arrays[f.name])
+            continue
+        kind = _kind(hints[f.name])
+        if f.name == KEY_COLUMN and not is_daily(record_cls):
+            kind = int
+        columns.append(ColumnSpec(f.name, kind, nullable=f.name not in key, primary_key=f.name in key))
+    names = {c.name for c in columns}
+    surrogate = not key
+    if surrogate:
+        key = (ROW_ID,)
+    indexes = tuple(n for n in INDEX_COLUMNS if n in names and n != key[0])
+    return TableSpec(tuple(columns), key, indexes, surrogate)
+
+
+@lru_cache(maxsize=None)
+def row_getter(record_cls: Type[BaseMarketData]) -> Callable[[BaseMarketData], tuple]:
+    """Function returning a record's values in ``table_spec`` column order, with array fields flattened"""
+    spec = table_spec(record_cls)
+    arrays = getattr(record_cls, "array_columns", {})
+    if not arrays:
+        getter = attrgetter(*spec.names)
+        return getter if len(spec.names) > 1 else lambda record: (getter(record),)
+    layout = []
+    for f in fields(record_cls):
+        if f.name in TABLE_NAME_FIELDS:
+            continue
+        if f.name in arrays:
+            layout.append((f.name, tuple(kind for _, kind in arrays[f.name])))
+        else:
+            layout.append((f.name, None))
+
+    def values(record) -> tuple:
+        out = []
+        for name, kinds in layout:
+            value = getattr(record, name)
+            if kinds is None:
+                out.append(value)
+                continue
+            for row in value.tolist():
+                out.extend(None if v != v else kind(v) for v, kind in zip(row, kinds))
+        return tuple(out)
+
+    return values
+
+
+def period(value, partitioning: Partitioning) -> Optional[str]:
+    """Partition suffix of a ts_event/date value (epoch ns or ISO date string)"""
+    if partitioning is Partitioning.NONE:
+        return None
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        value = ns_to_date(int(value)).isoformat()
+    return value[:4] if partitioning is Partitioning.YEAR else value[:4] + value[5:7]
+
+
+def partition_value(record: BaseMarketData):
+    names = table_spec(type(record)).names
+    return getattr(record, next(n for n in PARTITION_COLUMNS if n in names))
+
+
+def table_name(record: BaseMarketData, partitioning: Partitioning = Partitioning.NONE) -> str:
+    """``db_table_name()``, suffixed with the record's period for partitioned layouts"""
+    name = record.db_table_name()
+    if partitioning is Partitioning.NONE:
+        return name
+    suffix = period(partition_value(record), partitioning)
+    return name if suffix is None else f"{name}_{suffix}"
+
+
+def partition_names(base: str, start: str, end: str, partitioning: Partitioning) -> List[str]:
+    """Tables of ``base`` covering ISO dates ``start`` to ``end`` inclusive"""
+    if partitioning is Partitioning.NONE:
+        return [base]
+    first, last = period(start, partitioning), period(end, partitioning)
+    year, month = int(first[:4]), int(first[4:] or 1)
+    names = []
+    while True:
+        current = f"{year:04d}" if partitioning is Partitioning.YEAR else f"{year:04d}{month:02d}"
+        if current > last:
+            return names
+        names.append(f"{base}_{current}")
+        if partitioning is Partitioning.YEAR:
+            year += 1
+        else:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
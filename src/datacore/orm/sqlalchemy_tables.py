@@ -0,0 +1,73 @@
+from typing import Optional, Dict, List, Iterable, Tuple, Type
+
+from sqlalchemy import Engine, MetaData, Table, Column, Index, BigInteger, Integer, Float, String, Boolean, inspect
+
+from datacore.models.mktdata.base import BaseMarketData
+from datacore.orm.spec import ROW_ID, table_spec
+
+SQL_TYPES = {int: BigInteger, float: Float, bool: Boolean}
+
+
+def _sql_type(kind: type):
+    return SQL_TYPES[kind]() if kind in SQL_TYPES else String(64)
+
+
+def build_table(name: str, record_cls: Type[BaseMarketData], metadata: MetaData,
+                schema: Optional[str] = None) -> Table:
+    """Table for a market data dataclass, keyed and indexed as described by ``table_spec``"""
+    spec = table_spec(record_cls)
+    columns = [Column(c.name, _sql_type(c.kind), primary_key=c.primary_key, nullable=c.nullable)
+               for c in spec.columns]
+    if spec.surrogate:
+        # SQLite only autoincrements an INTEGER PRIMARY KEY
+        columns.insert(0, Column(ROW_ID, BigInteger().with_variant(Integer, "sqlite"), primary_key=True,
+                                 autoincrement=True))
+    indexes = [Index(f"ix_{name}_{column}", column) for column in spec.indexes]
+    return Table(name, metadata, *columns, *indexes, schema=schema)
+
+
+class TableFactory:
+    """
+    Cached SQLAlchemy tables for ``db_table_name()`` names.
+
+    ``ensure`` resolves many names at once: existing tables are found with a single catalogue query and
+    reflected, missing ones are generated from their dataclass and created in one ``create_all``, so a
+    first write touching hundreds of per-symbol tables does not pay a round trip per table.
+    """
+
+    def __init__(self, engine: Engine, schema: Optional[str] = None, create_tables: bool = True):
+        self.engine = engine
+        self.schema = schema
+        self.create_tables = create_tables
+        self.metadata = MetaData(schema=schema)
+        self._tables: Dict[str, Table] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tables
+
+    def table(self, name: str, record_cls: Type[BaseMarketData], bind=None) -> Table:
+        table = self._tables.get(name)
+        if table is None:
+            table = self.ensure([(name, record_cls)], bind)[name]
+        return table
+
+    def ensure(self, tables: Iterable[Tuple[str, Type[BaseMarketData]]], bind=None) -> Dict[str, Table]:
+        """Tables for (name, record class) pairs, reflected or created through ``bind`` (defaults to the engine)"""
+        wanted = dict(tables)
+        missing = [name for name in wanted if name not in self._tables]
+        if missing:
+            bind = bind if bind is not None else self.engine
+            existing = set(inspect(bind).get_table_names(schema=self.schema))
+            to_create: List[Table] = []
+            for name in missing:
+                if name in existing:
+                    self._tables[name] = Table(name, self.metadata, autoload_with=bind)
+                    continue
+                if not self.create_tables:
+                    raise ValueError(f"Table {name!r} does not exist and create_tables is False")
+                table = build_table(name, wanted[name], self.metadata, self.schema)
+                to_create.append(table)
+                self._tables[name] = table
+            if to_create:
+                self.metadata.create_all(bind, tables=to_create, checkfirst=False)
+        return {name: self._tables[name] for name in wanted}
@@ -0,0 +1,4 @@
+from datacore.outputs.redis_sink import RedisSink, AsyncRedisSink
+from datacore.outputs.db_sink import DatabaseSink
+from datacore.outputs.file_sink import FileSink, FileStore
+from datacore.outputs.router import MarketDataRouter, Route, QueuePolicy
@@ -0,0 +1,117 @@
+from operator import attrgetter
+from typing import Optional, Dict, List, Iterable, Tuple, Type
+
+from sqlalchemy import Engine, MetaData, Table, Column, insert, text
+
+from datacore.models.mktdata.base import BaseMarketData
+from datacore.orm.spec import KEY_COLUMN, Partitioning, table_spec, table_name, row_getter
+from datacore.orm.sqlalchemy_tables import TableFactory
+
+
+def column_names(record_cls: Type[BaseMarketData]) -> List[str]:
+    return table_spec(record_cls).names
+
+
+class DatabaseSink:
+    """
+    Bulk writer of market data records into their per-symbol ``db_table_name()`` tables.
+
+    Records are grouped by table and upserted on their key (``ts_event`` unless the class defines
+    ``db_key``) in chunks of ``chunk_size`` rows using executemany. Tick schemas have no natural key and are
+    appended under a surrogate row id, so every tick is kept, including quotes without event fields; rewriting
+    the same ticks duplicates them. Tables are resolved through a
+    ``TableFactory``, which reflects or creates all tables of a write in one batch and caches them. With
+    ``partitioning`` every table is split into one table per year or month of ``ts_event``. On
+    SQLite/PostgreSQL/MySQL this is a native ON CONFLICT / ON DUPLICATE KEY insert, which SQLAlchemy
+    batches into multi-row VALUES; on SQL Server chunks are loaded into a temp table and MERGEd, so the
+    engine should be created with ``fast_executemany=True``.
+    """
+
+    def __init__(self, engine: Engine, chunk_size: int = 5_000, schema: Optional[str] = None,
+                 create_tables: bool = True, partitioning: Partitioning = Partitioning.NONE):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.schema = schema
+        self.partitioning = Partitioning(partitioning)
+        self.tables = TableFactory(engine, schema, create_tables)
+
+    def table(self, name: str, record_cls: Type[BaseMarketData], bind=None) -> Table:
+        """Cached table for ``name``, reflected or created through ``bind`` (defaults to the engine)"""
+        return self.tables.table(name, record_cls, bind)
+
+    def write(self, records: Iterable[BaseMarketData]) -> Dict[str, int]:
+        """Upsert records; returns the number of rows written per table"""
+        groups: Dict[str, List[BaseMarketData]] = {}
+        partitioning = self.partitioning
+        for record in records:
+            name = table_name(record, partitioning)
+            group = groups.get(name)
+            if group is None:
+                groups[name] = [record]
+            else:
+                group.append(record)
+
+        written = {}
+        with self.engine.begin() as conn:
+            tables = self.tables.ensure(((name, type(group[0])) for name, group in groups.items()), conn)
+            for name, group in groups.items():
+                table = tables[name]
+                spec = table_spec(type(group[0]))
+                names = spec.names
+                getter = row_getter(type(group[0]))
+                if spec.surrogate:
+                    rows = [dict(zip(names, getter(r))) for r in group]
+                else:
+                    key = attrgetter(*spec.primary_key)
+                    # last record wins for a repeated key, as it would with row-by-row upserts
+                    rows = list({key(r): dict(zip(names, getter(r))) for r in group}.values())
+                for start in range(0, len(rows), self.chunk_size):
+                    chunk = rows[start:start + self.chunk_size]
+                    if spec.surrogate:
+                        conn.execute(insert(table), chunk)
+                    else:
+                        self._upsert(conn, table, chunk, spec.primary_key)
+                written[name] = len(rows)
+        return written
+
+    def _upsert(self, conn, table: Table, rows: List[dict], key: Tuple[str, ...] = (KEY_COLUMN,)):
+        dialect = conn.dialect.name
+        update_cols = [c for c in rows[0] if c not in key]
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(index_elements=list(key),
+                                              set_={c: stmt.excluded[c] for c in update_cols})
+            conn.execute(stmt, rows)
+        elif dialect in ("mysql", "mariadb"):
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+            stmt = dialect_insert(table)
+            stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_cols})
+            conn.execute(stmt, rows)
+        elif dialect == "mssql":
+            self._merge_mssql(conn, table, rows, update_cols, key)
+        else:
+            conn.execute(insert(table), rows)
+
+    @staticmethod
+    def _merge_mssql(conn, table: Table, rows: List[dict], update_cols: List[str], key: Tuple[str, ...]):
+        target = conn.dialect.identifier_preparer.format_table(table)
+        quote = conn.dialect.identifier_preparer.quote
+        cols = list(rows[0])
+        staging = Table(f"#stage_{table.name}", MetaData(),
+                        *[Column(c.name, c.type) for c in table.c if c.name in cols])
+        staging.create(conn)
+        try:
+            conn.execute(insert(staging), rows)
+            col_list = ", ".join(quote(c) for c in cols)
+            set_list = ", ".join(f"t.{quote(c)} = s.{quote(c)}" for c in update_cols)
+            merge = (f"MERGE {target} AS t USING {quote(staging.name)} AS s "
+                     f"ON {' AND '.join(f't.{quote(c)} = s.{quote(c)}' for c in key)} "
+                     + (f"WHEN MATCHED THEN UPDATE SET {set_list} " if set_list else "")
+                     + f"WHEN NOT MATCHED THEN INSERT ({col_list}) VALUES ({', '.join('s.' + quote(c) for c in cols)});")
+            conn.execute(text(merge))
+        finally:
+            staging.drop(conn)
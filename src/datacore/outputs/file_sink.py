@@ -0,0 +1,302 @@
+import os
+import time
+import datetime as dt
+from operator import attrgetter
+from pathlib import Path
+from itertools import count
+from typing import Optional, Dict, List, Iterable, Iterator, Union
+
+from datacore.models.mktdata.base import BaseMarketData, ns_to_date
+from datacore.models.mktdata.schema import MktDataSchema
+from datacore.models.mktdata.frequency import Frequency
+from datacore.models.mktdata.codec import encode, decode
+from datacore.orm.spec import PARTITION_COLUMNS, table_spec, row_getter
+
+PART_SUFFIX = ".parquet"
+BINARY_SUFFIX = ".bin"
+
+DateLike = Union[int, str, dt.date]
+
+
+# Time column of schemas whose records have no ts_event
+_TIME_COLUMNS = {MktDataSchema.OPTION_1D: "date"}
+
+
+def _is_daily(schema: MktDataSchema) -> bool:
+    return schema.frequency is Frequency.DAY_1
+
+
+def _time_column(schema: MktDataSchema) -> str:
+    """Column a schema's files are sorted and range-filtered on"""
+    return _TIME_COLUMNS.get(schema, "ts_event")
+
+
+def _time_key(schema: MktDataSchema):
+    """Sort/filter key of a record on its time column: epoch ns for tick schemas, ISO date for daily ones"""
+    get = attrgetter(_time_column(schema))
+    return (lambda r: get(r)[:10]) if _is_daily(schema) else (lambda r: int(get(r)))
+
+
+_ARROW_TYPES = {bool: "bool_", int: "int64", float: "float64", str: "string"}
+
+
+def to_arrow(records: List[BaseMarketData]):
+    """Arrow table of records of one class, without the fields encoded in the partition path"""
+    import pyarrow as pa
+
+    cls = type(records[0])
+    spec = table_spec(cls)
+    rows = list(map(row_getter(cls), records))
+    arrays = []
+    for i, column in enumerate(spec.columns):
+        values = [row[i] for row in rows]
+        if column.kind is str:
+            values = [None if v is None else str(v) for v in values]
+        elif column.kind is int and column.name == "ts_event":
+            # Tick schemas carry epoch ns (annotated str), daily schemas an ISO date string.
+            values = [None if v is None else int(v) for v in values]
+        arrays.append(pa.array(values, type=getattr(pa, _ARROW_TYPES[column.kind])()))
+    table = pa.Table.from_arrays(arrays, names=spec.names)
+    column = next((name for name in PARTITION_COLUMNS if name in spec.names), None)
+    return table.sort_by(column) if column is not None else table
+
+
+class FileSink:
+    """
+    Writes market data records to Parquet files under ``root/<file_name()>/``, i.e. partitioned by
+    venue/vendor/schema/symbol/date (year for daily schemas).
+
+    Records are buffered per partition. A partition is written as a new part file once it holds
+    ``max_rows`` records, and the largest partitions are written early whenever more than
+    ``max_buffered_rows`` records are buffered overall. Each part file is sorted by ts_event (``date``
+    for option-1d) so row-group statistics can be used to skip data on read. Small part files are merged by
+    ``FileStore.compact``.
+
+    With ``binary=True`` part files are ``models.mktdata.codec`` payloads (``.bin``) instead, which need no
+    pyarrow and are cheaper to write; read them with ``FileStore.read_records``.
+    """
+
+    def __init__(self, root: Union[str, os.PathLike], max_rows: int = 250_000, max_buffered_rows: int = 2_000_000,
+                 compression: str = "zstd", binary: bool = False):
+        self.root = Path(root)
+        self.max_rows = max_rows
+        self.max_buffered_rows = max_buffered_rows
+        self.compression = compression
+        self.binary = binary
+        self._buffers: Dict[str, List[BaseMarketData]] = {}
+        self._buffered = 0
+        self._seq = count()
+
+    def write(self, records: Iterable[BaseMarketData]):
+        buffers = self._buffers
+        for record in records:
+            partition = record.file_name()
+            buffer = buffers.get(partition)
+            if buffer is None:
+                buffer = buffers[partition] = []
+            buffer.append(record)
+            self._buffered += 1
+            if len(buffer) >= self.max_rows:
+                self._flush_partition(partition)
+        if self._buffered > self.max_buffered_rows:
+            for partition in sorted(buffers, key=lambda p: len(buffers[p]), reverse=True):
+                self._flush_partition(partition)
+                if self._buffered <= self.max_buffered_rows // 2:
+                    break
+
+    def _flush_partition(self, partition: str):
+        records = self._buffers.pop(partition, None)
+        if not records:
+            return
+        self._buffered -= len(records)
+        directory = self.root / partition
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = BINARY_SUFFIX if self.binary else PART_SUFFIX
+        path = directory / f"part-{time.time_ns()}-{next(self._seq)}{suffix}"
+        tmp = path.with_suffix(".tmp")
+        if self.binary:
+            tmp.write_bytes(encode(records))
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(to_arrow(records), tmp, compression=self.compression)
+        os.replace(tmp, path)
+
+    def flush(self):
+        for partition in list(self._buffers):
+            self._flush_partition(partition)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _datetime_ns(value: dt.datetime) -> int:
+    """Epoch ns of a datetime, naive ones taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return int(value.timestamp()) * 1_000_000_000 + value.microsecond * 1_000
+
+
+def _exact_ns(value: DateLike) -> Optional[int]:
+    """Epoch ns of an int, datetime or ISO datetime string; None for a bare date"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, dt.datetime):
+        return _datetime_ns(value)
+    if isinstance(value, str) and len(value) > 10:
+        return _datetime_ns(dt.datetime.fromisoformat(value))
+    return None
+
+
+def _to_date(value: DateLike) -> dt.date:
+    """UTC date a bound falls on, used to prune partitions"""
+    ns = _exact_ns(value)
+    if ns is not None:
+        return ns_to_date(ns)
+    if isinstance(value, dt.date):
+        return value
+    return dt.date.fromisoformat(value)
+
+
+def _bound(value: DateLike, schema: MktDataSchema, upper: bool):
+    """
+    Time column bound in the column's own representation. Tick schemas keep the full ns of an int, datetime or
+    ISO datetime bound; a bare date covers its whole UTC day.
+    """
+    if _is_daily(schema):
+        return _to_date(value).isoformat()
+    ns = _exact_ns(value)
+    if ns is not None:
+        return ns
+    day = dt.datetime.combine(_to_date(value), dt.time(), tzinfo=dt.timezone.utc)
+    ns = int(day.timestamp()) * 1_000_000_000
+    return ns + 86_400_000_000_000 - 1 if upper else ns
+
+
+class FileStore:
+    """
+    Read side of the ``FileSink`` layout.
+
+    Partitions are pruned from the directory names (venue, vendor, symbol and the date/year component)
+    before any file is opened; the remaining range of the schema's time column (ts_event, or ``date`` for
+    option-1d) is pushed down to Parquet row-group statistics. ``start``/``end`` are inclusive and can be epoch
+    ns, dates, datetimes or ISO date(time) strings; datetimes are exact bounds on tick schemas, naive ones taken as UTC.
+    """
+
+    def __init__(self, root: Union[str, os.PathLike]):
+        self.root = Path(root)
+
+    def partitions(self, schema: MktDataSchema, symbols: Optional[Iterable[str]] = None,
+                   start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                   venue: Optional[str] = None, vendor: Optional[str] = None) -> List[Path]:
+        symbols = set(symbols) if symbols is not None else None
+        first = _to_date(start).isoformat() if start is not None else None
+        last = _to_date(end).isoformat() if end is not None else None
+        out = []
+        for path in sorted(self.root.glob(f"{venue or '*'}/{vendor or '*'}/{schema}/*/*")):
+            if not path.is_dir() or (symbols is not None and path.parent.name not in symbols):
+                continue
+            period = path.name
+            # A partition named YYYY covers the whole year, YYYY-MM-DD a single day.
+            if first is not None and (period + "-12-31" if len(period) == 4 else period) < first:
+                continue
+            if last is not None and (period + "-01-01" if len(period) == 4 else period) > last:
+                continue
+            out.append(path)
+        return out
+
+    def dataset(self, schema: MktDataSchema, symbols: Optional[Iterable[str]] = None,
+                start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                venue: Optional[str] = None, vendor: Optional[str] = None):
+        import pyarrow.dataset as ds
+
+        files = [str(f) for p in self.partitions(schema, symbols, start, end, venue, vendor)
+                 for f in sorted(p.glob(f"*{PART_SUFFIX}"))]
+        return ds.dataset(files, format="parquet")
+
+    def _filter(self, schema: MktDataSchema, start: Optional[DateLike], end: Optional[DateLike]):
+        import pyarrow.dataset as ds
+
+        field = ds.field(_time_column(schema))
+        expr = None
+        if start is not None:
+            expr = field >= _bound(start, schema, upper=False)
+        if end is not None:
+            upper = field <= _bound(end, schema, upper=True)
+            expr = upper if expr is None else expr & upper
+        return expr
+
+    def read(self, schema: MktDataSchema, symbols: Optional[Iterable[str]] = None,
+             start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+             venue: Optional[str] = None, vendor: Optional[str] = None, columns: Optional[List[str]] = None):
+        """Matching rows as one Arrow table"""
+        schema = MktDataSchema(schema)
+        dataset = self.dataset(schema, symbols, start, end, venue, vendor)
+        return dataset.to_table(columns=columns, filter=self._filter(schema, start, end))
+
+    def iter_batches(self, schema: MktDataSchema, symbols: Optional[Iterable[str]] = None,
+                     start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                     venue: Optional[str] = None, vendor: Optional[str] = None,
+                     columns: Optional[List[str]] = None, batch_size: int = 65_536) -> Iterator:
+        """Matching rows as Arrow record batches, file by file"""
+        schema = MktDataSchema(schema)
+        dataset = self.dataset(schema, symbols, start, end, venue, vendor)
+        return iter(dataset.to_batches(columns=columns, filter=self._filter(schema, start, end),
+                                       batch_size=batch_size))
+
+    def read_records(self, schema: MktDataSchema, symbols: Optional[Iterable[str]] = None,
+                     start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                     venue: Optional[str] = None, vendor: Optional[str] = None) -> List[BaseMarketData]:
+        """Records of the matching binary part files, sorted by their time column"""
+        schema = MktDataSchema(schema)
+        lower = _bound(start, schema, upper=False) if start is not None else None
+        upper = _bound(end, schema, upper=True) if end is not None else None
+        key = _time_key(schema)
+        out = []
+        for partition in self.partitions(schema, symbols, start, end, venue, vendor):
+            for part in sorted(partition.glob(f"part-*{BINARY_SUFFIX}")):
+                out.extend(decode(part.read_bytes()))
+        if lower is not None or upper is not None:
+            out = [r for r in out if (lower is None or key(r) >= lower) and (upper is None or key(r) <= upper)]
+        out.sort(key=key)
+        return out
+
+    def compact(self, schema: Optional[MktDataSchema] = None, min_files: int = 2,
+                compression: str = "zstd") -> int:
+        """
+        Merge the part files of every partition holding at least ``min_files`` of one format into one;
+        Parquet and binary parts are merged separately. Returns the number of merges.
+        """
+        pattern = f"*/*/{schema}/*/*" if schema is not None else "*/*/*/*/*"
+        merged = 0
+        for partition in self.root.glob(pattern):
+            partition_schema = MktDataSchema(partition.parent.parent.name)
+            parts = sorted(partition.glob(f"part-*{PART_SUFFIX}"))
+            if len(parts) >= min_files:
+                import pyarrow.parquet as pq
+
+                table = pq.ParquetDataset([str(p) for p in parts]).read().sort_by(_time_column(partition_schema))
+                self._replace_parts(parts, partition / f"part-{time.time_ns()}-c{PART_SUFFIX}",
+                                    lambda tmp: pq.write_table(table, tmp, compression=compression))
+                merged += 1
+            parts = sorted(partition.glob(f"part-*{BINARY_SUFFIX}"))
+            if len(parts) >= min_files:
+                records = [r for part in parts for r in decode(part.read_bytes())]
+                records.sort(key=_time_key(partition_schema))
+                self._replace_parts(parts, partition / f"part-{time.time_ns()}-c{BINARY_SUFFIX}",
+                                    lambda tmp: tmp.write_bytes(encode(records)))
+                merged += 1
+        return merged
+
+    @staticmethod
+    def _replace_parts(parts: List[Path], path: Path, write):
+        tmp = path.with_suffix(".tmp")
+        write(tmp)
+        os.replace(tmp, path)
+        for part in parts:
+            part.unlink()
@@ -0,0 +1,271 @@
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, List, Iterable, Union
+
+from datacore.models.mktdata.base import BaseMarketData
+from datacore.models.mktdata.codec import encode
+
+BINARY_SUFFIX = ":bin"
+
+logger = logging.getLogger(__name__)
+
+
+def redis_mapping(record: BaseMarketData) -> Dict[str, str]:
+    """Hash fields of a record, using its own ``to_dict_redis`` when it has one"""
+    to_dict_redis = getattr(record, "to_dict_redis", None)
+    if to_dict_redis is not None:
+        return to_dict_redis()
+    return {k: str(v) for k, v in record.to_dict().items()}
+
+
+class _CoalescingBuffer:
+    """
+    Keeps the latest fields per redis key until the next flush and remembers what was last published,
+    so a flush only writes the fields whose value changed. In binary mode the latest record per key is
+    kept instead and written as one codec payload, unless it encodes to the bytes last published.
+    """
+
+    def __init__(self, window: float, stream: bool, stream_maxlen: Optional[int], binary: bool = False):
+        self.window = window
+        self.stream = stream
+        self.stream_maxlen = stream_maxlen
+        self.binary = binary
+        self.pending: Dict[str, Union[Dict[str, str], BaseMarketData]] = {}
+        self.published: Dict[str, Union[Dict[str, str], bytes]] = {}
+        self.last_flush = time.monotonic()
+
+    def add(self, record: BaseMarketData):
+        key = record.redis_name()
+        if self.binary:
+            self.pending[key] = record
+            return
+        mapping = redis_mapping(record)
+        pending = self.pending.get(key)
+        if pending is None:
+            self.pending[key] = mapping
+        else:
+            pending.update(mapping)
+
+    def due(self) -> bool:
+        return time.monotonic() - self.last_flush >= self.window
+
+    def drain(self, pipe) -> List[str]:
+        """Queue HSET/XADD for every changed key on ``pipe``; returns the keys written"""
+        pending, self.pending = self.pending, {}
+        self.last_flush = time.monotonic()
+        if self.binary:
+            return self._drain_binary(pipe, pending)
+        written = []
+        for key, mapping in pending.items():
+            last = self.published.get(key)
+            if last is None:
+                changed = mapping
+                self.published[key] = dict(mapping)
+            else:
+                changed = {k: v for k, v in mapping.items() if last.get(k) != v}
+                if not changed:
+                    continue
+                last.update(changed)
+            pipe.hset(key, mapping=changed)
+            if self.stream:
+                pipe.xadd(f"{key}:stream", changed, maxlen=self.stream_maxlen, approximate=True)
+            written.append(key)
+        return written
+
+    def _drain_binary(self, pipe, pending: Dict[str, BaseMarketData]) -> List[str]:
+        written = []
+        for key, record in pending.items():
+            payload = encode((record,))
+            if self.published.get(key) == payload:
+                continue
+            self.published[key] = payload
+            pipe.set(key + BINARY_SUFFIX, payload)
+            if self.stream:
+                pipe.xadd(f"{key}{BINARY_SUFFIX}:stream", {"d": payload}, maxlen=self.stream_maxlen,
+                          approximate=True)
+            written.append(key)
+        return written
+
+    def restore(self, drained: Dict[str, Union[Dict[str, str], BaseMarketData]], written: Iterable[str]):
+        """
+        Put back what a failed flush drained: newer pending fields (or records) win over the drained ones,
+        and the written keys lose their last-published state so they are rewritten in full.
+        """
+        self.forget(written)
+        pending = self.pending
+        for key, drained_value in drained.items():
+            newer = pending.get(key)
+            if newer is None:
+                pending[key] = drained_value
+            elif not self.binary:
+                pending[key] = {**drained_value, **newer}
+
+    def forget(self, keys: Optional[Iterable[str]] = None):
+        """Drop the last-published state so the next flush rewrites all fields"""
+        if keys is None:
+            self.published.clear()
+        else:
+            for key in keys:
+                self.published.pop(key, None)
+
+
+class RedisSink:
+    """
+    Publishes market data records to redis hashes keyed by ``redis_name()``.
+
+    Updates to the same key are coalesced and written at most once per ``window`` seconds in a single
+    non-transactional pipeline; unchanged fields are skipped. The sink has no thread of its own: ``publish``
+    flushes once the window has passed, so a producer that can go quiet should also call ``flush_if_due``
+    periodically (e.g. from its poll loop) to bound the staleness of the last updates. With ``stream=True`` each write is also
+    appended to ``<key>:stream``. Pass an existing client, or a ``url`` for a pooled ``redis.Redis``.
+
+    With ``binary=True`` each key's latest record is instead written as a ``models.mktdata.codec`` payload to
+    the string ``<key>:bin`` (and ``<key>:bin:stream`` field ``d``), skipping the per-field ``str`` formatting;
+    read it back with ``codec.decode`` on a client without ``decode_responses``.
+    """
+
+    def __init__(self, client=None, url: str = "redis://localhost:6379/0", window: float = 0.05,
+                 max_connections: int = 16, stream: bool = False, stream_maxlen: Optional[int] = 10_000,
+                 binary: bool = False):
+        self.url = url
+        self.max_connections = max_connections
+        self._client = client
+        self._buffer = _CoalescingBuffer(window, stream, stream_maxlen, binary)
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            pool = redis.ConnectionPool.from_url(self.url, max_connections=self.max_connections,
+                                                 decode_responses=True)
+            self._client = redis.Redis(connection_pool=pool)
+        return self._client
+
+    def publish(self, record: BaseMarketData):
+        self._buffer.add(record)
+        self.flush_if_due()
+
+    def publish_many(self, records: Iterable[BaseMarketData]):
+        for record in records:
+            self._buffer.add(record)
+        self.flush_if_due()
+
+    def flush_if_due(self) -> int:
+        """Flush if ``window`` seconds passed since the last flush; returns the number of keys written"""
+        return self.flush() if self._buffer.due() else 0
+
+    def flush(self) -> int:
+        """Write all pending keys now; returns the number of keys written"""
+        if not self._buffer.pending:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        drained = self._buffer.pending
+        written = self._buffer.drain(pipe)
+        if written:
+            try:
+                pipe.execute()
+            except Exception:
+                self._buffer.restore(drained, written)
+                raise
+        return len(written)
+
+    def resync(self):
+        """Rewrite every field on the next flush, e.g. after a redis restart"""
+        self._buffer.forget()
+
+    def close(self):
+        self.flush()
+        if self._client is not None:
+            self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncRedisSink:
+    """
+    asyncio variant of ``RedisSink``. ``publish`` only buffers; a background task started by
+    ``start()`` (or ``async with``) flushes every ``window`` seconds and keeps running across redis errors.
+    """
+
+    def __init__(self, client=None, url: str = "redis://localhost:6379/0", window: float = 0.05,
+                 max_connections: int = 16, stream: bool = False, stream_maxlen: Optional[int] = 10_000,
+                 binary: bool = False):
+        self.url = url
+        self.max_connections = max_connections
+        self._client = client
+        self._buffer = _CoalescingBuffer(window, stream, stream_maxlen, binary)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as aioredis
+            pool = aioredis.ConnectionPool.from_url(self.url, max_connections=self.max_connections,
+                                                    decode_responses=True)
+            self._client = aioredis.Redis(connection_pool=pool)
+        return self._client
+
+    def publish(self, record: BaseMarketData):
+        self._buffer.add(record)
+
+    def publish_many(self, records: Iterable[BaseMarketData]):
+        for record in records:
+            self._buffer.add(record)
+
+    async def flush(self) -> int:
+        """Write all pending keys now; returns the number of keys written"""
+        if not self._buffer.pending:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        drained = self._buffer.pending
+        written = self._buffer.drain(pipe)
+        if written:
+            try:
+                await pipe.execute()
+            except Exception:
+                self._buffer.restore(drained, written)
+                raise
+        return len(written)
+
+    def resync(self):
+        """Rewrite every field on the next flush, e.g. after a redis restart"""
+        self._buffer.forget()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._buffer.window)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Pending updates were put back, the next flush retries them
+                logger.exception("Redis flush failed")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,273 @@
+import time
+import asyncio
+import inspect
+import logging
+from enum import StrEnum
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Iterable, Callable, Any, Union
+
+from datacore.models.mktdata.base import BaseMarketData
+from datacore.models.mktdata.outputs import DataOutput
+
+logger = logging.getLogger(__name__)
+
+
+class QueuePolicy(StrEnum):
+    """What a route does with a new record when its queue is full"""
+    BLOCK = "block"                 # Wait for space, slowing the producer down.
+    DROP_NEWEST = "drop_newest"     # Discard the new record.
+    DROP_OLDEST = "drop_oldest"     # Discard the oldest queued record, keeps realtime data fresh.
+
+
+def sink_writer(sink) -> Callable[[List[BaseMarketData]], Any]:
+    """Batch writer for the sinks in ``datacore.outputs`` (or any object with ``write``/``publish_many``)"""
+    if hasattr(sink, "publish_many") and hasattr(sink, "flush"):
+        if inspect.iscoroutinefunction(sink.flush):
+            async def write_async(records: List[BaseMarketData]):
+                sink.publish_many(records)
+                await sink.flush()
+            return write_async
+
+        def write_sync(records: List[BaseMarketData]):
+            sink.publish_many(records)
+            sink.flush()
+        return write_sync
+    if hasattr(sink, "write"):
+        return sink.write
+    if callable(sink):
+        return sink
+    raise ValueError(f"Cannot write market data to {type(sink).__name__}")
+
+
+@dataclass
+class RouteStats:
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+    batches: int = 0
+    lag: float = 0.0                # Seconds the last written batch's oldest record spent queued.
+    max_lag: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def throughput(self) -> float:
+        """Records written per second since the route started"""
+        elapsed = time.monotonic() - self.started
+        return self.written / elapsed if elapsed > 0 else 0.0
+
+
+class Route:
+    """
+    One output of a ``MarketDataRouter``: a bounded queue drained in batches by ``workers`` tasks.
+
+    Coroutine writers run on the event loop; blocking writers run on a thread pool owned by the route,
+    so a slow output only ever occupies its own threads. A batch is written once ``batch_size`` records
+    are queued or ``linger`` seconds after its first record, whichever comes first. Writers that are not
+    thread safe (``FileSink``, ``RedisSink``) should keep ``workers=1``.
+    """
+
+    def __init__(self, name: Union[DataOutput, str], writer: Callable[[List[BaseMarketData]], Any],
+                 maxsize: int = 100_000, batch_size: int = 1_000, linger: float = 0.05,
+                 policy: QueuePolicy = QueuePolicy.BLOCK, workers: int = 1,
+                 accept: Optional[Callable[[BaseMarketData], bool]] = None):
+        if maxsize <= 0:
+            raise ValueError("Route queues must be bounded, maxsize must be positive.")
+        self.name = name
+        self.writer = writer
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.linger = linger
+        self.policy = QueuePolicy(policy)
+        self.workers = workers
+        self.accept = accept
+        self.stats = RouteStats()
+        self._is_async = inspect.iscoroutinefunction(writer)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def start(self):
+        self._queue = asyncio.Queue(self.maxsize)
+        self.stats = RouteStats()
+        if not self._is_async:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=f"route-{self.name}")
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+
+    def put_nowait(self, record: BaseMarketData) -> bool:
+        """Enqueue without waiting, applying the overflow policy; False when a full ``BLOCK`` route needs ``put``"""
+        queue = self._queue
+        if queue is None:
+            raise RuntimeError(f"Route {self.name} is not started, call MarketDataRouter.start() first")
+        if self.accept is not None and not self.accept(record):
+            return True
+        if queue.full():
+            if self.policy is QueuePolicy.BLOCK:
+                return False
+            self.stats.dropped += 1
+            if self.policy is QueuePolicy.DROP_NEWEST:
+                return True
+            queue.get_nowait()
+            queue.task_done()
+        queue.put_nowait((time.monotonic(), record))
+        self.stats.enqueued += 1
+        return True
+
+    async def put(self, record: BaseMarketData):
+        if not self.put_nowait(record):
+            await self._queue.put((time.monotonic(), record))
+            self.stats.enqueued += 1
+
+    async def _next_batch(self) -> List[tuple]:
+        queue = self._queue
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            if queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(queue.get_nowait())
+        return batch
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            records = [record for _, record in batch]
+            stats = self.stats
+            try:
+                if self._is_async:
+                    await self.writer(records)
+                else:
+                    await loop.run_in_executor(self._executor, self.writer, records)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                stats.failed += len(records)
+                logger.exception("Route %s failed to write %d records", self.name, len(records))
+            else:
+                stats.written += len(records)
+                stats.batches += 1
+                stats.lag = time.monotonic() - batch[0][0]
+                stats.max_lag = max(stats.max_lag, stats.lag)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def stop(self, drain: bool = True):
+        if drain and self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class MarketDataRouter:
+    """
+    Fans market data records out to independent outputs (``DataOutput.database``/``redis``/``file``).
+
+    Every route has its own bounded queue, batching, overflow policy and workers. ``publish`` hands a record
+    to every route without waiting (``put_nowait`` under each route's policy), so every route has the record
+    before anything waits; only the ``BLOCK`` routes that are full are then awaited, concurrently. A behind
+    ``BLOCK`` route therefore throttles the producer but never delays delivery to the other routes, and a
+    ``DROP_*`` route never waits on its writer: when its queue is full the producer yields once so the workers
+    can drain it, and only drops if they are still busy. Typical setup keeps redis on ``DROP_OLDEST`` and the database on
+    ``BLOCK`` so nothing is lost from storage while the realtime path stays fresh.
+
+    Usage::
+
+        router = MarketDataRouter()
+        router.add_route(DataOutput.redis, redis_sink, policy=QueuePolicy.DROP_OLDEST, batch_size=500)
+        router.add_route(DataOutput.database, db_sink, batch_size=5_000, linger=1.0, workers=2)
+        async with router:
+            await router.publish_many(records)
+    """
+
+    YIELD_EVERY = 1_000
+
+    def __init__(self):
+        self.routes: Dict[str, Route] = {}
+        self._running = False
+
+    def add_route(self, name: Union[DataOutput, str], sink, **kwargs) -> Route:
+        """Add an output; ``sink`` is a sink object or a batch writer callable, ``kwargs`` go to ``Route``"""
+        if name in self.routes:
+            raise ValueError(f"Route {name!r} already exists")
+        route = Route(name, sink_writer(sink), **kwargs)
+        self.routes[name] = route
+        if self._running:
+            route.start()
+        return route
+
+    async def start(self):
+        if not self._running:
+            for route in self.routes.values():
+                route.start()
+            self._running = True
+
+    def _routes(self) -> List[Route]:
+        if not self._running:
+            raise RuntimeError("MarketDataRouter is not started, call start() first")
+        return list(self.routes.values())
+
+    async def publish(self, record: BaseMarketData):
+        routes = self._routes()
+        if any(route.full for route in routes if route.policy is not QueuePolicy.BLOCK):
+            await asyncio.sleep(0)
+        blocked = [route for route in routes if not route.put_nowait(record)]
+        if blocked:
+            await asyncio.gather(*(route.put(record) for route in blocked))
+
+    async def publish_many(self, records: Iterable[BaseMarketData]):
+        routes = self._routes()
+        dropping = [route for route in routes if route.policy is not QueuePolicy.BLOCK]
+        for i, record in enumerate(records, 1):
+            # Let the route workers drain before a full DROP_* queue discards anything, and every YIELD_EVERY
+            # records otherwise, so a long burst does not starve the workers
+            if not i % self.YIELD_EVERY or any(route.full for route in dropping):
+                await asyncio.sleep(0)
+            blocked = [route for route in routes if not route.put_nowait(record)]
+            if blocked:
+                await asyncio.gather(*(route.put(record) for route in blocked))
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-route counters, queue depth, lag and throughput"""
+        return {str(name): {"depth": route.depth, "throughput": route.stats.throughput,
+                            "enqueued": route.stats.enqueued, "written": route.stats.written,
+                            "dropped": route.stats.dropped, "failed": route.stats.failed,
+                            "batches": route.stats.batches, "lag": route.stats.lag,
+                            "max_lag": route.stats.max_lag}
+                for name, route in self.routes.items()}
+
+    async def close(self, drain: bool = True):
+        """Stop all routes, by default after writing everything already queued"""
+        if self._running:
+            await asyncio.gather(*(route.stop(drain) for route in self.routes.values()))
+            self._running = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1 @@
+from datacore.readers.dbn import DBNReader, DBNMetadata
@@ -0,0 +1,377 @@
+import mmap
+import struct
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Iterator, BinaryIO
+
+import numpy as np
+
+from datacore.models.order import OrderSide, OrderAction
+from datacore.models.mktdata.schema import MktDataSchema
+from datacore.models.mktdata.datasource import DataSource
+from datacore.models.mktdata.realtime import MarketByPrice1, MarketByPrice10Batch, PX, SZ, CT
+from datacore.models.orderbook import OrderBookEventBatch
+
+DBN_MAGIC = b"DBN"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+UNDEF_PRICE = 2 ** 63 - 1  # Databento null price
+INT64_MAX = 2 ** 63 - 1
+
+# Schema ids as stored in the DBN metadata header
+DBN_SCHEMAS = {
+    0: MktDataSchema.MBO,
+    1: MktDataSchema.MBP_1,
+    2: MktDataSchema.MBP_10,
+    4: MktDataSchema.TRADES,
+    5: MktDataSchema.OHLCV_1S,
+    6: MktDataSchema.OHLCV_1M,
+    7: MktDataSchema.OHLCV_1H,
+    8: MktDataSchema.OHLCV_1D,
+}
+
+_HEADER = [
+    ("length", "u1"),         # Record length in 4-byte words.
+    ("rtype", "u1"),
+    ("publisher_id", "<u2"),
+    ("instrument_id", "<u4"),
+    ("ts_event", "<i8"),
+]
+
+_MBP_BODY = [
+    ("price", "<i8"),
+    ("size", "<u4"),
+    ("action", "u1"),
+    ("side", "u1"),
+    ("flags", "u1"),
+    ("depth", "u1"),
+    ("ts_recv", "<i8"),
+    ("ts_in_delta", "<i4"),
+    ("sequence", "<u4"),
+]
+
+BID_ASK_PAIR = np.dtype([
+    ("bid_px", "<i8"),
+    ("ask_px", "<i8"),
+    ("bid_sz", "<u4"),
+    ("ask_sz", "<u4"),
+    ("bid_ct", "<u4"),
+    ("ask_ct", "<u4"),
+])
+
+DBN_DTYPES = {
+    MktDataSchema.MBO: np.dtype(_HEADER + [
+        ("order_id", "<u8"),
+        ("price", "<i8"),
+        ("size", "<u4"),
+        ("flags", "u1"),
+        ("channel_id", "u1"),
+        ("action", "u1"),
+        ("side", "u1"),
+        ("ts_recv", "<i8"),
+        ("ts_in_delta", "<i4"),
+        ("sequence", "<u4"),
+    ]),
+    MktDataSchema.MBP_1: np.dtype(_HEADER + _MBP_BODY + [
+        ("bid_px_00", "<i8"),
+        ("ask_px_00", "<i8"),
+        ("bid_sz_00", "<u4"),
+        ("ask_sz_00", "<u4"),
+        ("bid_ct_00", "<u4"),
+        ("ask_ct_00", "<u4"),
+    ]),
+    MktDataSchema.MBP_10: np.dtype(_HEADER + _MBP_BODY + [("levels", BID_ASK_PAIR, (10,))]),
+    MktDataSchema.TRADES: np.dtype(_HEADER + _MBP_BODY),
+}
+for _schema in (MktDataSchema.OHLCV_1S, MktDataSchema.OHLCV_1M, MktDataSchema.OHLCV_1H, MktDataSchema.OHLCV_1D):
+    DBN_DTYPES[_schema] = np.dtype(_HEADER + [
+        ("open", "<i8"),
+        ("high", "<i8"),
+        ("low", "<i8"),
+        ("close", "<i8"),
+        ("volume", "<u8"),
+    ])
+
+_METADATA_FIXED = struct.Struct("<16sHQQQ")
+_V1_SYMBOL_CSTR_LEN = 22
+
+
+@dataclass
+class DBNMetadata:
+    """Header of a DBN file"""
+    version: int
+    dataset: str
+    schema: Optional[MktDataSchema]
+    start: int
+    end: int
+    limit: int
+    stype_in: int
+    stype_out: int
+    ts_out: bool
+    symbols: List[str] = field(default_factory=list)
+    instrument_symbols: Dict[int, str] = field(default_factory=dict)  # instrument_id -> raw symbol
+    length: int = 0  # Total header size in bytes, records start right after it
+
+
+class _Buffer:
+    """Sequential reads over bytes"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def read(self, n: int) -> bytes:
+        out = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return out
+
+    def u32(self) -> int:
+        return struct.unpack("<I", self.read(4))[0]
+
+    def cstr(self, n: int) -> str:
+        return bytes(self.read(n)).split(b"\0", 1)[0].decode()
+
+
+def parse_metadata(prefix: bytes, body: bytes) -> DBNMetadata:
+    """Parse the metadata header from its 8-byte prefix (magic, version, length) and body"""
+    if prefix[:3] != DBN_MAGIC:
+        raise ValueError("Not a DBN stream: missing 'DBN' magic bytes")
+    version = prefix[3]
+    if version not in (1, 2, 3):
+        raise ValueError(f"Unsupported DBN version {version}")
+    dataset, schema, start, end, limit = _METADATA_FIXED.unpack_from(body, 0)
+    pos = _METADATA_FIXED.size
+    if version == 1:
+        pos += 8  # record_count
+    stype_in, stype_out, ts_out = body[pos], body[pos + 1], body[pos + 2]
+    pos += 3
+    if version == 1:
+        cstr_len = _V1_SYMBOL_CSTR_LEN
+    else:
+        cstr_len = struct.unpack_from("<H", body, pos)[0]
+    metadata = DBNMetadata(
+        version=version,
+        dataset=dataset.split(b"\0", 1)[0].decode(),
+        schema=DBN_SCHEMAS.get(schema),
+        start=start,
+        end=end,
+        limit=limit,
+        stype_in=stype_in,
+        stype_out=stype_out,
+        ts_out=bool(ts_out),
+        length=8 + len(body),
+    )
+
+    # Variable part after the 100 fixed bytes: schema definition (unused), symbols, partial,
+    # not_found and symbol mappings.
+    buf = _Buffer(body)
+    buf.pos = 100
+    buf.read(buf.u32())
+    metadata.symbols = [buf.cstr(cstr_len) for _ in range(buf.u32())]
+    for _ in range(2):
+        buf.read(buf.u32() * cstr_len)
+    for _ in range(buf.u32()):
+        raw_symbol = buf.cstr(cstr_len)
+        for _ in range(buf.u32()):
+            buf.read(8)  # start_date, end_date
+            mapped = buf.cstr(cstr_len)
+            if mapped.isdigit():
+                metadata.instrument_symbols[int(mapped)] = raw_symbol
+    return metadata
+
+
+class DBNReader:
+    """
+    Reads a Databento DBN file (optionally zstd-compressed) as NumPy record batches.
+
+    Uncompressed files are memory-mapped and every batch is a zero-copy view of the map, so only the
+    pages being touched are resident. Compressed files are decompressed as a stream, one batch at a time
+    (requires ``zstandard``). Supported schemas: MBO, MBP-1, MBP-10, TRADES and OHLCV-*.
+    Prices stay in 1e-9 units and timestamps in epoch ns, as in the file.
+    """
+
+    def __init__(self, path: str, batch_size: int = 65_536):
+        self.path = path
+        self.batch_size = batch_size
+        self._file: BinaryIO = open(path, "rb")
+        self._mmap: Optional[mmap.mmap] = None
+        self._stream = None
+        self.compressed = self._file.read(4) == ZSTD_MAGIC
+        self._file.seek(0)
+        if self.compressed:
+            import zstandard
+            self._stream = zstandard.ZstdDecompressor().stream_reader(self._file)
+            prefix = self._read_exact(8)
+            body = self._read_exact(struct.unpack_from("<I", prefix, 4)[0])
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            prefix = self._mmap[:8]
+            body = self._mmap[8:8 + struct.unpack_from("<I", prefix, 4)[0]]
+        self.metadata = parse_metadata(prefix, body)
+        if self.metadata.schema not in DBN_DTYPES:
+            raise ValueError(f"Unsupported DBN schema in {path!r}")
+        dtype = DBN_DTYPES[self.metadata.schema]
+        if self.metadata.ts_out:
+            dtype = np.dtype(dtype.descr + [("ts_out", "<i8")])
+        self.dtype = dtype
+
+    @property
+    def schema(self) -> MktDataSchema:
+        return self.metadata.schema
+
+    def _read_exact(self, n: int) -> bytes:
+        chunks = []
+        while n > 0:
+            chunk = self._stream.read(n)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            n -= len(chunk)
+        return b"".join(chunks)
+
+    def _check(self, batch: np.ndarray) -> np.ndarray:
+        if len(batch) and (batch["length"] != self.dtype.itemsize // 4).any():
+            raise ValueError(f"{self.path!r} mixes record types, only single-schema files are supported")
+        return batch
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return self.iter_batches()
+
+    def iter_batches(self, batch_size: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yield structured arrays of up to ``batch_size`` records"""
+        batch_size = batch_size or self.batch_size
+        itemsize = self.dtype.itemsize
+        if self._mmap is not None:
+            offset = self.metadata.length
+            count = (len(self._mmap) - offset) // itemsize
+            records = np.frombuffer(self._mmap, dtype=self.dtype, count=count, offset=offset)
+            for start in range(0, count, batch_size):
+                yield self._check(records[start:start + batch_size])
+        else:
+            while True:
+                data = self._read_exact(batch_size * itemsize)
+                count = len(data) // itemsize
+                if not count:
+                    return
+                yield self._check(np.frombuffer(data, dtype=self.dtype, count=count))
+
+    def iter_event_batches(self, batch_size: Optional[int] = None) -> Iterator[OrderBookEventBatch]:
+        """MBO batches converted to ``OrderBookEventBatch`` columns"""
+        if self.schema is not MktDataSchema.MBO:
+            raise ValueError(f"iter_event_batches requires an MBO file, got {self.schema}")
+        for records in self.iter_batches(batch_size):
+            yield to_event_batch(records, self.metadata.instrument_symbols)
+
+    def iter_mbp10_batches(self, venue: str, batch_size: Optional[int] = None) -> Iterator[MarketByPrice10Batch]:
+        """MBP-10 batches converted to ``MarketByPrice10Batch`` with decimal prices"""
+        if self.schema is not MktDataSchema.MBP_10:
+            raise ValueError(f"iter_mbp10_batches requires an MBP-10 file, got {self.schema}")
+        for records in self.iter_batches(batch_size):
+            yield to_mbp10_batch(records, venue, self.metadata.instrument_symbols)
+
+    def iter_records(self, venue: str, batch_size: Optional[int] = None):
+        """
+        Materialize one ``OrderBookEvent`` (MBO), ``MarketByPrice1`` (MBP-1) or ``MarketByPrice10`` (MBP-10)
+        per record, lazily
+        """
+        if self.schema is MktDataSchema.MBO:
+            for batch in self.iter_event_batches(batch_size):
+                yield from batch
+        elif self.schema is MktDataSchema.MBP_1:
+            for records in self.iter_batches(batch_size):
+                yield from to_mbp1(records, venue, self.metadata.instrument_symbols)
+        elif self.schema is MktDataSchema.MBP_10:
+            for batch in self.iter_mbp10_batches(venue, batch_size):
+                yield from batch
+        else:
+            raise ValueError(f"iter_records supports MBO, MBP-1 and MBP-10 files, got {self.schema}")
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # batches still reference the map, it is released with them
+        if self._stream is not None:
+            self._stream.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def to_event_batch(records: np.ndarray, symbols: Optional[Dict[int, str]] = None) -> OrderBookEventBatch:
+    """
+    Copy DBN MBO records into an ``OrderBookEventBatch``. Order ids are stored as int64, so ids of 2**63 and
+    above raise ValueError instead of wrapping to negative (or null) ids.
+    """
+    order_id = records["order_id"]
+    if len(order_id) and order_id.max() > INT64_MAX:
+        raise ValueError(f"DBN order_id {int(order_id.max())} does not fit in an int64 order_id")
+    batch = OrderBookEventBatch.empty(len(records), dict(symbols or {}))
+    data = batch.data
+    for name in ("ts_recv", "ts_event", "ts_in_delta", "instrument_id", "publisher_id", "rtype", "sequence",
+                 "action", "side", "price", "size", "flags", "channel_id"):
+        data[name] = records[name]
+    data["order_id"] = order_id.astype(np.int64)
+    return batch
+
+
+def to_mbp1(records: np.ndarray, venue: str, symbols: Optional[Dict[int, str]] = None) -> List[MarketByPrice1]:
+    """
+    Materialize DBN MBP-1 records as ``MarketByPrice1`` with decimal prices; an undefined trade price is NaN
+    and undefined quotes are None
+    """
+    symbols = symbols or {}
+    columns = {name: records[name].tolist() for name in records.dtype.names}
+    out = []
+    for i in range(len(records)):
+        price = columns["price"][i]
+        bid_px = columns["bid_px_00"][i]
+        bid_px = bid_px / 1e9 if bid_px != UNDEF_PRICE else None
+        ask_px = columns["ask_px_00"][i]
+        ask_px = ask_px / 1e9 if ask_px != UNDEF_PRICE else None
+        out.append(MarketByPrice1(
+            venue=venue,
+            vendor=DataSource.DataBento,
+            symbol=symbols.get(columns["instrument_id"][i], ""),
+            price=price / 1e9 if price != UNDEF_PRICE else float("nan"),
+            ts_event=columns["ts_event"][i],
+            ts_recv=columns["ts_recv"][i],
+            ts_in_delta=columns["ts_in_delta"][i],
+            action=OrderAction(chr(columns["action"][i])),
+            side=OrderSide(chr(columns["side"][i])),
+            size=columns["size"][i],
+            instrument_id=columns["instrument_id"][i],
+            publisher_id=columns["publisher_id"][i],
+            rtype=columns["rtype"][i],
+            sequence=columns["sequence"][i],
+            flags=columns["flags"][i],
+            depth=columns["depth"][i],
+            bid_px_00=bid_px,
+            bid_sz_00=columns["bid_sz_00"][i],
+            bid_ct_00=columns["bid_ct_00"][i],
+            mid_px_00=(bid_px + ask_px) / 2 if bid_px is not None and ask_px is not None else None,
+            ask_px_00=ask_px,
+            ask_sz_00=columns["ask_sz_00"][i],
+            ask_ct_00=columns["ask_ct_00"][i],
+        ))
+    return out
+
+
+def to_mbp10_batch(records: np.ndarray, venue: str, symbols: Optional[Dict[int, str]] = None) -> MarketByPrice10Batch:
+    """Copy DBN MBP-10 records into a ``MarketByPrice10Batch`` with decimal prices"""
+    batch = MarketByPrice10Batch.empty(len(records), venue, DataSource.DataBento, dict(symbols or {}))
+    data = batch.data
+    for name in ("ts_recv", "ts_event", "ts_in_delta", "instrument_id", "publisher_id", "rtype", "sequence",
+                 "action", "side", "size", "flags", "depth"):
+        data[name] = records[name]
+    data["price"] = np.where(records["price"] == UNDEF_PRICE, np.nan, records["price"] / 1e9)
+    levels = records["levels"]
+    for side, prefix in (("bids", "bid"), ("asks", "ask")):
+        px = levels[f"{prefix}_px"]
+        data[side][..., PX] = np.where(px == UNDEF_PRICE, np.nan, px / 1e9)
+        data[side][..., SZ] = levels[f"{prefix}_sz"]
+        data[side][..., CT] = levels[f"{prefix}_ct"]
+    return batch
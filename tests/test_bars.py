@@ -0,0 +1,74 @@
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from datacore.engine.bars import BarAggregator, aggregate, resample
+from datacore.models.assets.base import TradingHours
+from datacore.models.mktdata.frequency import Frequency
+
+NY = ZoneInfo("America/New_York")
+FREQUENCIES = [Frequency.MIN_5, Frequency.HOUR_1, Frequency.DAY_1, Frequency.WEEK_1, Frequency.MONTH_1]
+
+
+def hours():
+    return TradingHours(time_zone="America/New_York", open_time_local=["18:00:00"], close_time_local=["17:00:00"],
+                        days=[6, 0, 1, 2, 3, 4])
+
+
+def ns(*args) -> int:
+    return int(dt.datetime(*args, tzinfo=NY).timestamp()) * 1_000_000_000
+
+
+def test_overnight_session_boundary():
+    # 16:30 Monday still belongs to the session that opened Sunday 18:00, 18:30 to Monday's session
+    ts = [ns(2026, 3, 2, 16, 30), ns(2026, 3, 2, 18, 30), ns(2026, 3, 2, 19, 10)]
+    bars = aggregate(ts, [1.0, 2.0, 3.0], [1, 2, 3], hours(), [Frequency.HOUR_1, Frequency.DAY_1])
+    daily = bars[Frequency.DAY_1]
+    assert daily["session"].astype(str).tolist() == ["2026-03-01", "2026-03-02"]
+    assert daily["ts_event"].tolist() == [ns(2026, 3, 1, 18), ns(2026, 3, 2, 18)]
+    assert daily["open"].tolist() == [1.0, 2.0] and daily["close"].tolist() == [1.0, 3.0]
+    assert daily["volume"].tolist() == [1.0, 5.0]
+    hourly = bars[Frequency.HOUR_1]
+    assert hourly["ts_event"].tolist() == [ns(2026, 3, 2, 16), ns(2026, 3, 2, 18), ns(2026, 3, 2, 19)]
+
+
+def test_empty_buckets_are_skipped():
+    ts = [ns(2026, 3, 3, 10, 5), ns(2026, 3, 3, 10, 50), ns(2026, 3, 3, 12, 30)]
+    hourly = aggregate(ts, [5.0, 4.0, 6.0], [1, 1, 1], hours(), [Frequency.HOUR_1])[Frequency.HOUR_1]
+    assert hourly["ts_event"].tolist() == [ns(2026, 3, 3, 10), ns(2026, 3, 3, 12)]
+    assert hourly["count"].tolist() == [2, 1]
+    assert (hourly["low"].tolist(), hourly["high"].tolist()) == ([4.0, 6.0], [5.0, 6.0])
+    empty = aggregate([], [], [], hours(), FREQUENCIES)
+    assert set(empty) == set(FREQUENCIES) and all(len(bars) == 0 for bars in empty.values())
+
+
+def test_resample_matches_aggregating_the_ticks():
+    rng = np.random.default_rng(7)
+    ts = np.sort(rng.integers(ns(2026, 3, 1, 18), ns(2026, 3, 13, 17), 2_000))
+    price = 70 + rng.standard_normal(len(ts)).cumsum() / 10
+    size = rng.integers(1, 10, len(ts)).astype(float)
+    five = aggregate(ts, price, size, hours(), [Frequency.MIN_5])[Frequency.MIN_5]
+    direct = aggregate(ts, price, size, hours(), [Frequency.DAY_1])[Frequency.DAY_1]
+    assert resample(five, hours(), Frequency.DAY_1).tolist() == direct.tolist()
+
+
+def test_streaming_matches_batch():
+    rng = np.random.default_rng(11)
+    ts = np.sort(rng.integers(ns(2026, 2, 22, 18), ns(2026, 3, 20, 17), 5_000))
+    price = 70 + rng.standard_normal(len(ts)).cumsum() / 10
+    size = rng.integers(1, 10, len(ts)).astype(float)
+    batch = aggregate(ts, price, size, hours(), FREQUENCIES)
+
+    aggregator = BarAggregator(hours(), FREQUENCIES)
+    for t, p, s in zip(ts.tolist(), price.tolist(), size.tolist()):
+        aggregator.update(t, p, s)
+    aggregator.flush()
+    for frequency in FREQUENCIES:
+        streamed = [bar for bar in aggregator.completed if bar.frequency is frequency]
+        expected = batch[frequency]
+        assert [b.ts_event for b in streamed] == expected["ts_event"].tolist()
+        assert [b.session for b in streamed] == expected["session"].tolist()
+        assert [b.count for b in streamed] == expected["count"].tolist()
+        for field in ("open", "high", "low", "close", "volume"):
+            assert np.allclose([getattr(b, field) for b in streamed], expected[field])
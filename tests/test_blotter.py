@@ -0,0 +1,70 @@
+import pytest
+
+from datacore.models.execution import Order, OrderSide, OrderStatus, Fill, OrderBlotter, StatusUpdate
+
+
+def blotter_with(*orders):
+    blotter = OrderBlotter()
+    blotter.add_many(orders)
+    return blotter
+
+
+def test_fills_update_order_position_and_indexes():
+    blotter = blotter_with(Order("a", "CLZ6", OrderSide.BUY, 10, strategy="s"),
+                           Order("b", "CLZ6", OrderSide.SELL, 15, strategy="s"))
+    blotter.apply_fill(Fill("1", "a", 4, 100.0, 1))
+    blotter.apply_fill(Fill("2", "a", 6, 101.0, 2))
+    assert blotter.get("a").avg_price == pytest.approx(100.6)
+    assert blotter.get("a").status is OrderStatus.FILLED
+    blotter.apply_fill(Fill("3", "b", 15, 110.0, 3, fee=1.5))
+    position = blotter.position("s", "CLZ6")
+    assert position.quantity == -5
+    assert position.avg_price == 110.0
+    assert position.realized_pnl == pytest.approx(10 * (110.0 - 100.6))
+    assert position.fees == 1.5
+    assert {o.order_id for o in blotter.by_status(OrderStatus.FILLED)} == {"a", "b"}
+    assert blotter.open_orders() == []
+
+
+def test_duplicate_fill_is_ignored():
+    blotter = blotter_with(Order("a", "CLZ6", OrderSide.BUY, 10))
+    assert blotter.apply_fills([Fill("1", "a", 4, 100.0, 1), Fill("1", "a", 4, 100.0, 1)]) == 1
+    assert blotter.get("a").filled_quantity == 4
+
+
+def test_zero_quantity_fill_on_flat_position():
+    blotter = blotter_with(Order("a", "CLZ6", OrderSide.BUY, 10, status=OrderStatus.NEW))
+    assert blotter.apply_fill(Fill("1", "a", 0, 100.0, 1, fee=0.25)) is not None
+    order = blotter.get("a")
+    assert order.status is OrderStatus.NEW
+    assert blotter.by_status(OrderStatus.NEW) == [order]
+    assert blotter.position("", "CLZ6").quantity == 0
+    assert blotter.position("", "CLZ6").fees == 0.25
+
+
+def test_failed_fill_can_be_retried():
+    blotter = blotter_with(Order("a", "CLZ6", OrderSide.BUY, 10))
+    with pytest.raises(ValueError):
+        blotter.apply_fill(Fill("1", "a", -1, 100.0, 1))
+    assert blotter.get("a").filled_quantity == 0
+    assert blotter.apply_fill(Fill("1", "a", 1, 100.0, 1)) is not None
+
+
+def test_late_fill_keeps_terminal_status():
+    blotter = blotter_with(Order("a", "CLZ6", OrderSide.BUY, 10, status=OrderStatus.NEW))
+    blotter.apply_status(StatusUpdate("a", OrderStatus.CANCELLED, 1))
+    blotter.apply_fill(Fill("1", "a", 10, 100.0, 2))
+    order = blotter.get("a")
+    assert order.status is OrderStatus.CANCELLED
+    assert order.filled_quantity == 10
+    assert blotter.position("", "CLZ6").quantity == 10
+
+
+def test_snapshot_round_trip(tmp_path):
+    blotter = blotter_with(Order("a", "CLZ6", OrderSide.SELL, 5, strategy="s"))
+    blotter.apply_fill(Fill("1", "a", 2, 10.0, 1, fee=0.1))
+    blotter.snapshot(str(tmp_path / "blotter.pkl"))
+    restored = OrderBlotter.restore(str(tmp_path / "blotter.pkl"))
+    assert restored.get("a").to_dict() == blotter.get("a").to_dict()
+    assert restored.position("s", "CLZ6").to_dict() == blotter.position("s", "CLZ6").to_dict()
+    assert restored.apply_fill(Fill("1", "a", 2, 10.0, 1)) is None
@@ -0,0 +1,56 @@
+from datacore.engine.book import BookEngine
+from datacore.models.order import OrderAction, OrderSide
+from datacore.models.orderbook import OrderBookEvent, OrderBookEventBatch
+
+PX = 1_000_000_000
+
+
+def event(sequence, action, side, price, size, order_id):
+    return OrderBookEvent(ts_recv=sequence, ts_event=sequence, ts_in_delta=0, instrument_id=1, symbol="ESZ6",
+                          publisher_id=1, rtype=160, sequence=sequence, action=action, side=side,
+                          price=price * PX, size=size, flags=0, order_id=order_id)
+
+
+def test_modify_of_unknown_order_is_an_add():
+    engine = BookEngine("XCME", "databento")
+    engine.apply(event(1, OrderAction.MODIFY, OrderSide.BID, 100, 5, 7))
+    book = engine.books[1]
+    assert book.best_bid == (100 * PX, 5, 1)
+    assert book.orders[7] == [ord(OrderSide.BID), 100 * PX, 5]
+    assert book.unmatched == 0
+
+    engine.apply(event(2, OrderAction.CANCEL, OrderSide.BID, 100, 5, 7))
+    assert book.best_bid is None and not book.orders
+
+
+def test_unsided_add_is_dropped_and_counted():
+    engine = BookEngine("XCME", "databento")
+    events = [event(1, OrderAction.ADD, OrderSide.NONE, 100, 5, 1),
+              event(2, OrderAction.MODIFY, OrderSide.NONE, 101, 5, 2),
+              event(3, OrderAction.ADD, OrderSide.ASK, 102, 3, 3)]
+    engine.apply_batch(OrderBookEventBatch.from_events(events))
+    book = engine.books[1]
+    assert book.unsided == 2
+    assert list(book.orders) == [3]
+    assert book.best_bid is None and book.best_ask == (102 * PX, 3, 1)
+
+
+def test_unsided_cancel_and_modify_keep_the_resting_side():
+    engine = BookEngine("XCME", "databento")
+    engine.apply(event(1, OrderAction.ADD, OrderSide.BID, 100, 5, 7))
+    engine.apply(event(2, OrderAction.MODIFY, OrderSide.NONE, 101, 4, 7))
+    book = engine.books[1]
+    assert book.best_bid == (101 * PX, 4, 1) and book.best_ask is None
+    engine.apply(event(3, OrderAction.CANCEL, OrderSide.NONE, 101, 1, 7))
+    assert book.best_bid == (101 * PX, 3, 1) and book.best_ask is None
+    engine.apply(event(4, OrderAction.CANCEL, OrderSide.NONE, 101, 3, None))
+    assert book.best_bid == (101 * PX, 3, 1) and book.unsided == 1
+
+
+def test_snapshots_carry_ts_event_as_str():
+    engine = BookEngine("XCME", "databento")
+    engine.apply(event(1, OrderAction.ADD, OrderSide.BID, 100, 5, 7))
+    engine.apply(event(2, OrderAction.ADD, OrderSide.ASK, 101, 2, 8))
+    mbp1, mbp10 = engine.mbp1(1), engine.mbp10(1)
+    assert mbp1.ts_event == mbp10.ts_event == "2"
+    assert (mbp1.bid_px_00, mbp1.ask_px_00) == (100.0, 101.0)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from datacore.db.cache import HistoryCache, MemoryBackend, DiskBackend
+
+DTYPE = np.dtype([("ts_event", np.int64), ("price", np.float64)])
+
+
+def source(calls, delay=0.0):
+    def fetch(table, symbol, start, end):
+        calls.append((symbol, start, end))
+        time.sleep(delay)
+        ts = np.arange(start, end, dtype=np.int64)
+        return np.array(list(zip(ts.tolist(), (ts * 0.5).tolist())), dtype=DTYPE)
+    return fetch
+
+
+@pytest.mark.parametrize("disk", [False, True])
+def test_only_missing_ranges_are_fetched(tmp_path, disk):
+    calls = []
+    cache = HistoryCache(source(calls), DiskBackend(tmp_path) if disk else MemoryBackend())
+    assert cache.get("t", "A", 0, 10)["ts_event"].tolist() == list(range(10))
+    assert cache.get("t", "A", 5, 20)["ts_event"].tolist() == list(range(5, 20))
+    assert cache.get("t", "A", 2, 18)["price"].tolist() == [i * 0.5 for i in range(2, 18)]
+    assert calls == [("A", 0, 10), ("A", 10, 20)]
+    assert (cache.stats.misses, cache.stats.partial_hits, cache.stats.hits) == (1, 1, 1)
+
+
+def test_returned_rows_are_read_only():
+    cache = HistoryCache(source([]))
+    rows = cache.get("t", "A", 0, 10)
+    with pytest.raises(ValueError):
+        rows["price"][0] = 1.0
+    assert cache.get("t", "A", 0, 10)["price"][0] == 0.0
+
+
+def test_fetch_runs_outside_the_cache_lock():
+    calls = []
+    cache = HistoryCache(source(calls, delay=0.2))
+    results = {}
+
+    def get(symbol):
+        results[symbol] = cache.get("t", symbol, 0, 100)
+
+    threads = [threading.Thread(target=get, args=(s,)) for s in ("A", "A", "B", "C")]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    # Different keys fetch concurrently, the second request for A waits for the first instead of refetching
+    assert elapsed < 0.5
+    assert sorted(calls) == [("A", 0, 100), ("B", 0, 100), ("C", 0, 100)]
+    assert all(len(rows) == 100 for rows in results.values())
+
+
+def test_key_evicted_during_fetch_is_refilled():
+    calls = []
+    cache = HistoryCache(source(calls), MemoryBackend(max_bytes=10 * DTYPE.itemsize))
+    cache.get("t", "A", 0, 10)
+    fetch = cache.fetch
+    evicted = []
+
+    def evicting(table, symbol, start, end):
+        if symbol == "A" and not evicted:
+            evicted.append(symbol)
+            cache.get("t", "B", 0, 10)
+        return fetch(table, symbol, start, end)
+
+    cache.fetch = evicting
+    assert cache.get("t", "A", 0, 20)["ts_event"].tolist() == list(range(20))
+    assert [c for c in calls if c[0] == "A"] == [("A", 0, 10), ("A", 10, 20), ("A", 0, 10)]
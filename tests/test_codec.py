@@ -0,0 +1,46 @@
+import pytest
+
+from datacore.models.order import OrderAction, OrderSide
+from datacore.models.mktdata.codec import encode, decode
+from datacore.models.mktdata.historical import OHLCV1D
+from datacore.models.mktdata.realtime import MarketByPrice1, MarketByPrice10
+
+
+def mbp1(i, ts_event, **kwargs):
+    return MarketByPrice1(venue="CME", vendor="databento", symbol="CLZ6", price=70.0 + i, ts_event=ts_event,
+                          action=OrderAction.TRADE, side=OrderSide.ASK, size=1, sequence=i, **kwargs)
+
+
+@pytest.mark.parametrize("n", [1, 40])  # row-wise and column-wise decoding
+@pytest.mark.parametrize("as_int", [False, True])
+def test_mbp1_round_trip_keeps_ts_event_type(n, as_int):
+    ts = [1_760_000_000_000_000_000 + i for i in range(n)]
+    records = [mbp1(i, t if as_int else str(t)) for i, t in enumerate(ts)]
+    decoded = decode(encode(records))
+    assert decoded == records
+    assert all(type(r.ts_event) is (int if as_int else str) for r in decoded)
+
+
+@pytest.mark.parametrize("n", [1, 40])
+def test_unsigned_ids_use_their_full_range(n):
+    records = [mbp1(i, str(i), instrument_id=4_000_000_000, publisher_id=60_000) for i in range(n)]
+    records.append(mbp1(n, str(n)))
+    decoded = decode(encode(records))
+    assert decoded == records
+    assert decoded[0].instrument_id == 4_000_000_000 and decoded[0].publisher_id == 60_000
+    assert decoded[-1].instrument_id is None and decoded[-1].publisher_id is None
+
+
+def test_daily_ts_event_stays_an_iso_date():
+    records = [OHLCV1D(venue="CME", vendor="databento", symbol="CLZ6", ts_event="2026-03-02", close=70.1,
+                       instrument_id=3_000_000_000, publisher_id=40_000)]
+    assert decode(encode(records)) == records
+
+
+def test_mbp10_ts_event_type_round_trips():
+    def record(ts_event):
+        return MarketByPrice10(venue="CME", vendor="databento", symbol="CLZ6", price=70.0, ts_event=ts_event,
+                               instrument_id=1)
+
+    assert [r.ts_event for r in decode(encode([record(5)]))] == [5]
+    assert [r.ts_event for r in decode(encode([record("5")]))] == ["5"]
@@ -0,0 +1,63 @@
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from datacore.analytics.continuous import ContinuousSeries, Adjustment
+from datacore.models.assets.roll import RollCalendar, ExpiryRule
+from datacore.models.assets.session import to_epoch_ns
+
+TZ = ZoneInfo("America/New_York")
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+CODES = ["F", "G", "H", "J", "K", "M", "N", "Q", "U", "V", "X", "Z"]
+DTYPE = [("ts_event", np.int64), ("open", np.float64), ("high", np.float64), ("low", np.float64),
+         ("close", np.float64)]
+
+
+def make_bars(calendar: RollCalendar, seed: int = 0):
+    """Daily bars for every contract over the 100 days before its expiry, each contract at its own level"""
+    rng = np.random.default_rng(seed)
+    bars = {}
+    for i, (key, expiry) in enumerate(zip(calendar.keys, calendar.expiries)):
+        days = [expiry - dt.timedelta(days=d) for d in range(100, -1, -1)]
+        # Some days missing, so rolls also happen between bars of different contracts
+        days = [d for d in days if rng.random() > 0.1]
+        ts = np.array([to_epoch_ns(dt.datetime.combine(d, dt.time(0)), TZ) for d in days], dtype=np.int64)
+        close = 50 + i + np.cumsum(rng.normal(0, 0.5, len(ts)))
+        rows = np.empty(len(ts), dtype=DTYPE)
+        rows["ts_event"], rows["close"] = ts, close
+        rows["open"], rows["high"], rows["low"] = close - 0.1, close + 0.5, close - 0.5
+        bars[key] = rows
+    return bars
+
+
+def split(bars, cuts):
+    edges = [np.iinfo(np.int64).min] + list(cuts) + [np.iinfo(np.int64).max]
+    for lo, hi in zip(edges, edges[1:]):
+        yield {key: b[(b["ts_event"] > lo) & (b["ts_event"] <= hi)] for key, b in bars.items()}
+
+
+@pytest.mark.parametrize("adjustment", [Adjustment.RATIO, Adjustment.DIFFERENCE])
+def test_extend_in_pieces_equals_full_build(adjustment):
+    calendar = RollCalendar.build("CL", MONTHS, CODES, ExpiryRule.ENERGY_25TH, TZ, dt.time(17), 2023, 2025)
+    bars = make_bars(calendar)
+    full = ContinuousSeries(calendar, adjustment=adjustment)
+    full.extend(bars)
+
+    # Cut exactly at every roll (old contract's last bar ends a batch), plus arbitrary points in between
+    rolls = [ts for ts, _, _, _ in full.rolls]
+    stored = full.forward_adjusted["ts_event"]
+    at_rolls = [int(stored[np.searchsorted(stored, ts) - 1]) for ts in rolls]
+    rng = np.random.default_rng(1)
+    for cuts in (at_rolls, sorted(rng.choice(stored, 40, replace=False).tolist())):
+        pieces = ContinuousSeries(calendar, adjustment=adjustment)
+        for batch in split(bars, cuts):
+            pieces.extend(batch)
+        assert len(pieces.rolls) == len(full.rolls)
+        for a, b in zip(pieces.rolls, full.rolls):
+            assert a[:3] == b[:3] and a[3] == pytest.approx(b[3])
+        assert pieces.factor == pytest.approx(full.factor)
+        np.testing.assert_array_equal(pieces.forward_adjusted["ts_event"], full.forward_adjusted["ts_event"])
+        np.testing.assert_array_equal(pieces.contracts(), full.contracts())
+        np.testing.assert_allclose(pieces.adjusted()["close"], full.adjusted()["close"])
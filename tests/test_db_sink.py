@@ -0,0 +1,85 @@
+from sqlalchemy import create_engine, select, func
+
+from datacore.models.order import OrderAction, OrderSide
+from datacore.models.mktdata.realtime import MarketByPrice1, MarketByPrice10
+from datacore.models.mktdata.historical import OHLCV1D
+from datacore.orm.spec import Partitioning
+from datacore.outputs.db_sink import DatabaseSink
+
+
+def tick(ts, sequence, price=70.0, size=1, action=OrderAction.TRADE, side=OrderSide.BID):
+    return MarketByPrice1(venue="CME", vendor="databento", symbol="CLZ6", price=price, ts_event=ts,
+                          sequence=sequence, size=size, action=action, side=side, bid_px_00=69.9, ask_px_00=70.1)
+
+
+def rows(sink, name):
+    table = sink.tables.table(name, MarketByPrice1)
+    with sink.engine.connect() as conn:
+        return conn.execute(select(table).order_by(table.c.ts_event, table.c.price)).mappings().all()
+
+
+def test_ticks_sharing_a_timestamp_are_kept():
+    sink = DatabaseSink(create_engine("sqlite://"))
+    records = [tick(1_000, 5, 70.0), tick(1_000, 5, 70.01), tick(1_000, 6, 70.0),
+               tick(1_000, 6, 70.0, action=OrderAction.ADD, side=OrderSide.ASK)]
+    written = sink.write(records)
+    name = records[0].db_table_name()
+    assert written == {name: 4}
+    assert len(rows(sink, name)) == 4
+
+
+def test_quote_only_ticks_are_written():
+    sink = DatabaseSink(create_engine("sqlite://"))
+    quotes = [MarketByPrice1(venue="CME", vendor="databento", symbol="CLZ6", price=70.0, ts_event=1_000,
+                             bid_px_00=69.9, ask_px_00=70.1) for _ in range(2)]
+    name = quotes[0].db_table_name()
+    assert sink.write(quotes) == {name: 2}
+    assert sink.write(quotes[:1]) == {name: 1}
+    written = rows(sink, name)
+    assert len(written) == 3
+    assert all(r["action"] is None and r["sequence"] is None and r["bid_px_00"] == 69.9 for r in written)
+    assert [r["row_id"] for r in written] == [1, 2, 3]
+
+
+def test_tick_tables_are_indexed_on_ts_event():
+    sink = DatabaseSink(create_engine("sqlite://"))
+    record = tick(1_000, 5)
+    sink.write([record])
+    table = sink.tables.table(record.db_table_name(), MarketByPrice1)
+    assert [c.name for c in table.primary_key.columns] == ["row_id"]
+    assert any([c.name for c in index.columns] == ["ts_event"] and not index.unique for index in table.indexes)
+
+
+def test_daily_bars_upsert_on_date():
+    sink = DatabaseSink(create_engine("sqlite://"))
+    bar = OHLCV1D(venue="CME", vendor="databento", symbol="CLZ6", ts_event="2024-01-02", close=70.0)
+    sink.write([bar])
+    sink.write([OHLCV1D(venue="CME", vendor="databento", symbol="CLZ6", ts_event="2024-01-02", close=71.0)])
+    table = sink.tables.table(bar.db_table_name(), OHLCV1D)
+    with sink.engine.connect() as conn:
+        assert conn.execute(select(table.c.close)).scalars().all() == [71.0]
+
+
+def test_partitioned_tables():
+    sink = DatabaseSink(create_engine("sqlite://"), partitioning=Partitioning.YEAR)
+    jan_2024, jan_2025 = 1_704_153_600_000_000_000, 1_735_776_000_000_000_000
+    written = sink.write([tick(jan_2024, 1), tick(jan_2025, 2), tick(jan_2025 + 1, 3)])
+    assert sorted(written.values()) == [1, 2]
+    with sink.engine.connect() as conn:
+        for name, count in written.items():
+            table = sink.tables.table(name, MarketByPrice1)
+            assert conn.execute(select(func.count()).select_from(table)).scalar() == count
+
+
+def test_mbp10_ticks_sharing_a_timestamp_are_kept():
+    sink = DatabaseSink(create_engine("sqlite://"))
+    records = [MarketByPrice10(venue="CME", vendor="databento", symbol="CLZ6", price=price, ts_event=1_000,
+                               sequence=5, size=1, action=OrderAction.TRADE, side=OrderSide.BID)
+               for price in (70.0, 70.01)]
+    # A book snapshot without event fields
+    records.append(MarketByPrice10(venue="CME", vendor="databento", symbol="CLZ6", price=70.0, ts_event=1_000))
+    name = records[0].db_table_name()
+    assert sink.write(records) == {name: 3}
+    table = sink.tables.table(name, MarketByPrice10)
+    with sink.engine.connect() as conn:
+        assert conn.execute(select(table.c.price).order_by(table.c.price)).scalars().all() == [70.0, 70.0, 70.01]
@@ -0,0 +1,147 @@
+import math
+import struct
+
+import numpy as np
+import pytest
+
+from datacore.models.order import OrderAction, OrderSide
+from datacore.models.mktdata.schema import MktDataSchema
+from datacore.readers.dbn import DBNReader, DBN_DTYPES, UNDEF_PRICE
+
+PX = 1_000_000_000
+TS = 1_772_409_600_000_000_000  # 2026-03-02
+SCHEMA_IDS = {MktDataSchema.MBO: 0, MktDataSchema.MBP_1: 1, MktDataSchema.MBP_10: 2, MktDataSchema.OHLCV_1D: 8}
+RTYPES = {MktDataSchema.MBO: 160, MktDataSchema.MBP_1: 1, MktDataSchema.MBP_10: 10, MktDataSchema.OHLCV_1D: 35}
+CSTR_LEN = 71
+
+
+def cstr(value: str) -> bytes:
+    return value.encode().ljust(CSTR_LEN, b"\0")
+
+
+def dbn_bytes(schema: MktDataSchema, records: np.ndarray, mappings: dict) -> bytes:
+    """A DBN v2 file: metadata header with raw symbol -> instrument_id mappings, then the records"""
+    body = struct.pack("<16sHQQQ", b"GLBX.MDP3", SCHEMA_IDS[schema], TS, TS + 86_400 * PX, 0)
+    body += struct.pack("<BBBH", 1, 2, 0, CSTR_LEN)
+    body = body.ljust(100, b"\0")
+    body += struct.pack("<I", 0)  # schema definition
+    body += struct.pack("<I", len(mappings)) + b"".join(cstr(s) for s in mappings)
+    body += struct.pack("<II", 0, 0)  # partial, not_found
+    body += struct.pack("<I", len(mappings))
+    for symbol, instrument_id in mappings.items():
+        body += cstr(symbol) + struct.pack("<I", 1) + struct.pack("<II", 20260302, 20260303) + cstr(str(instrument_id))
+    records["length"] = records.dtype.itemsize // 4
+    records["rtype"] = RTYPES[schema]
+    return b"DBN" + bytes([2]) + struct.pack("<I", len(body)) + body + records.tobytes()
+
+
+@pytest.fixture(params=[False, True], ids=["raw", "zstd"])
+def write(request, tmp_path):
+    def write(schema, records, mappings):
+        data = dbn_bytes(schema, records, mappings)
+        if request.param:
+            zstandard = pytest.importorskip("zstandard")
+            data = zstandard.ZstdCompressor().compress(data)
+        path = tmp_path / f"{schema}.dbn"
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+
+def records(schema, n):
+    out = np.zeros(n, dtype=DBN_DTYPES[schema])
+    out["publisher_id"] = 1
+    out["instrument_id"] = 42
+    out["ts_event"] = TS + np.arange(n)
+    return out
+
+
+def test_mbo(write):
+    mbo = records(MktDataSchema.MBO, 3)
+    mbo["order_id"] = [2**63 - 1, 6, 0]
+    mbo["price"] = [70 * PX, 71 * PX, UNDEF_PRICE]
+    mbo["size"] = [3, 4, 0]
+    mbo["action"] = [ord(OrderAction.ADD), ord(OrderAction.ADD), ord(OrderAction.CLEAR)]
+    mbo["side"] = [ord(OrderSide.BID), ord(OrderSide.ASK), ord(OrderSide.NONE)]
+    mbo["ts_recv"] = mbo["ts_event"] + 10
+    mbo["sequence"] = [1, 2, 3]
+    path = write(MktDataSchema.MBO, mbo, {"CLZ6": 42})
+    with DBNReader(path, batch_size=2) as reader:
+        assert reader.schema is MktDataSchema.MBO
+        assert reader.metadata.dataset == "GLBX.MDP3"
+        assert reader.metadata.instrument_symbols == {42: "CLZ6"}
+        assert [len(b) for b in reader.iter_batches()] == [2, 1]
+    # Compressed files are a one-pass stream, so read the records with a new reader
+    with DBNReader(path) as reader:
+        events = list(reader.iter_records("CME"))
+    assert [e.symbol for e in events] == ["CLZ6"] * 3
+    assert [e.action for e in events] == [OrderAction.ADD, OrderAction.ADD, OrderAction.CLEAR]
+    assert [e.price for e in events] == [70 * PX, 71 * PX, UNDEF_PRICE]
+    assert [e.order_id for e in events[:2]] == [2**63 - 1, 6] and events[0].ts_recv == TS + 10
+
+
+@pytest.mark.parametrize("order_id", [2**63, 2**64 - 1])
+def test_mbo_order_ids_beyond_int64_raise(write, order_id):
+    mbo = records(MktDataSchema.MBO, 2)
+    mbo["order_id"] = [1, order_id]
+    mbo["action"] = ord(OrderAction.ADD)
+    mbo["side"] = ord(OrderSide.BID)
+    with DBNReader(write(MktDataSchema.MBO, mbo, {"CLZ6": 42})) as reader:
+        with pytest.raises(ValueError, match="does not fit"):
+            list(reader.iter_event_batches())
+
+
+def test_mbp1_undefined_quotes_are_none(write):
+    mbp = records(MktDataSchema.MBP_1, 2)
+    mbp["price"] = [70 * PX, UNDEF_PRICE]
+    mbp["size"] = [1, 0]
+    mbp["action"] = [ord(OrderAction.TRADE), ord(OrderAction.MODIFY)]
+    mbp["side"] = [ord(OrderSide.BID), ord(OrderSide.NONE)]
+    mbp["bid_px_00"] = [6_999 * PX // 100, UNDEF_PRICE]
+    mbp["ask_px_00"] = [7_001 * PX // 100, 7_001 * PX // 100]
+    mbp["bid_sz_00"] = [5, 0]
+    mbp["ask_sz_00"] = [6, 6]
+    with DBNReader(write(MktDataSchema.MBP_1, mbp, {"CLZ6": 42})) as reader:
+        first, second = reader.iter_records("CME")
+    assert first.symbol == "CLZ6" and first.ts_event == TS
+    assert (first.price, first.bid_px_00, first.ask_px_00) == (70.0, 69.99, 70.01)
+    assert first.mid_px_00 == pytest.approx(70.0)
+    assert math.isnan(second.price)
+    assert second.bid_px_00 is None and second.mid_px_00 is None and second.ask_px_00 == 70.01
+
+
+def test_mbp10_undefined_levels_are_nan(write):
+    mbp = records(MktDataSchema.MBP_10, 1)
+    mbp["price"] = 70 * PX
+    mbp["action"] = ord(OrderAction.ADD)
+    mbp["side"] = ord(OrderSide.BID)
+    levels = mbp["levels"][0]
+    levels["bid_px"] = UNDEF_PRICE
+    levels["ask_px"] = UNDEF_PRICE
+    levels["bid_px"][:2] = [70 * PX, 69 * PX]
+    levels["ask_px"][0] = 71 * PX
+    levels["bid_sz"][:2] = [3, 4]
+    levels["ask_sz"][0] = 5
+    levels["bid_ct"][:2] = [1, 2]
+    levels["ask_ct"][0] = 1
+    mbp["levels"][0] = levels
+    with DBNReader(write(MktDataSchema.MBP_10, mbp, {"CLZ6": 42})) as reader:
+        (batch,) = reader.iter_mbp10_batches("CME")
+    record = batch[0]
+    assert record.symbol == "CLZ6" and record.price == 70.0
+    assert record.bids[:2].tolist() == [[70.0, 3, 1], [69.0, 4, 2]]
+    assert np.isnan(record.bids[2:, 0]).all() and np.isnan(record.asks[1:, 0]).all()
+    assert record.mid_price == 70.5
+
+
+def test_ohlcv_1d(write):
+    bars = records(MktDataSchema.OHLCV_1D, 2)
+    for name, value in (("open", 70), ("high", 72), ("low", 69), ("close", 71)):
+        bars[name] = value * PX
+    bars["volume"] = [1_000, 2_000]
+    with DBNReader(write(MktDataSchema.OHLCV_1D, bars, {"CLZ6": 42})) as reader:
+        assert reader.schema is MktDataSchema.OHLCV_1D
+        (read,) = reader.iter_batches()
+    assert read["close"].tolist() == [71 * PX] * 2
+    assert read["volume"].tolist() == [1_000, 2_000]
+    assert read["ts_event"].tolist() == [TS, TS + 1]
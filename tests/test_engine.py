@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from datacore.db.engine import EngineManager, Database, Environment
+
+KEY = (Database.CHRONO, Environment.UAT)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = EngineManager({KEY: f"sqlite:///{tmp_path / 'chrono.db'}"}, max_size=2)
+    with manager.engine(*KEY).begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE px (symbol TEXT, ts INTEGER, price REAL)")
+        conn.exec_driver_sql("INSERT INTO px VALUES ('CLZ6', 1, 70.0), ('CLZ6', 2, 70.5), ('CLF7', 1, 71.0)")
+    yield manager
+    manager.close()
+
+
+def test_engine_is_created_once_and_pooled(manager):
+    engine = manager.engine(*KEY)
+    assert manager.engine("CHRONO", "UAT") is engine
+    assert manager.fetch_all(*KEY, "SELECT price FROM px WHERE symbol = ? ORDER BY ts", ("CLZ6",)) == [(70.0,), (70.5,)]
+    assert engine.pool.checkedout() == 0 and engine.pool.checkedin() == 1
+    assert manager.check(*KEY)
+    assert manager.health() == {"CHRONO/UAT": True}
+
+
+def test_close_disposes_engines(manager):
+    engine = manager.engine(*KEY)
+    manager.fetch_all(*KEY, "SELECT 1")
+    manager.close()
+    assert engine.pool.checkedin() == 0
+    assert manager.health() == {}
+    # A later call builds a fresh engine
+    assert manager.engine(*KEY) is not engine
+    assert manager.fetch_all(*KEY, "SELECT 1") == [(1,)]
+
+
+def test_fetch_symbols_runs_over_the_sync_engine(manager):
+    async def run():
+        async with manager:
+            rows = await manager.fetch_symbols(*KEY, "SELECT ts, price FROM px WHERE symbol = ? AND ts >= ?",
+                                               ["CLZ6", "CLF7", "CLZ6"], (1,))
+            return rows, await manager.check_async(*KEY)
+
+    rows, healthy = asyncio.run(run())
+    assert rows == {"CLZ6": [(1, 70.0), (2, 70.5)], "CLF7": [(1, 71.0)]}
+    assert healthy
+    assert manager.health() == {}
+
+
+def test_pool_needs_an_odbc_string(manager):
+    with pytest.raises(ValueError, match="ODBC"):
+        asyncio.run(manager.pool(*KEY))
+
+
+def test_unreachable_database_is_unhealthy():
+    manager = EngineManager({KEY: "sqlite:////nonexistent/dir/x.db"})
+    assert not manager.check(*KEY)
+    assert not asyncio.run(manager.check_async(*KEY))
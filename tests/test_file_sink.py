@@ -0,0 +1,76 @@
+import datetime as dt
+
+from datacore.models.order import OrderAction, OrderSide
+from datacore.models.mktdata.realtime import MarketByPrice1
+from datacore.models.mktdata.historical import Option1D
+from datacore.models.mktdata.schema import MktDataSchema
+from datacore.outputs.file_sink import FileSink, FileStore
+
+DAY = dt.datetime(2026, 3, 2, tzinfo=dt.timezone.utc)
+HOUR_NS = 3_600 * 1_000_000_000
+
+
+def tick(hour):
+    ts = int(DAY.timestamp()) * 1_000_000_000 + hour * HOUR_NS
+    return MarketByPrice1(venue="CME", vendor="databento", symbol="CLZ6", price=70.0 + hour, ts_event=ts,
+                          sequence=hour, size=1, action=OrderAction.TRADE, side=OrderSide.BID)
+
+
+def write(root, binary, batches):
+    with FileSink(root, binary=binary) as sink:
+        for batch in batches:
+            sink.write(batch)
+            sink.flush()
+
+
+def test_datetime_bounds_are_not_truncated_to_the_day(tmp_path):
+    write(tmp_path, False, [[tick(h) for h in range(24)]])
+    store = FileStore(tmp_path)
+    schema = MktDataSchema.MBP_1
+    table = store.read(schema, start=DAY + dt.timedelta(hours=6), end="2026-03-02T09:00:00+00:00")
+    assert table.column("sequence").to_pylist() == [6, 7, 8, 9]
+    assert store.read(schema, start=dt.date(2026, 3, 2), end="2026-03-02").num_rows == 24
+
+
+def test_datetime_bounds_on_binary_parts(tmp_path):
+    write(tmp_path, True, [[tick(h) for h in range(24)]])
+    records = FileStore(tmp_path).read_records(MktDataSchema.MBP_1, start=DAY + dt.timedelta(hours=22),
+                                               end=DAY + dt.timedelta(days=1))
+    assert [r.sequence for r in records] == [22, 23]
+
+
+def test_compact_merges_binary_parts(tmp_path):
+    write(tmp_path, True, [[tick(3), tick(1)], [tick(2)], [tick(0)]])
+    store = FileStore(tmp_path)
+    schema = MktDataSchema.MBP_1
+    assert store.compact() == 1
+    (partition,) = store.partitions(schema)
+    assert len(list(partition.iterdir())) == 1
+    assert [r.sequence for r in store.read_records(schema)] == [0, 1, 2, 3]
+
+
+def option(date, strike):
+    return Option1D(venue="CME", vendor="cme", symbol="LO", market="LO", date=date, contract="Z26",
+                    call_put="C", strike=strike, settlement=1.5)
+
+
+OPTIONS = [option("2026-03-04", 70.0), option("2026-03-02", 71.0), option("2026-03-03", 72.0)]
+
+
+def test_option_1d_bounds_and_compact(tmp_path):
+    write(tmp_path, False, [OPTIONS[:2], OPTIONS[2:]])
+    store = FileStore(tmp_path)
+    schema = MktDataSchema.OPTION_1D
+    table = store.read(schema, start="2026-03-03", end=dt.date(2026, 3, 4))
+    assert sorted(table.column("strike").to_pylist()) == [70.0, 72.0]
+    assert store.compact() == 1
+    assert store.read(schema).column("date").to_pylist() == ["2026-03-02", "2026-03-03", "2026-03-04"]
+
+
+def test_option_1d_binary_parts(tmp_path):
+    write(tmp_path, True, [OPTIONS[:2], OPTIONS[2:]])
+    store = FileStore(tmp_path)
+    schema = MktDataSchema.OPTION_1D
+    assert store.compact() == 1
+    records = store.read_records(schema, start="2026-03-03")
+    assert records == [OPTIONS[2], OPTIONS[0]]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from datacore.analytics.fx import FxRateGraph, parse_pair
+
+
+def graph(history=False):
+    fx = FxRateGraph(history=history)
+    fx.update("EUR", "USD", 1.10, 10)
+    fx.update("USD", "JPY", 150.0, 10)
+    fx.update("GBP", "USD", 1.25, 10)
+    return fx
+
+
+def test_parse_pair():
+    assert parse_pair("eur/usd") == parse_pair("EURUSD") == parse_pair("EUR-USD") == ("EUR", "USD")
+    with pytest.raises(ValueError):
+        parse_pair("EURO")
+
+
+def test_inverted_legs():
+    fx = graph()
+    assert fx.route("JPY", "EUR") == (("USD", "JPY", True), ("EUR", "USD", True))
+    assert fx.rate("JPY", "EUR") == pytest.approx(1 / 150 / 1.10)
+    assert fx.rate("EUR", "JPY") == pytest.approx(1.10 * 150)
+    assert fx.rate("USD", "USD") == 1.0
+    with pytest.raises(ValueError, match="already quoted"):
+        fx.update("USD", "EUR", 0.9)
+
+
+def test_new_pair_invalidates_routes():
+    fx = graph()
+    assert len(fx.route("EUR", "JPY")) == 2 and fx.rate("EUR", "JPY") == pytest.approx(165.0)
+    with pytest.raises(ValueError, match="No FX route"):
+        fx.route("EUR", "NOK")
+    fx.update("EUR", "JPY", 160.0)
+    fx.update("EUR", "NOK", 11.5)
+    assert fx.route("EUR", "JPY") == (("EUR", "JPY", False),)
+    assert fx.rate("EUR", "JPY") == 160.0
+    assert fx.rate("GBP", "NOK") == pytest.approx(1.25 / 1.10 * 11.5)
+
+
+def test_rate_update_invalidates_dependent_crosses():
+    fx = graph()
+    amounts = np.array([100.0, 200.0, 300.0])
+    plan = fx.plan(["EUR", "GBP", "JPY"], "USD")
+    assert plan(amounts).tolist() == pytest.approx([110.0, 250.0, 2.0])
+    fx.update("USD", "JPY", 100.0)
+    assert fx.rate("EUR", "JPY") == pytest.approx(110.0)
+    assert plan(amounts).tolist() == pytest.approx([110.0, 250.0, 3.0])
+    fx.update("EUR", "USD", 1.20)
+    assert fx.rate("EUR", "JPY") == pytest.approx(120.0)
+    assert fx.convert(amounts, ["EUR", "GBP", "JPY"], "USD").tolist() == pytest.approx([120.0, 250.0, 3.0])
+
+
+def test_convert_asof():
+    fx = graph(history=True)
+    fx.update("EUR", "USD", 1.20, 20)
+    ts = np.array([5, 10, 15, 20, 25])
+    assert np.isnan(fx.convert_asof(np.ones(5), "EUR", "USD", ts)[0])
+    assert fx.convert_asof(np.ones(5), "EUR", "USD", ts)[1:].tolist() == pytest.approx([1.10, 1.10, 1.20, 1.20])
+    out = fx.convert_asof([1.0, 1.0, 150.0], ["EUR", "GBP", "JPY"], "USD", [25, 5, 10])
+    assert out[0] == pytest.approx(1.20) and np.isnan(out[1]) and out[2] == pytest.approx(1.0)
+    with pytest.raises(ValueError, match="without history"):
+        graph().rate_asof("EUR", "USD", ts)
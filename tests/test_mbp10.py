@@ -0,0 +1,20 @@
+import pytest
+
+from datacore.models.mktdata.realtime import MarketByPrice10, MarketByPrice10Batch
+
+
+def record(symbol, instrument_id):
+    return MarketByPrice10(venue="CME", vendor="databento", symbol=symbol, price=70.0, ts_event="1",
+                           instrument_id=instrument_id)
+
+
+def test_batch_keeps_each_records_symbol():
+    batch = MarketByPrice10Batch.from_records([record("CLZ6", 1), record("CLF7", 2), record("CLZ6", 1)])
+    assert [r.symbol for r in batch] == ["CLZ6", "CLF7", "CLZ6"]
+
+
+def test_batch_rejects_records_it_cannot_resolve_a_symbol_for():
+    with pytest.raises(ValueError, match="no instrument_id"):
+        MarketByPrice10Batch.from_records([record("CLZ6", 1), record("CLF7", None)])
+    with pytest.raises(ValueError, match="maps to both"):
+        MarketByPrice10Batch.from_records([record("CLZ6", 1), record("CLF7", 1)])
@@ -0,0 +1,27 @@
+import numpy as np
+
+from datacore.engine.monitor import LatencyHistogram, FeedMonitor, RecordFlag
+
+LAST = int(RecordFlag.LAST)
+
+
+def test_histogram_counts_out_of_range_values_without_raising():
+    histogram = LatencyHistogram()
+    histogram.record(2 ** 48)
+    histogram.record(2 ** 48 - 1)
+    histogram.record(-5)
+    histogram.record_many(np.array([2 ** 60, 5, -1]))
+    snapshot = histogram.snapshot()
+    assert snapshot["overflow"] == 2
+    assert snapshot["negative"] == 2
+    assert snapshot["count"] == 4
+
+
+def test_unset_ts_event_does_not_break_the_monitor():
+    monitor = FeedMonitor()
+    monitor.observe(1, 0, 7, 1, LAST, 1_700_000_000_000_000_000, 0)
+    monitor.observe(1, 0, 7, 2, LAST, 1_700_000_000_000_001_000, 1_700_000_000_000_000_000)
+    snapshot = monitor.snapshot()
+    assert snapshot["totals"]["messages"] == 2
+    assert snapshot["latency_all"]["overflow"] == 1
+    assert snapshot["latency_all"]["count"] == 1
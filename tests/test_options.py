@@ -0,0 +1,56 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from datacore.analytics.options import OptionChain, black76, black76_greeks, implied_vol
+from datacore.models.mktdata.historical import Option1D
+
+F, K, T, VOL, RATE = 70.0, np.array([50.0, 65.0, 70.0, 75.0, 95.0]), 0.4, 0.35, 0.03
+
+
+def test_put_call_parity():
+    call = black76(F, K, T, VOL, 1, RATE)
+    put = black76(F, K, T, VOL, -1, RATE)
+    assert np.allclose(call - put, np.exp(-RATE * T) * (F - K), atol=1e-12)
+
+
+@pytest.mark.parametrize("cp", [1, -1])
+def test_greeks_match_finite_differences(cp):
+    greeks = black76_greeks(F, K, T, VOL, cp, RATE)
+    price = lambda **kw: black76(*(kw.get(k, v) for k, v in (("f", F), ("k", K), ("t", T), ("vol", VOL))),
+                                 cp, kw.get("rate", RATE))
+    h = 1e-4
+    assert np.allclose(greeks["price"], price())
+    assert np.allclose(greeks["delta"], (price(f=F + h) - price(f=F - h)) / (2 * h), atol=1e-7)
+    assert np.allclose(greeks["gamma"], (price(f=F + h) - 2 * price() + price(f=F - h)) / h ** 2, atol=1e-4)
+    assert np.allclose(greeks["vega"], (price(vol=VOL + h) - price(vol=VOL - h)) / (2 * h), atol=1e-6)
+    assert np.allclose(greeks["theta"], -(price(t=T + h) - price(t=T - h)) / (2 * h), atol=1e-6)
+    assert np.allclose(greeks["rho"], (price(rate=RATE + h) - price(rate=RATE - h)) / (2 * h), atol=1e-6)
+
+
+@pytest.mark.parametrize("cp", [1, -1])
+def test_implied_vol_round_trip(cp):
+    vols = np.array([0.8, 0.2, 0.05, 0.35, 2.0])
+    prices = black76(F, K, T, vols, cp, RATE)
+    assert np.allclose(implied_vol(prices, F, K, T, cp, RATE), vols, atol=1e-8)
+    assert float(implied_vol(float(prices[2]), F, 70.0, T, cp, RATE)) == pytest.approx(0.05, abs=1e-8)
+
+
+def test_implied_vol_is_nan_without_a_solution():
+    # Deep out of the money below min_price, below intrinsic, above the forward, expired
+    prices = np.array([1e-7, 0.0, 1.0, 80.0, 1.0])
+    strikes = np.array([140.0, 140.0, 50.0, 70.0, 70.0])
+    t = np.array([T, T, T, T, 0.0])
+    assert np.isnan(implied_vol(prices, F, strikes, t, 1, RATE)).all()
+
+
+def test_chain_implies_forwards_and_vols():
+    date, expiry = dt.date(2026, 3, 2), dt.date(2026, 6, 15)
+    t = (expiry - date).days / 365.0
+    records = [Option1D(venue="CME", vendor="cme", symbol="LO", market="LO", date=str(date), contract="M26",
+                        call_put=side, strike=k, settlement=float(black76(F, k, t, VOL, cp, RATE)))
+               for k in K for side, cp in (("C", 1), ("P", -1))]
+    chain = OptionChain.from_records(records, {"M26": expiry}, rate=RATE)
+    assert chain.implied_forwards()["M26"] == pytest.approx(F)
+    assert np.allclose(chain.implied_vol(), VOL, atol=1e-8)
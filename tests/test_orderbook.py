@@ -0,0 +1,12 @@
+from datacore.models.order import OrderAction, OrderSide
+from datacore.models.orderbook import OrderBookEvent, OrderBookEventBatch
+
+
+def test_event_round_trip_keeps_negative_prices_and_nulls():
+    event = OrderBookEvent(ts_recv=2, ts_event=1, ts_in_delta=0, instrument_id=1, symbol="CLZ6", publisher_id=1,
+                           rtype=160, sequence=1, action=OrderAction.ADD, side=OrderSide.BID, price=-10**9,
+                           size=1, flags=0, order_id=5, bid_px_00=-1.0, bid_sz_00=3, ask_px_00=None)
+    restored = OrderBookEventBatch.from_events([event])[0]
+    assert restored == event
+    assert restored.bid_px_00 == -1.0
+    assert restored.ask_px_00 is None and restored.ask_sz_00 is None and restored.depth is None
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from sqlalchemy import BigInteger, Float, MetaData, String, create_engine, inspect
+
+from datacore.models.mktdata.historical import OHLCV1D, Option1D
+from datacore.models.mktdata.realtime import MarketByPrice1, MarketByPrice10
+from datacore.orm import build_model, build_table, table_spec
+from datacore.orm.spec import ROW_ID, TABLE_NAME_FIELDS, row_getter
+
+
+def columns(record_cls):
+    return {c.name: c for c in table_spec(record_cls).columns}
+
+
+def test_daily_bars_are_keyed_on_their_date():
+    spec = table_spec(OHLCV1D)
+    cols = columns(OHLCV1D)
+    assert spec.primary_key == ("ts_event",) and not spec.surrogate
+    assert cols["ts_event"].kind is str and not cols["ts_event"].nullable
+    assert all(c.nullable for name, c in cols.items() if name != "ts_event")
+    assert not TABLE_NAME_FIELDS & set(cols)
+    # The key already leads with ts_event, so only instrument_id gets an index
+    assert spec.indexes == ("instrument_id",)
+
+
+def test_composite_key_columns_are_not_nullable():
+    spec = table_spec(Option1D)
+    cols = columns(Option1D)
+    assert spec.primary_key == ("date", "contract", "call_put", "strike")
+    assert [name for name, c in cols.items() if not c.nullable] == list(spec.primary_key)
+    assert cols["strike"].kind is float and cols["last"].nullable
+
+
+def test_ticks_use_a_surrogate_key():
+    spec = table_spec(MarketByPrice1)
+    cols = columns(MarketByPrice1)
+    assert spec.surrogate and spec.primary_key == (ROW_ID,) and ROW_ID not in cols
+    assert cols["ts_event"].kind is int and cols["ts_event"].nullable
+    assert spec.indexes == ("ts_event", "instrument_id")
+
+
+def test_array_fields_become_one_column_per_level():
+    cols = columns(MarketByPrice10)
+    levels = [name for name in cols if name[:4] in ("bid_", "ask_")]
+    assert len(levels) == 60 and levels[:4] == ["bid_px_00", "bid_sz_00", "bid_ct_00", "bid_px_01"]
+    assert levels[-1] == "ask_ct_09" and "bids" not in cols
+    assert cols["bid_px_00"].kind is float and cols["ask_sz_09"].kind is int
+    assert all(cols[name].nullable for name in levels)
+
+    record = MarketByPrice10(venue="CME", vendor="databento", symbol="CLZ6", price=70.0, ts_event="1")
+    record.bids[0] = (70.0, 5, 2)
+    values = dict(zip(table_spec(MarketByPrice10).names, row_getter(MarketByPrice10)(record)))
+    assert (values["bid_px_00"], values["bid_sz_00"], values["bid_ct_00"]) == (70.0, 5, 2)
+    assert type(values["bid_sz_00"]) is int and values["bid_px_01"] is None and values["ask_px_00"] is None
+    assert np.isnan(record.asks[0][0])
+
+
+def test_sqlalchemy_tables():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    option = build_table("cme_option_1d", Option1D, metadata)
+    tick = build_table("cme_mbp_1", MarketByPrice1, metadata)
+    metadata.create_all(engine)
+
+    assert [c.name for c in option.primary_key.columns] == ["date", "contract", "call_put", "strike"]
+    assert isinstance(option.c.strike.type, Float) and isinstance(option.c.date.type, String)
+    assert not option.c.contract.nullable and option.c.last.nullable
+    assert [c.name for c in tick.primary_key.columns] == [ROW_ID] and tick.c[ROW_ID].autoincrement is True
+    assert isinstance(tick.c.ts_event.type, BigInteger) and tick.c.ts_event.nullable
+    reflected = inspect(engine)
+    assert reflected.get_pk_constraint("cme_option_1d")["constrained_columns"] == list(table_spec(Option1D).primary_key)
+    assert {ix["column_names"][0] for ix in reflected.get_indexes("cme_mbp_1")} == {"ts_event", "instrument_id"}
+
+
+def test_peewee_models():
+    peewee = pytest.importorskip("peewee")
+    database = peewee.SqliteDatabase(":memory:")
+    option = build_model("cme_option_1d", Option1D, database)
+    tick = build_model("cme_mbp_10", MarketByPrice10, database)
+    daily = build_model("cme_ohlcv_1d", OHLCV1D, database)
+    database.create_tables([option, tick, daily])
+
+    assert isinstance(option._meta.primary_key, peewee.CompositeKey)
+    assert option._meta.primary_key.field_names == ("date", "contract", "call_put", "strike")
+    assert not option.strike.null and option.last.null
+    assert isinstance(tick._meta.primary_key, peewee.BigAutoField) and tick._meta.primary_key.name == ROW_ID
+    assert isinstance(tick.bid_px_09, peewee.FloatField) and tick.ask_ct_09.null
+    assert daily._meta.primary_key.name == "ts_event" and isinstance(daily.ts_event, peewee.CharField)
+
+    tick.insert_many([{"price": 70.0, "ts_event": 1}, {"price": 70.0, "ts_event": 1}]).execute()
+    assert [row.row_id for row in tick.select().order_by(tick.row_id)] == [1, 2]
+    assert {tuple(ix.columns) for ix in database.get_indexes("cme_mbp_10")} == {("ts_event",), ("instrument_id",)}
@@ -0,0 +1,164 @@
+import time
+import asyncio
+
+import pytest
+
+from datacore.models.mktdata.realtime import MarketByPrice1
+from datacore.outputs.redis_sink import RedisSink, AsyncRedisSink
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def hset(self, key, mapping):
+        self.commands.append(("hset", key, dict(mapping)))
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.commands.append(("xadd", key, dict(fields)))
+
+    def set(self, key, value):
+        self.commands.append(("set", key, value))
+
+    def execute(self):
+        if self.client.fail:
+            self.client.fail -= 1
+            raise ConnectionError("redis down")
+        self.client.executed.append(self.commands)
+        for command, key, value in self.commands:
+            if command == "hset":
+                self.client.hashes.setdefault(key, {}).update(value)
+
+
+class FakeClient:
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.executed = []
+        self.hashes = {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def close(self):
+        pass
+
+
+class AsyncFakePipeline(FakePipeline):
+    async def execute(self):
+        FakePipeline.execute(self)
+
+
+class AsyncFakeClient(FakeClient):
+    def pipeline(self, transaction=False):
+        return AsyncFakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+def tick(price, symbol="CLZ6", size=1, bid=None):
+    return MarketByPrice1(venue="CME", vendor="databento", symbol=symbol, price=price, ts_event="1", size=size,
+                          bid_px_00=bid)
+
+
+def test_updates_to_one_key_are_coalesced():
+    client = FakeClient()
+    sink = RedisSink(client, window=3600)
+    sink.publish_many([tick(1.0), tick(2.0), tick(3.0, size=5), tick(9.0, symbol="NGZ6")])
+    assert sink.flush() == 2
+    assert len(client.executed) == 1
+    hsets = {key: mapping for command, key, mapping in client.executed[0] if command == "hset"}
+    assert hsets["rt:databento:CLZ6"]["price"] == "3.0"
+    assert hsets["rt:databento:CLZ6"]["size"] == "5"
+    assert "rt:databento:NGZ6" in hsets
+
+
+def test_flush_writes_only_changed_fields():
+    client = FakeClient()
+    sink = RedisSink(client, window=3600)
+    sink.publish(tick(1.0, bid=0.5))
+    sink.flush()
+    sink.publish(tick(2.0, bid=0.5))
+    assert sink.flush() == 1
+    assert client.executed[-1] == [("hset", "rt:databento:CLZ6", {"price": "2.0"})]
+    sink.publish(tick(2.0, bid=0.5))
+    assert sink.flush() == 0
+    assert len(client.executed) == 2
+
+
+def test_failed_flush_keeps_updates():
+    client = FakeClient(fail=1)
+    sink = RedisSink(client, window=3600)
+    sink.publish(tick(1.0, bid=0.5))
+    with pytest.raises(ConnectionError):
+        sink.flush()
+    assert sink.flush() == 1
+    assert client.hashes["rt:databento:CLZ6"]["price"] == "1.0"
+
+
+def test_failed_flush_newer_values_win():
+    client = FakeClient(fail=1)
+    sink = RedisSink(client, window=3600)
+    sink.publish(tick(1.0, bid=0.5))
+    with pytest.raises(ConnectionError):
+        sink.flush()
+    sink.publish(tick(2.0, bid=0.5))
+    assert sink.flush() == 1
+    assert client.hashes["rt:databento:CLZ6"]["price"] == "2.0"
+    assert client.hashes["rt:databento:CLZ6"]["bid_px_00"] == "0.5"
+
+
+def test_failed_flush_rewrites_fields_published_before():
+    client = FakeClient()
+    sink = RedisSink(client, window=3600)
+    sink.publish(tick(1.0, bid=0.5))
+    sink.flush()
+    client.fail = 1
+    sink.publish(tick(2.0, bid=0.5))
+    with pytest.raises(ConnectionError):
+        sink.flush()
+    client.hashes.clear()   # e.g. redis restarted while we were failing
+    sink.publish(tick(2.0, bid=0.6))
+    sink.flush()
+    assert client.hashes["rt:databento:CLZ6"]["price"] == "2.0"
+    assert client.hashes["rt:databento:CLZ6"]["bid_px_00"] == "0.6"
+
+
+def test_binary_failed_flush_keeps_latest_record():
+    client = FakeClient(fail=1)
+    sink = RedisSink(client, window=3600, binary=True)
+    sink.publish(tick(1.0))
+    with pytest.raises(ConnectionError):
+        sink.flush()
+    assert sink.flush() == 1
+    assert client.executed[0][0][1] == "rt:databento:CLZ6:bin"
+
+
+def test_async_sink_keeps_flushing_after_errors():
+    async def run():
+        client = AsyncFakeClient(fail=2)
+        sink = AsyncRedisSink(client, window=0.01)
+        async with sink:
+            sink.publish(tick(1.0))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if client.executed:
+                    break
+            sink.publish(tick(2.0))
+        return client
+
+    client = asyncio.run(run())
+    assert client.hashes["rt:databento:CLZ6"]["price"] == "2.0"
+    assert len(client.executed) >= 1
+
+
+def test_flush_if_due_writes_after_the_window():
+    client = FakeClient()
+    sink = RedisSink(client, window=0.2)
+    sink.publish(tick(1.0))
+    assert not client.executed and sink.flush_if_due() == 0
+    time.sleep(0.25)
+    assert sink.flush_if_due() == 1
+    assert client.hashes["rt:databento:CLZ6"]["price"] == "1.0"
+    assert sink.flush_if_due() == 0
@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from datacore.models.mktdata.venue import Venue
+from datacore.models.assets.asset_type import AssetType
+from datacore.models.assets.base import TradingHours
+from datacore.models.assets.futures import BaseFutures, Futures, FuturesOptions
+from datacore.models.assets.fx import FXSpot
+from datacore.models.assets.registry import InstrumentRegistry
+
+HOURS = {"time_zone": "America/New_York", "open_time_local": ["18:00:00"], "close_time_local": ["17:00:00"],
+         "days": [6, 0, 1, 2, 3, 4]}
+
+YAML = """
+instruments:
+  - dflow_id: CME.CL
+    asset_type: fut
+    terms: 12
+    contract_size: 1000
+    venue: CME
+    hours: &cme {time_zone: America/New_York, open_time_local: ["18:00:00"], close_time_local: ["17:00:00"],
+                 days: [6, 0, 1, 2, 3, 4]}
+    contract_months: [Jan, Feb, Mar, Apr, May, Jun, Jul, Aug, Sep, Oct, Nov, Dec]
+  - {dflow_id: CME.CL.1, parent: CME.CL, term: 1, symbol: CL_1, instrument_id: 101}
+  - {dflow_id: CME.CL.2, parent: CME.CL, term: 2, symbol: CL_2, instrument_id: 102}
+  - {dflow_id: CME.CL.1.OPT, asset_type: fut_option, parent: CME.CL.1, term: 1}
+  - {dflow_id: CME.EURUSD, asset_type: fx, venue: CME, hours: *cme, symbol: EURUSD}
+"""
+
+
+def root(dflow_id="CME.CL"):
+    return BaseFutures(dflow_id=dflow_id, terms=12, contract_size=1000, venue=Venue.CME,
+                       hours=TradingHours(**HOURS), contract_months=["Dec"])
+
+
+def test_load_yaml():
+    registry = InstrumentRegistry()
+    assert registry.load_yaml(io.StringIO(YAML)) == 5
+    assert len(registry) == 5 and "CME.CL.2" in registry
+    cl1 = registry.by_symbol("CL_1")
+    assert isinstance(cl1, Futures) and registry.by_instrument_id(101) is cl1
+    assert cl1.parent is registry["CME.CL"] is registry.by_instrument_id(102).parent
+    option = registry["CME.CL.1.OPT"]
+    assert isinstance(option, FuturesOptions) and option.parent is cl1
+    assert isinstance(registry.by_symbol("EURUSD"), FXSpot)
+    assert [a.dflow_id for a in registry.by_type(AssetType.FUT)] == ["CME.CL", "CME.CL.1", "CME.CL.2"]
+    assert len(registry.by_venue(Venue.CME)) == 5 and registry.by_venue(Venue.ICE) == []
+
+
+def test_load_yaml_from_a_file(tmp_path):
+    path = tmp_path / "instruments.yaml"
+    path.write_text(YAML)
+    registry = InstrumentRegistry.from_yaml(path)
+    assert len(registry) == 5
+    # Identical hours are one instance, so the compiled session table is shared
+    assert registry["CME.EURUSD"].hours is registry["CME.CL"].hours
+
+
+def test_assets_are_interned_by_dflow_id():
+    registry = InstrumentRegistry()
+    first = registry.add(root())
+    assert registry.add(root()) is first
+    assert registry.build({"dflow_id": "CME.CL", "terms": 1, "instrument_id": 7}) is first
+    assert registry.by_instrument_id(7) is first and len(registry) == 1
+    # A future whose parent is an equal but different instance is re-pointed to the registered root
+    term = registry.add(Futures(dflow_id="CME.CL.1", parent=root(), term=1))
+    assert term.parent is first
+    other = registry.add(root("CME.NG"))
+    assert other.hours is first.hours
+
+
+def test_unknown_parent_and_asset_type_raise():
+    registry = InstrumentRegistry()
+    with pytest.raises(ValueError, match="Unknown parent"):
+        registry.build({"dflow_id": "CME.CL.1", "parent": "CME.CL", "term": 1})
+    with pytest.raises(ValueError, match="Unsupported asset_type"):
+        registry.build({"dflow_id": "AAPL", "asset_type": "equity"})
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from datacore.engine.replay import ReplayEngine
+from datacore.models.mktdata.realtime import MarketByPrice1
+from datacore.models.orderbook import OrderBookEventBatch
+
+
+def ticks(ts, symbol="CLZ6"):
+    return [MarketByPrice1(venue="CME", vendor="databento", symbol=symbol, price=70.0, ts_event=str(t), ts_recv=t)
+            for t in ts]
+
+
+def events(ts, instrument_id=1):
+    batch = OrderBookEventBatch.empty(len(ts), {instrument_id: "CLZ6"})
+    batch.data["ts_recv"] = ts
+    batch.data["instrument_id"] = instrument_id
+    return batch
+
+
+def test_sources_are_merged_in_global_order():
+    rng = np.random.default_rng(3)
+    streams = {name: np.sort(rng.integers(0, 1_000, 200)).tolist() for name in "ABCD"}
+    engine = ReplayEngine()
+    for name, ts in streams.items():
+        engine.add_records(name, ticks(ts, name), chunk_size=17)
+    merged = list(engine)
+    assert [ts for ts, _, _ in merged] == sorted(t for ts in streams.values() for t in ts)
+    assert all(record.symbol == name for _, name, record in merged)
+    for name, ts in streams.items():
+        assert [t for t, n, _ in merged if n == name] == ts
+
+
+def test_ties_follow_registration_order():
+    def replay(chunk_size):
+        engine = ReplayEngine()
+        engine.add_records("B", ticks([1, 2, 2, 3], "B"), chunk_size=chunk_size)
+        engine.add_records("A", ticks([2, 2, 3], "A"), chunk_size=chunk_size)
+        return [(ts, name) for ts, name, _ in engine]
+
+    expected = [(1, "B"), (2, "B"), (2, "B"), (2, "A"), (2, "A"), (3, "B"), (3, "A")]
+    assert replay(1) == replay(2) == replay(10) == expected
+
+
+def test_start_and_end_are_inclusive():
+    engine = ReplayEngine()
+    engine.add_records("A", ticks([1, 3, 5, 7, 9]), chunk_size=2)
+    engine.add_source("B", [events([2, 4, 6]), events([8, 10])])
+    timestamps = [ts for _, ts, _ in engine.blocks(start=3, end=8) for ts in ts.tolist()]
+    assert timestamps == [3, 4, 5, 6, 7, 8]
+
+
+def test_mixed_source_kinds():
+    array = np.zeros(3, dtype=[("ts_recv", np.int64), ("value", np.float64)])
+    array["ts_recv"] = [2, 5, 8]
+    engine = ReplayEngine()
+    engine.add_records("list", ticks([1, 5, 9]))
+    engine.add_source("array", [array])
+    engine.add_source("batch", [events([3, 5]), events([7])])
+    merged = [(ts, name) for ts, name, _ in engine]
+    assert merged == [(1, "list"), (2, "array"), (3, "batch"), (5, "list"), (5, "array"), (5, "batch"),
+                      (7, "batch"), (8, "array"), (9, "list")]
+    blocks = []
+    engine = ReplayEngine()
+    engine.add_source("a", [events([1, 4])])
+    engine.add_source("b", [events([2, 3])])
+    engine.subscribe_batch(lambda chunk, ids: blocks.append((type(chunk), ids.tolist())))
+    assert engine.run().records == 4
+    # Rows of several same-kind sources before the horizon come out as one combined batch
+    assert blocks[0] == (OrderBookEventBatch, [0, 1])
+    assert {kind for kind, _ in blocks} == {OrderBookEventBatch}
+    assert [i for _, ids in blocks for i in ids] == [0, 1, 1, 0]
+
+
+@pytest.mark.parametrize("chunks", [[events([1, 3, 2])], [events([1, 3]), events([2])]])
+def test_unordered_source_raises(chunks):
+    engine = ReplayEngine()
+    engine.add_source("A", chunks)
+    with pytest.raises(ValueError, match="not ordered"):
+        list(engine)
+
+
+def test_stop_ends_the_replay_after_the_current_block():
+    engine = ReplayEngine()
+    engine.add_records("A", ticks(range(0, 100, 2)), chunk_size=10)
+    engine.add_records("B", ticks(range(1, 100, 2)), chunk_size=10)
+    seen = []
+
+    def on_record(record):
+        seen.append(record.ts_recv)
+        if len(seen) == 5:
+            engine.stop()
+
+    engine.subscribe(on_record)
+    stats = engine.run()
+    assert stats.blocks == 1 and stats.records == len(seen) < 100
+    assert seen == sorted(seen) and stats.last_ts == seen[-1]
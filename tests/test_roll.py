@@ -0,0 +1,30 @@
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from datacore.models.assets.roll import RollCalendar, ExpiryRule, contract_code, contract_key
+
+CL = ("CL", ["Dec"], ["Z"], ExpiryRule.ENERGY_25TH, ZoneInfo("America/New_York"), dt.time(17))
+
+
+def test_keys_are_unique_across_decades():
+    calendar = RollCalendar.build(*CL, 2016, 2037)
+    assert len(set(calendar.keys)) == len(calendar) == 22
+    assert contract_code("CL", "Z", 2026) == contract_code("CL", "Z", 2036) == "CLZ6"
+    assert contract_key("CL", "Z", 2026) != contract_key("CL", "Z", 2036)
+
+
+def test_expiry_override_applies_to_one_contract():
+    calendar = RollCalendar.build(*CL, 2016, 2037, expiries={"CLZ26": dt.date(2026, 11, 10)})
+    expiries = dict(zip(calendar.keys, calendar.expiries))
+    assert expiries["CLZ26"] == dt.date(2026, 11, 10)
+    assert expiries["CLZ36"] != dt.date(2026, 11, 10)
+    assert expiries["CLZ16"].year == 2016
+
+
+def test_display_code_override_is_rejected_when_ambiguous():
+    with pytest.raises(ValueError):
+        RollCalendar.build(*CL, 2016, 2037, expiries={"CLZ6": dt.date(2026, 11, 10)})
+    calendar = RollCalendar.build(*CL, 2024, 2027, expiries={"CLZ6": dt.date(2026, 11, 10)})
+    assert dict(zip(calendar.keys, calendar.expiries))["CLZ26"] == dt.date(2026, 11, 10)
@@ -0,0 +1,82 @@
+import asyncio
+
+from datacore.outputs.router import MarketDataRouter, QueuePolicy
+
+RECORDS = list(range(30))
+
+
+async def publish_gated(policy):
+    """Publish RECORDS to a route whose writer holds its first batch until the producer had its chance"""
+    gate = asyncio.Event()
+    written = []
+
+    async def write(records):
+        await gate.wait()
+        written.extend(records)
+
+    router = MarketDataRouter()
+    route = router.add_route("out", write, maxsize=10, batch_size=100, linger=0, policy=policy)
+    async with router:
+        publishing = asyncio.ensure_future(router.publish_many(RECORDS))
+        await asyncio.sleep(0.01)
+        done = publishing.done()
+        gate.set()
+        await publishing
+    return done, written, route.stats
+
+
+def test_block_waits_for_the_writer():
+    done, written, stats = asyncio.run(publish_gated(QueuePolicy.BLOCK))
+    assert not done
+    assert written == RECORDS and stats.dropped == 0
+
+
+def test_drop_newest_keeps_the_first_records():
+    done, written, stats = asyncio.run(publish_gated(QueuePolicy.DROP_NEWEST))
+    assert done
+    assert written == RECORDS[:20] and stats.dropped == 10
+
+
+def test_drop_oldest_keeps_the_latest_records():
+    done, written, stats = asyncio.run(publish_gated(QueuePolicy.DROP_OLDEST))
+    assert done
+    assert written == RECORDS[:10] + RECORDS[20:] and stats.dropped == 10
+
+
+def test_drop_routes_smaller_than_a_burst_drain_instead_of_dropping():
+    async def run():
+        written = []
+
+        async def write(records):
+            written.extend(records)
+
+        router = MarketDataRouter()
+        route = router.add_route("out", write, maxsize=100, batch_size=10, linger=0,
+                                 policy=QueuePolicy.DROP_OLDEST)
+        async with router:
+            await router.publish_many(range(5_000))
+            for i in range(5_000, 5_200):
+                await router.publish(i)
+        return written, route.stats
+
+    written, stats = asyncio.run(run())
+    assert stats.dropped == 0 and written == list(range(5_200))
+
+
+def test_close_drains_queued_records():
+    async def run(drain):
+        written = []
+
+        async def write(records):
+            await asyncio.sleep(0)
+            written.extend(records)
+
+        router = MarketDataRouter()
+        router.add_route("out", write, batch_size=10, linger=1.0)
+        await router.start()
+        await router.publish_many(RECORDS)
+        await router.close(drain=drain)
+        return written
+
+    assert asyncio.run(run(True)) == RECORDS
+    assert asyncio.run(run(False)) == []
@@ -0,0 +1,43 @@
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+from datacore.models.mktdata.venue import Venue
+from datacore.models.assets.base import TradingHours
+from datacore.models.assets.futures import BaseFutures
+
+NY = ZoneInfo("America/New_York")
+
+
+def hours():
+    return TradingHours(time_zone="America/New_York", open_time_local=["18:00:00"], close_time_local=["17:00:00"],
+                        days=[6, 0, 1, 2, 3, 4])
+
+
+def ns(ts: dt.datetime) -> int:
+    return int(ts.timestamp()) * 1_000_000_000
+
+
+def test_current_state_stays_a_property():
+    trading_hours = hours()
+    asset = BaseFutures(dflow_id="CME.CL", terms=12, contract_size=1000, venue=Venue.CME, hours=trading_hours,
+                        contract_months=["Dec"])
+    for obj in (trading_hours, asset):
+        assert isinstance(obj.is_open, bool)
+        assert isinstance(obj.trading_session, dt.date)
+
+
+def test_session_table_is_reused_within_its_window():
+    trading_hours = hours()
+    monday = dt.datetime(2026, 3, 2, 12, tzinfo=NY)
+    table = trading_hours.session_table(ns(monday))
+    assert trading_hours.session_table(ns(monday + dt.timedelta(days=20))) is table
+    later = trading_hours.session_table(ns(monday + dt.timedelta(days=60)))
+    assert later is not table and later.covers(ns(monday + dt.timedelta(days=60)))
+
+
+def test_sessions_across_a_dst_change():
+    trading_hours = hours()
+    # US clocks go forward on 2026-03-08; the session still opens at 18:00 local time.
+    assert not trading_hours.is_open_at(dt.datetime(2026, 3, 8, 17, 59, tzinfo=NY))
+    assert trading_hours.is_open_at(dt.datetime(2026, 3, 8, 18, 1, tzinfo=NY))
+    assert trading_hours.trading_session_at(dt.datetime(2026, 3, 9, 9, tzinfo=NY)) == dt.date(2026, 3, 8)
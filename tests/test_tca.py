@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pytest
+
+from datacore.analytics.tca import NS_PER_MINUTE as M, TickHistory, tca
+from datacore.models.execution.algo import BaseExecutionAlgo, TimeInForce
+from datacore.models.execution.order import Order, OrderSide
+from datacore.models.execution.result import Fill
+
+
+T0 = 60 * M  # ts_created of 0 means unset, so the clock starts later
+
+
+def t(minutes):
+    return T0 + minutes * M
+
+
+class Twap(BaseExecutionAlgo):
+    short_name = "TWAP"
+    duration = 20
+
+
+def history():
+    # Mid 100 until 10m, 102 until 20m, then 104; one tick wide. Trades at 5m, 15m and 25m.
+    return TickHistory(ts=[t(0), t(10), t(20)], bid=[99.0, 101.0, 103.0], ask=[101.0, 103.0, 105.0],
+                       trade_ts=[t(5), t(15), t(25)], trade_px=[100.0, 102.0, 110.0], trade_sz=[1, 3, 10])
+
+
+def report():
+    orders = {
+        "A": Order("A", "ESZ6", OrderSide.BUY, 4, exec_algo=Twap(), ts_created=t(0)),
+        "B": Order("B", "ESZ6", OrderSide.SELL, 1, exec_algo=Twap(), time_in_force=TimeInForce.IOC,
+                   ts_created=t(12)),
+        "C": Order("C", "NQZ6", OrderSide.BUY, 1),
+    }
+    fills = [Fill("1", "A", 2, 101.0, t(5), fee=1.0), Fill("2", "B", 1, 102.5, t(14)),
+             Fill("3", "A", 2, 103.0, t(15), fee=1.0), Fill("4", "C", 1, 50.0, t(1))]
+    return tca(fills, orders, {"ESZ6": history()})
+
+
+def test_benchmarks_of_an_algo_order():
+    r = report()
+    a = r.orders[r.order_ids.index("A")]
+    assert (a["start"], a["end"], a["fills"]) == (t(0), t(20), 2)
+    assert (a["quantity"], a["avg_price"], a["fees"]) == (4, 102.0, 2.0)
+    assert a["arrival_mid"] == 100.0 and a["arrival_bps"] == pytest.approx(200.0)
+    assert a["vwap"] == 101.5 and a["vwap_bps"] == pytest.approx(0.5 / 101.5 * 1e4)
+    assert a["twap"] == 101.0 and a["twap_bps"] == pytest.approx(1 / 101 * 1e4)
+    # Both fills paid the far touch
+    assert a["spread_capture"] == pytest.approx(-1.0)
+    fills = r.fills[r.fills["order"] == r.order_ids.index("A")]
+    assert fills["mid"].tolist() == [100.0, 102.0] and fills["spread_capture"].tolist() == [-1.0, -1.0]
+
+
+def test_immediate_orders_are_benchmarked_up_to_their_last_fill():
+    r = report()
+    b = r.orders[r.order_ids.index("B")]
+    # The algo's 20 minutes are ignored for IOC, so the window holds no market trade
+    assert (b["start"], b["end"]) == (t(12), t(14))
+    assert math.isnan(b["vwap"]) and math.isnan(b["vwap_bps"])
+    assert b["twap"] == 102.0
+    # Selling 0.5 above the mid is a gain (negative cost) and captures half the spread
+    assert b["arrival_bps"] == pytest.approx(-0.5 / 102 * 1e4)
+    assert b["spread_capture"] == pytest.approx(0.5)
+
+
+def test_ticker_without_history():
+    r = report()
+    c = r.orders[r.order_ids.index("C")]
+    # No creation time: the window starts at the first fill
+    assert (c["start"], c["fills"], c["quantity"], c["avg_price"]) == (t(1), 1, 1.0, 50.0)
+    for name in ("arrival_mid", "vwap", "twap", "arrival_bps", "vwap_bps", "twap_bps", "spread_capture"):
+        assert math.isnan(c[name])
+    summary = r.summary()
+    assert summary["orders"] == 3 and summary["fills"] == 4
+    # Only orders with a benchmark are averaged: A (notional 408) and B (102.5)
+    assert summary["arrival_bps"] == pytest.approx((408 * 200 + 102.5 * -0.5 / 102 * 1e4) / 510.5)
+
+
+def test_unknown_order_raises():
+    with pytest.raises(ValueError, match="unknown order"):
+        tca([Fill("1", "X", 1, 1.0, 0)], {}, {})
+
+
+def test_empty_history():
+    ticks = TickHistory(np.empty(0, np.int64), np.empty(0), np.empty(0))
+    assert np.isnan(ticks.mid_at([0, M])).all() and np.isnan(ticks.twap([0], [M])).all()
+    assert np.isnan(ticks.vwap([0], [M])).all()
@@ -0,0 +1,47 @@
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from datacore.models.mktdata.venue import Venue
+from datacore.models.assets.base import TradingHours
+from datacore.models.assets.futures import BaseFutures, Futures, FuturesOptions
+
+NY = ZoneInfo("America/New_York")
+
+
+def hours():
+    return TradingHours(time_zone="America/New_York", open_time_local=["18:00:00"], close_time_local=["17:00:00"],
+                        days=[6, 0, 1, 2, 3, 4])
+
+
+def test_state_at_a_timestamp():
+    trading_hours = hours()
+    evening = dt.datetime(2026, 3, 2, 19, tzinfo=NY)  # Sessions are dated by the day they open
+    assert trading_hours.is_open_at(evening)
+    assert trading_hours.trading_session_at(evening) == dt.date(2026, 3, 2)
+    assert not trading_hours.is_open_at(dt.datetime(2026, 3, 2, 17, 30, tzinfo=NY))
+    ns = int(evening.timestamp()) * 1_000_000_000
+    assert trading_hours.is_open_at(ns) and trading_hours.trading_session_at(ns) == dt.date(2026, 3, 2)
+
+
+def test_assets_delegate_to_their_hours():
+    parent = BaseFutures(dflow_id="CME.CL", terms=12, contract_size=1000, venue=Venue.CME, hours=hours(),
+                         contract_months=["Dec"])
+    option = FuturesOptions(dflow_id="CME.CL.1.OPT", parent=Futures(dflow_id="CME.CL.1", parent=parent, term=1),
+                            term=1)
+    saturday = dt.datetime(2026, 3, 7, 20, tzinfo=NY)
+    assert option.is_open == parent.is_open
+    assert not option.is_open_at(saturday)
+    assert option.trading_session_at(saturday) == parent.trading_session_at(saturday)
+
+
+def test_options_tag_sessions_with_the_parent_hours():
+    parent = BaseFutures(dflow_id="CME.CL", terms=12, contract_size=1000, venue=Venue.CME, hours=hours(),
+                         contract_months=["Dec"])
+    option = FuturesOptions(dflow_id="CME.CL.1.OPT", parent=Futures(dflow_id="CME.CL.1", parent=parent, term=1),
+                            term=1)
+    ts = np.array([int(dt.datetime(2026, 3, 2, h, tzinfo=NY).timestamp()) * 1_000_000_000 for h in (10, 17, 19)])
+    sessions, is_open = option.tag_sessions(ts)
+    expected_sessions, expected_open = parent.tag_sessions(ts)
+    assert (sessions == expected_sessions).all() and is_open.tolist() == expected_open.tolist() == [True, False, True]